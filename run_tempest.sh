@@ -11,6 +11,7 @@ function usage {
   echo "  -u, --update             Update the virtual environment with any newer package versions"
   echo "  -s, --smoke              Only run smoke tests"
   echo "  -t, --serial             Run testr serially"
+  echo "  -c, --concurrency N      Number of parallel testr workers (LIS workers are spread over the [lis] hosts)"
   echo "  -C, --config             Config file location"
   echo "  -h, --help               Print this usage message"
   echo "  -d, --debug              Run tests with testtools instead of testr. This allows you to use PDB"
@@ -21,6 +22,7 @@ testrargs=""
 venv=${VENV:-.venv}
 with_venv=tools/with_venv.sh
 serial=0
+concurrency=""
 always_venv=0
 never_venv=0
 no_site_packages=0
@@ -30,7 +32,7 @@ wrapper=""
 config_file=""
 update=0
 
-if ! options=$(getopt -o VNnfusthdC:lL: -l virtual-env,no-virtual-env,no-site-packages,force,update,smoke,serial,help,debug,config: -- "$@")
+if ! options=$(getopt -o VNnfusthdC:c:lL: -l virtual-env,no-virtual-env,no-site-packages,force,update,smoke,serial,help,debug,config:,concurrency: -- "$@")
 then
     # parse error
     usage
@@ -51,6 +53,7 @@ while [ $# -gt 0 ]; do
     -C|--config) config_file=$2; shift;;
     -s|--smoke) testrargs+="smoke";;
     -t|--serial) serial=1;;
+    -c|--concurrency) concurrency="--concurrency=$2"; shift;;
     --) [ "yes" == "$first_uu" ] || testrargs="$testrargs $1"; first_uu=no  ;;
     *) testrargs="$testrargs $1";;
   esac
@@ -90,7 +93,7 @@ function run_tests {
   if [ $serial -eq 1 ]; then
       ${wrapper} testr run --subunit $testrargs | ${wrapper} subunit-trace -n -f
   else
-      ${wrapper} testr run --parallel --subunit $testrargs | ${wrapper} subunit-trace -n -f
+      ${wrapper} testr run --parallel $concurrency --subunit $testrargs | ${wrapper} subunit-trace -n -f
   fi
 }
 
@@ -14,6 +14,7 @@
 #    under the License.
 
 import copy
+import threading
 
 from oslo_log import log as logging
 
@@ -190,7 +191,9 @@ class Manager(manager.Manager):
         'disable_ssl_certificate_validation':
             CONF.identity.disable_ssl_certificate_validation,
         'ca_certs': CONF.identity.ca_certificates_file,
-        'trace_requests': CONF.debug.trace_requests
+        'trace_requests': CONF.debug.trace_requests,
+        'keep_alive': CONF.service_clients.http_keep_alive,
+        'max_connections': CONF.service_clients.http_max_connections
     }
 
     # NOTE: Tempest uses timeout values of compute API if project specific
@@ -205,23 +208,29 @@ class Manager(manager.Manager):
         """Initialization of Manager class.
 
         Setup all services clients and make them available for tests cases.
+        The clients are only created on first access, and then kept, so the
+        tests only pay for the clients they use.
         :param credentials: type Credentials or TestResources
         :param service: Service name
         """
         super(Manager, self).__init__(credentials=credentials)
+        self._lazy_clients = {}
+        self._lazy_clients_lock = threading.Lock()
         self._set_compute_clients()
         self._set_database_clients()
         self._set_identity_clients()
         self._set_volume_clients()
         self._set_object_storage_clients()
 
-        self.baremetal_client = BaremetalClient(
+        self._set_lazy_client(
+            'baremetal_client', BaremetalClient,
             self.auth_provider,
             CONF.baremetal.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.baremetal.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.network_agents_client = NetworkAgentsClient(
+        self._set_lazy_client(
+            'network_agents_client', NetworkAgentsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -229,7 +238,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.network_extensions_client = NetworkExtensionsClient(
+        self._set_lazy_client(
+            'network_extensions_client', NetworkExtensionsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -237,7 +247,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.network_client = NetworkClient(
+        self._set_lazy_client(
+            'network_client', NetworkClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -245,7 +256,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.networks_client = NetworksClient(
+        self._set_lazy_client(
+            'networks_client', NetworksClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -253,7 +265,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.subnetpools_client = SubnetpoolsClient(
+        self._set_lazy_client(
+            'subnetpools_client', SubnetpoolsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -261,7 +274,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.subnets_client = SubnetsClient(
+        self._set_lazy_client(
+            'subnets_client', SubnetsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -269,7 +283,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.ports_client = PortsClient(
+        self._set_lazy_client(
+            'ports_client', PortsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -277,7 +292,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.network_quotas_client = NetworkQuotasClient(
+        self._set_lazy_client(
+            'network_quotas_client', NetworkQuotasClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -285,7 +301,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.floating_ips_client = FloatingIPsClient(
+        self._set_lazy_client(
+            'floating_ips_client', FloatingIPsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -293,7 +310,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.metering_labels_client = MeteringLabelsClient(
+        self._set_lazy_client(
+            'metering_labels_client', MeteringLabelsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -301,7 +319,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.metering_label_rules_client = MeteringLabelRulesClient(
+        self._set_lazy_client(
+            'metering_label_rules_client', MeteringLabelRulesClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -309,7 +328,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.routers_client = RoutersClient(
+        self._set_lazy_client(
+            'routers_client', RoutersClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -317,7 +337,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.security_group_rules_client = SecurityGroupRulesClient(
+        self._set_lazy_client(
+            'security_group_rules_client', SecurityGroupRulesClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -325,7 +346,8 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.security_groups_client = SecurityGroupsClient(
+        self._set_lazy_client(
+            'security_groups_client', SecurityGroupsClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -334,21 +356,24 @@ class Manager(manager.Manager):
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
         if CONF.service_available.ceilometer:
-            self.telemetry_client = TelemetryClient(
+            self._set_lazy_client(
+                'telemetry_client', TelemetryClient,
                 self.auth_provider,
                 CONF.telemetry.catalog_type,
                 CONF.identity.region,
                 endpoint_type=CONF.telemetry.endpoint_type,
                 **self.default_params_with_timeout_values)
         if CONF.service_available.aodh:
-            self.alarming_client = AlarmingClient(
+            self._set_lazy_client(
+                'alarming_client', AlarmingClient,
                 self.auth_provider,
                 CONF.alarming.catalog_type,
                 CONF.identity.region,
                 endpoint_type=CONF.alarming.endpoint_type,
                 **self.default_params_with_timeout_values)
         if CONF.service_available.glance:
-            self.image_client = ImagesClient(
+            self._set_lazy_client(
+                'image_client', ImagesClient,
                 self.auth_provider,
                 CONF.image.catalog_type,
                 CONF.image.region or CONF.identity.region,
@@ -356,7 +381,8 @@ class Manager(manager.Manager):
                 build_interval=CONF.image.build_interval,
                 build_timeout=CONF.image.build_timeout,
                 **self.default_params)
-            self.image_client_v2 = ImagesClientV2(
+            self._set_lazy_client(
+                'image_client_v2', ImagesClientV2,
                 self.auth_provider,
                 CONF.image.catalog_type,
                 CONF.image.region or CONF.identity.region,
@@ -364,7 +390,8 @@ class Manager(manager.Manager):
                 build_interval=CONF.image.build_interval,
                 build_timeout=CONF.image.build_timeout,
                 **self.default_params)
-        self.orchestration_client = OrchestrationClient(
+        self._set_lazy_client(
+            'orchestration_client', OrchestrationClient,
             self.auth_provider,
             CONF.orchestration.catalog_type,
             CONF.orchestration.region or CONF.identity.region,
@@ -372,14 +399,41 @@ class Manager(manager.Manager):
             build_interval=CONF.orchestration.build_interval,
             build_timeout=CONF.orchestration.build_timeout,
             **self.default_params)
-        self.data_processing_client = DataProcessingClient(
+        self._set_lazy_client(
+            'data_processing_client', DataProcessingClient,
             self.auth_provider,
             CONF.data_processing.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.data_processing.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.negative_client = negative_rest_client.NegativeRestClient(
-            self.auth_provider, service, **self.default_params)
+        self._set_lazy_client('negative_client',
+                              negative_rest_client.NegativeRestClient,
+                              self.auth_provider, service,
+                              **self.default_params)
+
+    def _set_lazy_client(self, name, client_class, *args, **kwargs):
+        """Makes a client available as self.<name>, created on first access.
+
+        All the clients share the auth_provider of the manager.
+        """
+        self._lazy_clients[name] = (client_class, args, kwargs)
+
+    def __getattr__(self, name):
+        # Only called when name is not an attribute yet
+        lazy_clients = self.__dict__.get('_lazy_clients', {})
+        if name not in lazy_clients:
+            raise AttributeError("'%s' object has no attribute '%s'" %
+                                 (self.__class__.__name__, name))
+        with self._lazy_clients_lock:
+            # Another thread may have created it meanwhile
+            if name in self.__dict__:
+                return self.__dict__[name]
+            # The entry is kept, so a failed creation is retried on the
+            # next access
+            client_class, args, kwargs = lazy_clients[name]
+            client = client_class(*args, **kwargs)
+            setattr(self, name, client)
+        return client
 
     def _set_compute_clients(self):
         params = {
@@ -391,62 +445,78 @@ class Manager(manager.Manager):
         }
         params.update(self.default_params)
 
-        self.agents_client = AgentsClient(self.auth_provider, **params)
-        self.compute_networks_client = ComputeNetworksClient(
-            self.auth_provider, **params)
-        self.migrations_client = MigrationsClient(self.auth_provider,
-                                                  **params)
-        self.security_group_default_rules_client = (
-            SecurityGroupDefaultRulesClient(self.auth_provider, **params))
-        self.certificates_client = CertificatesClient(self.auth_provider,
-                                                      **params)
-        self.servers_client = ServersClient(
+        self._set_lazy_client('agents_client', AgentsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('compute_networks_client', ComputeNetworksClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('migrations_client', MigrationsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('security_group_default_rules_client',
+                              SecurityGroupDefaultRulesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('certificates_client', CertificatesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client(
+            'servers_client', ServersClient,
             self.auth_provider,
             enable_instance_password=CONF.compute_feature_enabled
                 .enable_instance_password,
             **params)
-        self.server_groups_client = ServerGroupsClient(
-            self.auth_provider, **params)
-        self.limits_client = LimitsClient(self.auth_provider, **params)
-        self.compute_images_client = ComputeImagesClient(self.auth_provider,
-                                                         **params)
-        self.keypairs_client = KeyPairsClient(self.auth_provider, **params)
-        self.quotas_client = QuotasClient(self.auth_provider, **params)
-        self.quota_classes_client = QuotaClassesClient(self.auth_provider,
-                                                       **params)
-        self.flavors_client = FlavorsClient(self.auth_provider, **params)
-        self.extensions_client = ExtensionsClient(self.auth_provider,
-                                                  **params)
-        self.floating_ip_pools_client = FloatingIPPoolsClient(
-            self.auth_provider, **params)
-        self.floating_ips_bulk_client = FloatingIPsBulkClient(
-            self.auth_provider, **params)
-        self.compute_floating_ips_client = ComputeFloatingIPsClient(
-            self.auth_provider, **params)
-        self.compute_security_group_rules_client = \
-            ComputeSecurityGroupRulesClient(self.auth_provider, **params)
-        self.compute_security_groups_client = ComputeSecurityGroupsClient(
-            self.auth_provider, **params)
-        self.interfaces_client = InterfacesClient(self.auth_provider,
-                                                  **params)
-        self.fixed_ips_client = FixedIPsClient(self.auth_provider,
-                                               **params)
-        self.availability_zone_client = AvailabilityZoneClient(
-            self.auth_provider, **params)
-        self.aggregates_client = AggregatesClient(self.auth_provider,
-                                                  **params)
-        self.services_client = ServicesClient(self.auth_provider, **params)
-        self.tenant_usages_client = TenantUsagesClient(self.auth_provider,
-                                                       **params)
-        self.hosts_client = HostsClient(self.auth_provider, **params)
-        self.hypervisor_client = HypervisorClient(self.auth_provider,
-                                                  **params)
-        self.instance_usages_audit_log_client = \
-            InstanceUsagesAuditLogClient(self.auth_provider, **params)
-        self.tenant_networks_client = \
-            TenantNetworksClient(self.auth_provider, **params)
-        self.baremetal_nodes_client = BaremetalNodesClient(
-            self.auth_provider, **params)
+        self._set_lazy_client('server_groups_client', ServerGroupsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('limits_client', LimitsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('compute_images_client', ComputeImagesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('keypairs_client', KeyPairsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('quotas_client', QuotasClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('quota_classes_client', QuotaClassesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('flavors_client', FlavorsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('extensions_client', ExtensionsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('floating_ip_pools_client',
+                              FloatingIPPoolsClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('floating_ips_bulk_client',
+                              FloatingIPsBulkClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('compute_floating_ips_client',
+                              ComputeFloatingIPsClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('compute_security_group_rules_client',
+                              ComputeSecurityGroupRulesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('compute_security_groups_client',
+                              ComputeSecurityGroupsClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('interfaces_client', InterfacesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('fixed_ips_client', FixedIPsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('availability_zone_client',
+                              AvailabilityZoneClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('aggregates_client', AggregatesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('services_client', ServicesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('tenant_usages_client', TenantUsagesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('hosts_client', HostsClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('hypervisor_client', HypervisorClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('instance_usages_audit_log_client',
+                              InstanceUsagesAuditLogClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('tenant_networks_client', TenantNetworksClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('baremetal_nodes_client', BaremetalNodesClient,
+                              self.auth_provider, **params)
 
         # NOTE: The following client needs special timeout values because
         # the API is a proxy for the other component.
@@ -455,25 +525,30 @@ class Manager(manager.Manager):
             'build_interval': CONF.volume.build_interval,
             'build_timeout': CONF.volume.build_timeout
         })
-        self.volumes_extensions_client = ComputeVolumesClient(
-            self.auth_provider, **params_volume)
-        self.compute_versions_client = VersionsClient(self.auth_provider,
-                                                      **params_volume)
-        self.snapshots_extensions_client = ComputeSnapshotsClient(
-            self.auth_provider, **params_volume)
+        self._set_lazy_client('volumes_extensions_client',
+                              ComputeVolumesClient, self.auth_provider,
+                              **params_volume)
+        self._set_lazy_client('compute_versions_client', VersionsClient,
+                              self.auth_provider, **params_volume)
+        self._set_lazy_client('snapshots_extensions_client',
+                              ComputeSnapshotsClient, self.auth_provider,
+                              **params_volume)
 
     def _set_database_clients(self):
-        self.database_flavors_client = DatabaseFlavorsClient(
+        self._set_lazy_client(
+            'database_flavors_client', DatabaseFlavorsClient,
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
-        self.database_limits_client = DatabaseLimitsClient(
+        self._set_lazy_client(
+            'database_limits_client', DatabaseLimitsClient,
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
-        self.database_versions_client = DatabaseVersionsClient(
+        self._set_lazy_client(
+            'database_versions_client', DatabaseVersionsClient,
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
@@ -489,48 +564,59 @@ class Manager(manager.Manager):
         # Clients below use the admin endpoint type of Keystone API v2
         params_v2_admin = params.copy()
         params_v2_admin['endpoint_type'] = CONF.identity.v2_admin_endpoint_type
-        self.endpoints_client = EndpointsClient(self.auth_provider,
-                                                **params_v2_admin)
-        self.identity_client = IdentityClient(self.auth_provider,
-                                              **params_v2_admin)
-        self.tenants_client = TenantsClient(self.auth_provider,
-                                            **params_v2_admin)
-        self.roles_client = RolesClient(self.auth_provider, **params_v2_admin)
-        self.users_client = UsersClient(self.auth_provider, **params_v2_admin)
-        self.identity_services_client = IdentityServicesClient(
-            self.auth_provider, **params_v2_admin)
+        self._set_lazy_client('endpoints_client', EndpointsClient,
+                              self.auth_provider, **params_v2_admin)
+        self._set_lazy_client('identity_client', IdentityClient,
+                              self.auth_provider, **params_v2_admin)
+        self._set_lazy_client('tenants_client', TenantsClient,
+                              self.auth_provider, **params_v2_admin)
+        self._set_lazy_client('roles_client', RolesClient, self.auth_provider,
+                              **params_v2_admin)
+        self._set_lazy_client('users_client', UsersClient, self.auth_provider,
+                              **params_v2_admin)
+        self._set_lazy_client('identity_services_client',
+                              IdentityServicesClient, self.auth_provider,
+                              **params_v2_admin)
 
         # Clients below use the public endpoint type of Keystone API v2
         params_v2_public = params.copy()
         params_v2_public['endpoint_type'] = (
             CONF.identity.v2_public_endpoint_type)
-        self.identity_public_client = IdentityClient(self.auth_provider,
-                                                     **params_v2_public)
-        self.tenants_public_client = TenantsClient(self.auth_provider,
-                                                   **params_v2_public)
-        self.users_public_client = UsersClient(self.auth_provider,
-                                               **params_v2_public)
+        self._set_lazy_client('identity_public_client', IdentityClient,
+                              self.auth_provider, **params_v2_public)
+        self._set_lazy_client('tenants_public_client', TenantsClient,
+                              self.auth_provider, **params_v2_public)
+        self._set_lazy_client('users_public_client', UsersClient,
+                              self.auth_provider, **params_v2_public)
 
         # Clients below use the endpoint type of Keystone API v3
         params_v3 = params.copy()
         params_v3['endpoint_type'] = CONF.identity.v3_endpoint_type
-        self.domains_client = DomainsClient(self.auth_provider,
-                                            **params_v3)
-        self.identity_v3_client = IdentityV3Client(self.auth_provider,
-                                                   **params_v3)
-        self.trusts_client = TrustsClient(self.auth_provider, **params_v3)
-        self.users_v3_client = UsersV3Client(self.auth_provider, **params_v3)
-        self.endpoints_v3_client = EndPointsV3Client(self.auth_provider,
-                                                     **params_v3)
-        self.roles_v3_client = RolesV3Client(self.auth_provider, **params_v3)
-        self.identity_services_v3_client = IdentityServicesV3Client(
-            self.auth_provider, **params_v3)
-        self.policies_client = PoliciesClient(self.auth_provider, **params_v3)
-        self.projects_client = ProjectsClient(self.auth_provider, **params_v3)
-        self.regions_client = RegionsClient(self.auth_provider, **params_v3)
-        self.credentials_client = CredentialsClient(self.auth_provider,
-                                                    **params_v3)
-        self.groups_client = GroupsClient(self.auth_provider, **params_v3)
+        self._set_lazy_client('domains_client', DomainsClient,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('identity_v3_client', IdentityV3Client,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('trusts_client', TrustsClient,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('users_v3_client', UsersV3Client,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('endpoints_v3_client', EndPointsV3Client,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('roles_v3_client', RolesV3Client,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('identity_services_v3_client',
+                              IdentityServicesV3Client, self.auth_provider,
+                              **params_v3)
+        self._set_lazy_client('policies_client', PoliciesClient,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('projects_client', ProjectsClient,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('regions_client', RegionsClient,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('credentials_client', CredentialsClient,
+                              self.auth_provider, **params_v3)
+        self._set_lazy_client('groups_client', GroupsClient,
+                              self.auth_provider, **params_v3)
 
         # Token clients do not use the catalog. They only need default_params.
         # They read auth_url, so they should only be set if the corresponding
@@ -560,47 +646,55 @@ class Manager(manager.Manager):
         }
         params.update(self.default_params)
 
-        self.volume_qos_client = QosSpecsClient(self.auth_provider,
-                                                **params)
-        self.volume_qos_v2_client = QosSpecsV2Client(
-            self.auth_provider, **params)
-        self.volume_services_client = VolumeServicesClient(
-            self.auth_provider, **params)
-        self.volume_services_v2_client = VolumeServicesV2Client(
-            self.auth_provider, **params)
-        self.backups_client = BackupsClient(self.auth_provider, **params)
-        self.backups_v2_client = BackupsV2Client(self.auth_provider,
-                                                 **params)
-        self.snapshots_client = SnapshotsClient(self.auth_provider,
-                                                **params)
-        self.snapshots_v2_client = SnapshotsV2Client(self.auth_provider,
-                                                     **params)
-        self.volumes_client = VolumesClient(
-            self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volumes_v2_client = VolumesV2Client(
-            self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volume_types_client = VolumeTypesClient(self.auth_provider,
-                                                     **params)
-        self.volume_types_v2_client = VolumeTypesV2Client(
-            self.auth_provider, **params)
-        self.volume_hosts_client = VolumeHostsClient(self.auth_provider,
-                                                     **params)
-        self.volume_hosts_v2_client = VolumeHostsV2Client(
-            self.auth_provider, **params)
-        self.volume_quotas_client = VolumeQuotasClient(self.auth_provider,
-                                                       **params)
-        self.volume_quotas_v2_client = VolumeQuotasV2Client(self.auth_provider,
-                                                            **params)
-        self.volumes_extension_client = VolumeExtensionsClient(
-            self.auth_provider, **params)
-        self.volumes_v2_extension_client = VolumeExtensionsV2Client(
-            self.auth_provider, **params)
-        self.volume_availability_zone_client = \
-            VolumeAvailabilityZoneClient(self.auth_provider, **params)
-        self.volume_v2_availability_zone_client = \
-            VolumeAvailabilityZoneV2Client(self.auth_provider, **params)
+        self._set_lazy_client('volume_qos_client', QosSpecsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_qos_v2_client', QosSpecsV2Client,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_services_client', VolumeServicesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_services_v2_client',
+                              VolumeServicesV2Client, self.auth_provider,
+                              **params)
+        self._set_lazy_client('backups_client', BackupsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('backups_v2_client', BackupsV2Client,
+                              self.auth_provider, **params)
+        self._set_lazy_client('snapshots_client', SnapshotsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('snapshots_v2_client', SnapshotsV2Client,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volumes_client', VolumesClient,
+                              self.auth_provider,
+                              default_volume_size=CONF.volume.volume_size,
+                              **params)
+        self._set_lazy_client('volumes_v2_client', VolumesV2Client,
+                              self.auth_provider,
+                              default_volume_size=CONF.volume.volume_size,
+                              **params)
+        self._set_lazy_client('volume_types_client', VolumeTypesClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_types_v2_client', VolumeTypesV2Client,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_hosts_client', VolumeHostsClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_hosts_v2_client', VolumeHostsV2Client,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_quotas_client', VolumeQuotasClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volume_quotas_v2_client', VolumeQuotasV2Client,
+                              self.auth_provider, **params)
+        self._set_lazy_client('volumes_extension_client',
+                              VolumeExtensionsClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('volumes_v2_extension_client',
+                              VolumeExtensionsV2Client, self.auth_provider,
+                              **params)
+        self._set_lazy_client('volume_availability_zone_client',
+                              VolumeAvailabilityZoneClient, self.auth_provider,
+                              **params)
+        self._set_lazy_client('volume_v2_availability_zone_client',
+                              VolumeAvailabilityZoneV2Client,
+                              self.auth_provider, **params)
 
     def _set_object_storage_clients(self):
         params = {
@@ -610,6 +704,9 @@ class Manager(manager.Manager):
         }
         params.update(self.default_params_with_timeout_values)
 
-        self.account_client = AccountClient(self.auth_provider, **params)
-        self.container_client = ContainerClient(self.auth_provider, **params)
-        self.object_client = ObjectClient(self.auth_provider, **params)
+        self._set_lazy_client('account_client', AccountClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('container_client', ContainerClient,
+                              self.auth_provider, **params)
+        self._set_lazy_client('object_client', ObjectClient,
+                              self.auth_provider, **params)
@@ -48,8 +48,17 @@ saved_state.json and based on the **--delete-tempest-conf-objects** flag.
 By default the tempest and alternate tempest users and tenants are not
 deleted and the admin user specified in tempest.conf is never deleted.
 
+**--concurrency**: Maximum number of resources deleted at once in a
+tenant. The services are cleaned up in dependency order (e.g. servers,
+then ports, then subnets, then networks), the independent ones together,
+and the resources deleted asynchronously are waited for before the
+resources depending on them are deleted.
+
+**--tenant-concurrency**: Maximum number of tenants cleaned up at once.
+
 Please run with **--help** to see full list of options.
 """
+from multiprocessing.pool import ThreadPool
 import sys
 import traceback
 
@@ -58,6 +67,7 @@ from oslo_log import log as logging
 from oslo_serialization import jsonutils as json
 
 from tempest import clients
+from tempest.cmd import cleanup_engine
 from tempest.cmd import cleanup_service
 from tempest.common import credentials_factory as credentials
 from tempest.common import identity
@@ -130,19 +140,25 @@ class TempestCleanup(command.Command):
         tenants = tenant_service.list()
         print ("Process %s tenants" % len(tenants))
 
-        # Loop through list of tenants and clean them up.
         for tenant in tenants:
             self._add_admin(tenant['id'])
-            self._clean_tenant(tenant)
+        # Clean the tenants up concurrently.
+        if tenants:
+            pool = ThreadPool(min(max(self.options.tenant_concurrency, 1),
+                                  len(tenants)))
+            try:
+                pool.map(self._clean_tenant, tenants, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
 
         kwargs = {'data': self.dry_run_data,
                   'is_dry_run': is_dry_run,
                   'saved_state_json': self.json_data,
                   'is_preserve': is_preserve,
                   'is_save_state': is_save_state}
-        for service in self.global_services:
-            svc = service(admin_mgr, **kwargs)
-            svc.run()
+        self._run_services(self.global_services, credentials.AdminManager,
+                           kwargs)
 
         if is_dry_run:
             with open(DRY_RUN_JSON, 'w+') as f:
@@ -173,17 +189,27 @@ class TempestCleanup(command.Command):
         kwargs = {"username": CONF.auth.admin_username,
                   "password": CONF.auth.admin_password,
                   "tenant_name": tenant['name']}
-        mgr = clients.Manager(credentials=credentials.get_credentials(
-            **kwargs))
+        creds = credentials.get_credentials(**kwargs)
         kwargs = {'data': tenant_data,
                   'is_dry_run': is_dry_run,
                   'saved_state_json': None,
                   'is_preserve': is_preserve,
                   'is_save_state': False,
                   'tenant_id': tenant_id}
-        for service in self.tenant_services:
-            svc = service(mgr, **kwargs)
-            svc.run()
+        self._run_services(self.tenant_services,
+                           lambda: clients.Manager(credentials=creds), kwargs)
+
+    def _run_services(self, services, manager_factory, kwargs):
+        if kwargs['is_dry_run'] or kwargs['is_save_state']:
+            mgr = manager_factory()
+            for service in services:
+                svc = service(mgr, **kwargs)
+                svc.run()
+        else:
+            engine = cleanup_engine.CleanupEngine(
+                services, manager_factory, kwargs,
+                concurrency=self.options.concurrency)
+            engine.run()
 
     def _init_admin_ids(self):
         tn_cl = self.admin_mgr.tenants_client
@@ -225,6 +251,14 @@ class TempestCleanup(command.Command):
                             help="Generate JSON file:" + DRY_RUN_JSON +
                             ", that reports the objects that would have "
                             "been deleted had a full cleanup been run.")
+        parser.add_argument('--concurrency', type=int, default=8,
+                            dest='concurrency',
+                            help="Maximum number of resources deleted at "
+                            "once in a tenant.")
+        parser.add_argument('--tenant-concurrency', type=int, default=4,
+                            dest='tenant_concurrency',
+                            help="Maximum number of tenants cleaned up at "
+                            "once.")
         return parser
 
     def get_description(self):
@@ -0,0 +1,165 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from multiprocessing.pool import ThreadPool
+import threading
+import time
+
+from oslo_log import log as logging
+
+from tempest.cmd import cleanup_service
+
+LOG = logging.getLogger(__name__)
+
+# Used when the client of a service has no build_timeout or build_interval
+DEFAULT_DELETE_TIMEOUT = 300
+DEFAULT_POLL_INTERVAL = 1
+
+
+class CleanupEngine(object):
+    """Deletes the resources of cleanup services concurrently.
+
+    The services are run in dependency order: a service only deletes its
+    resources once every resource of the services it depends on is gone,
+    while the services independent from each other are run together. Up
+    to concurrency resources are deleted at once, and at most
+    max_concurrent_deletions of each service. The asynchronous deletions
+    are then waited for, with a single list call per service and poll.
+
+    REST clients are not thread safe, so every thread uses the services
+    of its own manager, built with manager_factory.
+
+    :param services: the cleanup service classes to run
+    :param manager_factory: callable returning a clients manager
+    :param service_kwargs: keyword arguments of the services
+    :param dependencies: dict of service class -> list of the service
+                         classes it depends on
+    """
+
+    def __init__(self, services, manager_factory, service_kwargs,
+                 concurrency=8, dependencies=None):
+        self.services = list(services)
+        self.manager_factory = manager_factory
+        self.service_kwargs = service_kwargs
+        self.concurrency = max(concurrency, 1)
+        if dependencies is None:
+            dependencies = cleanup_service.SERVICE_DEPENDENCIES
+        self.dependencies = dict(
+            (service_cls, set(dependencies.get(service_cls, [])) &
+             set(self.services))
+            for service_cls in self.services)
+        self._semaphores = dict(
+            (service_cls, threading.BoundedSemaphore(
+                service_cls.max_concurrent_deletions))
+            for service_cls in self.services)
+        self._local = threading.local()
+
+    def _get_service(self, service_cls):
+        services = getattr(self._local, 'services', None)
+        if services is None:
+            self._local.manager = self.manager_factory()
+            services = self._local.services = {}
+        if service_cls not in services:
+            services[service_cls] = service_cls(self._local.manager,
+                                                **self.service_kwargs)
+        return services[service_cls]
+
+    def _get_waves(self):
+        """Yields the lists of services which can run together, in order."""
+        pending = list(self.services)
+        done = set()
+        while pending:
+            wave = [service_cls for service_cls in pending
+                    if self.dependencies[service_cls] <= done]
+            if not wave:
+                LOG.warning("Circular cleanup service dependencies: %s",
+                            [service_cls.__name__ for service_cls in pending])
+                wave = pending
+            yield wave
+            done.update(wave)
+            pending = [service_cls for service_cls in pending
+                       if service_cls not in done]
+
+    def _delete(self, task):
+        service_cls, resource = task
+        try:
+            with self._semaphores[service_cls]:
+                self._get_service(service_cls).delete_resource(resource)
+        except Exception:
+            LOG.exception("%s failed to delete %s", service_cls.__name__,
+                          resource)
+
+    @staticmethod
+    def _get_ids(resources):
+        return set(resource['id'] for resource in resources
+                   if isinstance(resource, dict) and 'id' in resource)
+
+    def _wait_for_deletions(self, pending):
+        """Waits until the {service: resource ids} resources are gone."""
+        start_time = time.time()
+        while pending:
+            interval = DEFAULT_POLL_INTERVAL
+            for svc, ids in list(pending.items()):
+                timeout = getattr(svc.client, 'build_timeout',
+                                  DEFAULT_DELETE_TIMEOUT)
+                interval = max(interval, getattr(svc.client, 'build_interval',
+                                                 DEFAULT_POLL_INTERVAL))
+                try:
+                    ids = ids & self._get_ids(svc.list())
+                except Exception:
+                    LOG.exception("%s failed to list the resources being "
+                                  "deleted", type(svc).__name__)
+                if not ids:
+                    del pending[svc]
+                elif time.time() - start_time > timeout:
+                    LOG.warning("%s resources still not deleted after %s "
+                                "seconds: %s", type(svc).__name__, timeout,
+                                sorted(ids))
+                    del pending[svc]
+                else:
+                    pending[svc] = ids
+            if pending:
+                time.sleep(interval)
+
+    def _run_wave(self, pool, wave):
+        listed = []
+        for service_cls in wave:
+            svc = self._get_service(service_cls)
+            resources = svc.list()
+            if resources is None:
+                # Services with nothing to list, e.g. quotas, delete all at
+                # once
+                svc.delete()
+            elif resources:
+                listed.append((service_cls, svc, resources))
+        # Interleave the services so they share the workers
+        tasks = []
+        for index in range(max([len(r) for _, _, r in listed] or [0])):
+            tasks.extend((service_cls, resources[index])
+                         for service_cls, _, resources in listed
+                         if index < len(resources))
+        if tasks:
+            pool.map(self._delete, tasks, chunksize=1)
+        self._wait_for_deletions(dict(
+            (svc, self._get_ids(resources))
+            for _, svc, resources in listed if svc.wait_for_deletion))
+
+    def run(self):
+        pool = ThreadPool(self.concurrency)
+        try:
+            for wave in self._get_waves():
+                self._run_wave(pool, wave)
+        finally:
+            pool.close()
+            pool.join()
@@ -99,6 +99,12 @@ def _get_network_id(net_name, tenant_name):
 
 
 class BaseService(object):
+    # Whether the resources are deleted asynchronously, and have to be
+    # waited for before deleting the resources depending on them
+    wait_for_deletion = False
+    # Most deletions of the service sent at once by the cleanup engine
+    max_concurrent_deletions = 4
+
     def __init__(self, kwargs):
         self.client = None
         for key, value in kwargs.items():
@@ -122,9 +128,13 @@ class BaseService(object):
     def list(self):
         pass
 
-    def delete(self):
+    def delete_resource(self, resource):
         pass
 
+    def delete(self):
+        for resource in self.list():
+            self.delete_resource(resource)
+
     def dry_run(self):
         pass
 
@@ -141,6 +151,7 @@ class BaseService(object):
 
 
 class SnapshotService(BaseService):
+    wait_for_deletion = True
 
     def __init__(self, manager, **kwargs):
         super(SnapshotService, self).__init__(kwargs)
@@ -152,14 +163,12 @@ class SnapshotService(BaseService):
         LOG.debug("List count, %s Snapshots" % len(snaps))
         return snaps
 
-    def delete(self):
-        snaps = self.list()
+    def delete_resource(self, snap):
         client = self.client
-        for snap in snaps:
-            try:
-                client.delete_snapshot(snap['id'])
-            except Exception:
-                LOG.exception("Delete Snapshot exception.")
+        try:
+            client.delete_snapshot(snap['id'])
+        except Exception:
+            LOG.exception("Delete Snapshot exception.")
 
     def dry_run(self):
         snaps = self.list()
@@ -167,6 +176,8 @@ class SnapshotService(BaseService):
 
 
 class ServerService(BaseService):
+    wait_for_deletion = True
+
     def __init__(self, manager, **kwargs):
         super(ServerService, self).__init__(kwargs)
         self.client = manager.servers_client
@@ -179,14 +190,12 @@ class ServerService(BaseService):
         LOG.debug("List count, %s Servers" % len(servers))
         return servers
 
-    def delete(self):
+    def delete_resource(self, server):
         client = self.client
-        servers = self.list()
-        for server in servers:
-            try:
-                client.delete_server(server['id'])
-            except Exception:
-                LOG.exception("Delete Server exception.")
+        try:
+            client.delete_server(server['id'])
+        except Exception:
+            LOG.exception("Delete Server exception.")
 
     def dry_run(self):
         servers = self.list()
@@ -194,6 +203,7 @@ class ServerService(BaseService):
 
 
 class ServerGroupService(ServerService):
+    wait_for_deletion = False
 
     def list(self):
         client = self.server_groups_client
@@ -201,14 +211,12 @@ class ServerGroupService(ServerService):
         LOG.debug("List count, %s Server Groups" % len(sgs))
         return sgs
 
-    def delete(self):
+    def delete_resource(self, sg):
         client = self.client
-        sgs = self.list()
-        for sg in sgs:
-            try:
-                client.delete_server_group(sg['id'])
-            except Exception:
-                LOG.exception("Delete Server Group exception.")
+        try:
+            client.delete_server_group(sg['id'])
+        except Exception:
+            LOG.exception("Delete Server Group exception.")
 
     def dry_run(self):
         sgs = self.list()
@@ -216,6 +224,8 @@ class ServerGroupService(ServerService):
 
 
 class StackService(BaseService):
+    wait_for_deletion = True
+
     def __init__(self, manager, **kwargs):
         super(StackService, self).__init__(kwargs)
         self.client = manager.orchestration_client
@@ -226,14 +236,12 @@ class StackService(BaseService):
         LOG.debug("List count, %s Stacks" % len(stacks))
         return stacks
 
-    def delete(self):
+    def delete_resource(self, stack):
         client = self.client
-        stacks = self.list()
-        for stack in stacks:
-            try:
-                client.delete_stack(stack['id'])
-            except Exception:
-                LOG.exception("Delete Stack exception.")
+        try:
+            client.delete_stack(stack['id'])
+        except Exception:
+            LOG.exception("Delete Stack exception.")
 
     def dry_run(self):
         stacks = self.list()
@@ -251,15 +259,13 @@ class KeyPairService(BaseService):
         LOG.debug("List count, %s Keypairs" % len(keypairs))
         return keypairs
 
-    def delete(self):
+    def delete_resource(self, k):
         client = self.client
-        keypairs = self.list()
-        for k in keypairs:
-            try:
-                name = k['keypair']['name']
-                client.delete_keypair(name)
-            except Exception:
-                LOG.exception("Delete Keypairs exception.")
+        try:
+            name = k['keypair']['name']
+            client.delete_keypair(name)
+        except Exception:
+            LOG.exception("Delete Keypairs exception.")
 
     def dry_run(self):
         keypairs = self.list()
@@ -278,14 +284,12 @@ class SecurityGroupService(BaseService):
         LOG.debug("List count, %s Security Groups" % len(secgrp_del))
         return secgrp_del
 
-    def delete(self):
+    def delete_resource(self, g):
         client = self.client
-        secgrp_del = self.list()
-        for g in secgrp_del:
-            try:
-                client.delete_security_group(g['id'])
-            except Exception:
-                LOG.exception("Delete Security Groups exception.")
+        try:
+            client.delete_security_group(g['id'])
+        except Exception:
+            LOG.exception("Delete Security Groups exception.")
 
     def dry_run(self):
         secgrp_del = self.list()
@@ -303,14 +307,12 @@ class FloatingIpService(BaseService):
         LOG.debug("List count, %s Floating IPs" % len(floating_ips))
         return floating_ips
 
-    def delete(self):
+    def delete_resource(self, f):
         client = self.client
-        floating_ips = self.list()
-        for f in floating_ips:
-            try:
-                client.delete_floating_ip(f['id'])
-            except Exception:
-                LOG.exception("Delete Floating IPs exception.")
+        try:
+            client.delete_floating_ip(f['id'])
+        except Exception:
+            LOG.exception("Delete Floating IPs exception.")
 
     def dry_run(self):
         floating_ips = self.list()
@@ -318,6 +320,8 @@ class FloatingIpService(BaseService):
 
 
 class VolumeService(BaseService):
+    wait_for_deletion = True
+
     def __init__(self, manager, **kwargs):
         super(VolumeService, self).__init__(kwargs)
         self.client = manager.volumes_client
@@ -328,14 +332,12 @@ class VolumeService(BaseService):
         LOG.debug("List count, %s Volumes" % len(vols))
         return vols
 
-    def delete(self):
+    def delete_resource(self, v):
         client = self.client
-        vols = self.list()
-        for v in vols:
-            try:
-                client.delete_volume(v['id'])
-            except Exception:
-                LOG.exception("Delete Volume exception.")
+        try:
+            client.delete_volume(v['id'])
+        except Exception:
+            LOG.exception("Delete Volume exception.")
 
     def dry_run(self):
         vols = self.list()
@@ -410,14 +412,12 @@ class NetworkService(BaseService):
         LOG.debug("List count, %s Networks" % networks)
         return networks
 
-    def delete(self):
+    def delete_resource(self, n):
         client = self.networks_client
-        networks = self.list()
-        for n in networks:
-            try:
-                client.delete_network(n['id'])
-            except Exception:
-                LOG.exception("Delete Network exception.")
+        try:
+            client.delete_network(n['id'])
+        except Exception:
+            LOG.exception("Delete Network exception.")
 
     def dry_run(self):
         networks = self.list()
@@ -433,14 +433,12 @@ class NetworkFloatingIpService(NetworkService):
         LOG.debug("List count, %s Network Floating IPs" % len(flips))
         return flips
 
-    def delete(self):
+    def delete_resource(self, flip):
         client = self.client
-        flips = self.list()
-        for flip in flips:
-            try:
-                client.delete_floatingip(flip['id'])
-            except Exception:
-                LOG.exception("Delete Network Floating IP exception.")
+        try:
+            client.delete_floatingip(flip['id'])
+        except Exception:
+            LOG.exception("Delete Network Floating IP exception.")
 
     def dry_run(self):
         flips = self.list()
@@ -460,21 +458,19 @@ class NetworkRouterService(NetworkService):
         LOG.debug("List count, %s Routers" % len(routers))
         return routers
 
-    def delete(self):
+    def delete_resource(self, router):
         client = self.routers_client
         ports_client = self.ports_client
-        routers = self.list()
-        for router in routers:
-            try:
-                rid = router['id']
-                ports = [port for port
-                         in ports_client.list_ports(device_id=rid)['ports']
-                         if port["device_owner"] == "network:router_interface"]
-                for port in ports:
-                    client.remove_router_interface(rid, port_id=port['id'])
-                client.delete_router(rid)
-            except Exception:
-                LOG.exception("Delete Router exception.")
+        try:
+            rid = router['id']
+            ports = [port for port
+                     in ports_client.list_ports(device_id=rid)['ports']
+                     if port["device_owner"] == "network:router_interface"]
+            for port in ports:
+                client.remove_router_interface(rid, port_id=port['id'])
+            client.delete_router(rid)
+        except Exception:
+            LOG.exception("Delete Router exception.")
 
     def dry_run(self):
         routers = self.list()
@@ -491,14 +487,12 @@ class NetworkHealthMonitorService(NetworkService):
         LOG.debug("List count, %s Health Monitors" % len(hms))
         return hms
 
-    def delete(self):
+    def delete_resource(self, hm):
         client = self.client
-        hms = self.list()
-        for hm in hms:
-            try:
-                client.delete_health_monitor(hm['id'])
-            except Exception:
-                LOG.exception("Delete Health Monitor exception.")
+        try:
+            client.delete_health_monitor(hm['id'])
+        except Exception:
+            LOG.exception("Delete Health Monitor exception.")
 
     def dry_run(self):
         hms = self.list()
@@ -515,14 +509,12 @@ class NetworkMemberService(NetworkService):
         LOG.debug("List count, %s Members" % len(members))
         return members
 
-    def delete(self):
+    def delete_resource(self, member):
         client = self.client
-        members = self.list()
-        for member in members:
-            try:
-                client.delete_member(member['id'])
-            except Exception:
-                LOG.exception("Delete Member exception.")
+        try:
+            client.delete_member(member['id'])
+        except Exception:
+            LOG.exception("Delete Member exception.")
 
     def dry_run(self):
         members = self.list()
@@ -539,14 +531,12 @@ class NetworkVipService(NetworkService):
         LOG.debug("List count, %s VIPs" % len(vips))
         return vips
 
-    def delete(self):
+    def delete_resource(self, vip):
         client = self.client
-        vips = self.list()
-        for vip in vips:
-            try:
-                client.delete_vip(vip['id'])
-            except Exception:
-                LOG.exception("Delete VIP exception.")
+        try:
+            client.delete_vip(vip['id'])
+        except Exception:
+            LOG.exception("Delete VIP exception.")
 
     def dry_run(self):
         vips = self.list()
@@ -563,14 +553,12 @@ class NetworkPoolService(NetworkService):
         LOG.debug("List count, %s Pools" % len(pools))
         return pools
 
-    def delete(self):
+    def delete_resource(self, pool):
         client = self.client
-        pools = self.list()
-        for pool in pools:
-            try:
-                client.delete_pool(pool['id'])
-            except Exception:
-                LOG.exception("Delete Pool exception.")
+        try:
+            client.delete_pool(pool['id'])
+        except Exception:
+            LOG.exception("Delete Pool exception.")
 
     def dry_run(self):
         pools = self.list()
@@ -587,14 +575,12 @@ class NetworkMeteringLabelRuleService(NetworkService):
         LOG.debug("List count, %s Metering Label Rules" % len(rules))
         return rules
 
-    def delete(self):
+    def delete_resource(self, rule):
         client = self.metering_label_rules_client
-        rules = self.list()
-        for rule in rules:
-            try:
-                client.delete_metering_label_rule(rule['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label Rule exception.")
+        try:
+            client.delete_metering_label_rule(rule['id'])
+        except Exception:
+            LOG.exception("Delete Metering Label Rule exception.")
 
     def dry_run(self):
         rules = self.list()
@@ -611,14 +597,12 @@ class NetworkMeteringLabelService(NetworkService):
         LOG.debug("List count, %s Metering Labels" % len(labels))
         return labels
 
-    def delete(self):
+    def delete_resource(self, label):
         client = self.metering_labels_client
-        labels = self.list()
-        for label in labels:
-            try:
-                client.delete_metering_label(label['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label exception.")
+        try:
+            client.delete_metering_label(label['id'])
+        except Exception:
+            LOG.exception("Delete Metering Label exception.")
 
     def dry_run(self):
         labels = self.list()
@@ -640,14 +624,12 @@ class NetworkPortService(NetworkService):
         LOG.debug("List count, %s Ports" % len(ports))
         return ports
 
-    def delete(self):
+    def delete_resource(self, port):
         client = self.ports_client
-        ports = self.list()
-        for port in ports:
-            try:
-                client.delete_port(port['id'])
-            except Exception:
-                LOG.exception("Delete Port exception.")
+        try:
+            client.delete_port(port['id'])
+        except Exception:
+            LOG.exception("Delete Port exception.")
 
     def dry_run(self):
         ports = self.list()
@@ -668,14 +650,12 @@ class NetworkSecGroupService(NetworkService):
         LOG.debug("List count, %s securtiy_groups" % len(secgroups))
         return secgroups
 
-    def delete(self):
+    def delete_resource(self, secgroup):
         client = self.client
-        secgroups = self.list()
-        for secgroup in secgroups:
-            try:
-                client.delete_secgroup(secgroup['id'])
-            except Exception:
-                LOG.exception("Delete security_group exception.")
+        try:
+            client.delete_secgroup(secgroup['id'])
+        except Exception:
+            LOG.exception("Delete security_group exception.")
 
     def dry_run(self):
         secgroups = self.list()
@@ -693,14 +673,12 @@ class NetworkSubnetService(NetworkService):
         LOG.debug("List count, %s Subnets" % len(subnets))
         return subnets
 
-    def delete(self):
+    def delete_resource(self, subnet):
         client = self.subnets_client
-        subnets = self.list()
-        for subnet in subnets:
-            try:
-                client.delete_subnet(subnet['id'])
-            except Exception:
-                LOG.exception("Delete Subnet exception.")
+        try:
+            client.delete_subnet(subnet['id'])
+        except Exception:
+            LOG.exception("Delete Subnet exception.")
 
     def dry_run(self):
         subnets = self.list()
@@ -719,14 +697,12 @@ class TelemetryAlarmService(BaseService):
         LOG.debug("List count, %s Alarms" % len(alarms))
         return alarms
 
-    def delete(self):
+    def delete_resource(self, alarm):
         client = self.client
-        alarms = self.list()
-        for alarm in alarms:
-            try:
-                client.delete_alarm(alarm['id'])
-            except Exception:
-                LOG.exception("Delete Alarms exception.")
+        try:
+            client.delete_alarm(alarm['id'])
+        except Exception:
+            LOG.exception("Delete Alarms exception.")
 
     def dry_run(self):
         alarms = self.list()
@@ -753,14 +729,12 @@ class FlavorService(BaseService):
         LOG.debug("List count, %s Flavors after reconcile" % len(flavors))
         return flavors
 
-    def delete(self):
+    def delete_resource(self, flavor):
         client = self.client
-        flavors = self.list()
-        for flavor in flavors:
-            try:
-                client.delete_flavor(flavor['id'])
-            except Exception:
-                LOG.exception("Delete Flavor exception.")
+        try:
+            client.delete_flavor(flavor['id'])
+        except Exception:
+            LOG.exception("Delete Flavor exception.")
 
     def dry_run(self):
         flavors = self.list()
@@ -790,14 +764,12 @@ class ImageService(BaseService):
         LOG.debug("List count, %s Images after reconcile" % len(images))
         return images
 
-    def delete(self):
+    def delete_resource(self, image):
         client = self.client
-        images = self.list()
-        for image in images:
-            try:
-                client.delete_image(image['id'])
-            except Exception:
-                LOG.exception("Delete Image exception.")
+        try:
+            client.delete_image(image['id'])
+        except Exception:
+            LOG.exception("Delete Image exception.")
 
     def dry_run(self):
         images = self.list()
@@ -840,13 +812,11 @@ class UserService(BaseService):
         LOG.debug("List count, %s Users after reconcile" % len(users))
         return users
 
-    def delete(self):
-        users = self.list()
-        for user in users:
-            try:
-                self.client.delete_user(user['id'])
-            except Exception:
-                LOG.exception("Delete User exception.")
+    def delete_resource(self, user):
+        try:
+            self.client.delete_user(user['id'])
+        except Exception:
+            LOG.exception("Delete User exception.")
 
     def dry_run(self):
         users = self.list()
@@ -880,13 +850,11 @@ class RoleService(BaseService):
             LOG.exception("Cannot retrieve Roles.")
             return []
 
-    def delete(self):
-        roles = self.list()
-        for role in roles:
-            try:
-                self.client.delete_role(role['id'])
-            except Exception:
-                LOG.exception("Delete Role exception.")
+    def delete_resource(self, role):
+        try:
+            self.client.delete_role(role['id'])
+        except Exception:
+            LOG.exception("Delete Role exception.")
 
     def dry_run(self):
         roles = self.list()
@@ -919,13 +887,11 @@ class TenantService(BaseService):
         LOG.debug("List count, %s Tenants after reconcile" % len(tenants))
         return tenants
 
-    def delete(self):
-        tenants = self.list()
-        for tenant in tenants:
-            try:
-                self.client.delete_tenant(tenant['id'])
-            except Exception:
-                LOG.exception("Delete Tenant exception.")
+    def delete_resource(self, tenant):
+        try:
+            self.client.delete_tenant(tenant['id'])
+        except Exception:
+            LOG.exception("Delete Tenant exception.")
 
     def dry_run(self):
         tenants = self.list()
@@ -954,15 +920,13 @@ class DomainService(BaseService):
         LOG.debug("List count, %s Domains after reconcile" % len(domains))
         return domains
 
-    def delete(self):
+    def delete_resource(self, domain):
         client = self.client
-        domains = self.list()
-        for domain in domains:
-            try:
-                client.update_domain(domain['id'], enabled=False)
-                client.delete_domain(domain['id'])
-            except Exception:
-                LOG.exception("Delete Domain exception.")
+        try:
+            client.update_domain(domain['id'], enabled=False)
+            client.delete_domain(domain['id'])
+        except Exception:
+            LOG.exception("Delete Domain exception.")
 
     def dry_run(self):
         domains = self.list()
@@ -975,6 +939,22 @@ class DomainService(BaseService):
             self.data['domains'][domain['id']] = domain['name']
 
 
+# Services whose resources must all be deleted before the resources of a
+# service, e.g. the ports of a subnet before the subnet
+SERVICE_DEPENDENCIES = {
+    ServerGroupService: [ServerService],
+    SecurityGroupService: [ServerService],
+    VolumeService: [ServerService, SnapshotService],
+    NetworkMeteringLabelService: [NetworkMeteringLabelRuleService],
+    NetworkRouterService: [NetworkFloatingIpService],
+    NetworkPortService: [ServerService],
+    NetworkSubnetService: [NetworkPortService, NetworkRouterService],
+    NetworkService: [NetworkSubnetService],
+    NetworkSecGroupService: [ServerService, NetworkPortService],
+    DomainService: [TenantService, UserService],
+}
+
+
 def get_tenant_cleanup_services():
     tenant_services = []
     if IS_CEILOMETER:
@@ -52,6 +52,12 @@ retrieve artefacts (like images) that will be referenced in the resource files.
 describing your cloud. Javelin may use this to determine if certain services
 are enabled and modify its behavior accordingly.
 
+**-j/--concurrency**: (Optional) The number of resources of a same type
+created, checked or destroyed at once, 1 by default. Resources are still
+handled in dependency order, type after type, but e.g. all the servers are
+booted before any of them is waited for. Every thread keeps one authenticated
+client per user.
+
 
 Resource file
 -------------
@@ -107,8 +113,10 @@ verify that the correct resources exist.
 import argparse
 import collections
 import datetime
+from multiprocessing.pool import ThreadPool
 import os
 import sys
+import threading
 import unittest
 
 import netaddr
@@ -149,6 +157,12 @@ RES = collections.defaultdict(list)
 
 LOG = None
 
+# Pool running the resources of a same type concurrently, see
+# _run_concurrently, None to handle them one at a time
+POOL = None
+# The clients of each thread, REST clients are not thread safe
+_CLIENTS = threading.local()
+
 JAVELIN_START = datetime.datetime.utcnow()
 
 
@@ -303,20 +317,53 @@ def load_resources(fname):
     return yaml.load(open(fname, 'r'))
 
 
+def _get_client(user, pw, tenant):
+    """Returns the client of the current thread for a user.
+
+    Every thread authenticates once per user, instead of once per resource.
+    """
+    clients = getattr(_CLIENTS, 'clients', None)
+    if clients is None:
+        clients = _CLIENTS.clients = {}
+    key = (user, pw, tenant)
+    if key not in clients:
+        clients[key] = OSClient(user, pw, tenant)
+    return clients[key]
+
+
+def reset_clients():
+    """Drops the clients cached by the current thread."""
+    _CLIENTS.clients = {}
+
+
 def keystone_admin():
-    return OSClient(OPTS.os_username, OPTS.os_password, OPTS.os_tenant_name)
+    return _get_client(OPTS.os_username, OPTS.os_password,
+                       OPTS.os_tenant_name)
 
 
 def client_for_user(name):
     LOG.debug("Entering client_for_user")
     if name in USERS:
         user = USERS[name]
-        LOG.debug("Created client for user %s" % user)
-        return OSClient(user['name'], user['pass'], user['tenant'])
+        LOG.debug("Getting client for user %s" % user)
+        return _get_client(user['name'], user['pass'], user['tenant'])
     else:
         LOG.error("%s not found in USERS: %s" % (name, USERS))
 
 
+def _run_concurrently(func, items):
+    """Calls func on every item, in POOL when there is one.
+
+    Returns the results in the order of items, and raises the first error
+    once every call is done. func must not call _run_concurrently itself,
+    the workers of POOL would wait for each other.
+    """
+    items = list(items)
+    if POOL is None or len(items) < 2:
+        return [func(item) for item in items]
+    return POOL.map(func, items, chunksize=1)
+
+
 ###################
 #
 # TENANTS
@@ -333,18 +380,25 @@ def create_tenants(tenants):
     body = admin.tenants.list_tenants()['tenants']
     existing = [x['name'] for x in body]
     for tenant in tenants:
-        if tenant not in existing:
-            admin.tenants.create_tenant(tenant)['tenant']
-        else:
+        if tenant in existing:
             LOG.warning("Tenant '%s' already exists in this environment"
                         % tenant)
+    _run_concurrently(_create_tenant,
+                      [tenant for tenant in tenants if tenant not in existing])
+
+
+def _create_tenant(tenant):
+    keystone_admin().tenants.create_tenant(tenant)['tenant']
 
 
 def destroy_tenants(tenants):
+    _run_concurrently(_destroy_tenant, tenants)
+
+
+def _destroy_tenant(tenant):
     admin = keystone_admin()
-    for tenant in tenants:
-        tenant_id = identity.get_tenant_by_name(admin.tenant, tenant)['id']
-        admin.tenants.delete_tenant(tenant_id)
+    tenant_id = identity.get_tenant_by_name(admin.tenant, tenant)['id']
+    admin.tenants.delete_tenant(tenant_id)
 
 ##############
 #
@@ -390,48 +444,55 @@ def create_users(users):
 
     Don't create the tenants if they already exist.
     """
-    global USERS
     LOG.info("Creating users")
+    _run_concurrently(_create_user, users)
+
+
+def _create_user(u):
     admin = keystone_admin()
-    for u in users:
-        try:
-            tenant = identity.get_tenant_by_name(admin.tenants, u['tenant'])
-        except lib_exc.NotFound:
-            LOG.error("Tenant: %s - not found" % u['tenant'])
-            continue
-        try:
-            identity.get_user_by_username(admin.tenants,
-                                          tenant['id'], u['name'])
-            LOG.warning("User '%s' already exists in this environment"
-                        % u['name'])
-        except lib_exc.NotFound:
-            admin.users.create_user(
-                u['name'], u['pass'], tenant['id'],
-                "%s@%s" % (u['name'], tenant['id']),
-                enabled=True)
+    try:
+        tenant = identity.get_tenant_by_name(admin.tenants, u['tenant'])
+    except lib_exc.NotFound:
+        LOG.error("Tenant: %s - not found" % u['tenant'])
+        return
+    try:
+        identity.get_user_by_username(admin.tenants,
+                                      tenant['id'], u['name'])
+        LOG.warning("User '%s' already exists in this environment"
+                    % u['name'])
+    except lib_exc.NotFound:
+        admin.users.create_user(
+            u['name'], u['pass'], tenant['id'],
+            "%s@%s" % (u['name'], tenant['id']),
+            enabled=True)
 
 
 def destroy_users(users):
+    _run_concurrently(_destroy_user, users)
+
+
+def _destroy_user(user):
     admin = keystone_admin()
-    for user in users:
-        tenant_id = identity.get_tenant_by_name(admin.tenants,
-                                                user['tenant'])['id']
-        user_id = identity.get_user_by_username(admin.tenants,
-                                                tenant_id, user['name'])['id']
-        admin.users.delete_user(user_id)
+    tenant_id = identity.get_tenant_by_name(admin.tenants,
+                                            user['tenant'])['id']
+    user_id = identity.get_user_by_username(admin.tenants,
+                                            tenant_id, user['name'])['id']
+    admin.users.delete_user(user_id)
 
 
 def collect_users(users):
-    global USERS
     LOG.info("Collecting users")
+    _run_concurrently(_collect_user, users)
+
+
+def _collect_user(u):
     admin = keystone_admin()
-    for u in users:
-        tenant = identity.get_tenant_by_name(admin.tenants, u['tenant'])
-        u['tenant_id'] = tenant['id']
-        USERS[u['name']] = u
-        body = identity.get_user_by_username(admin.tenants,
-                                             tenant['id'], u['name'])
-        USERS[u['name']]['id'] = body['id']
+    tenant = identity.get_tenant_by_name(admin.tenants, u['tenant'])
+    u['tenant_id'] = tenant['id']
+    body = identity.get_user_by_username(admin.tenants,
+                                         tenant['id'], u['name'])
+    u['id'] = body['id']
+    USERS[u['name']] = u
 
 
 class JavelinCheck(unittest.TestCase):
@@ -481,87 +542,95 @@ class JavelinCheck(unittest.TestCase):
         that things like tenantId didn't drift across versions.
         """
         LOG.info("checking users")
-        for name, user in six.iteritems(self.users):
-            client = keystone_admin()
-            found = client.users.show_user(user['id'])['user']
-            self.assertEqual(found['name'], user['name'])
-            self.assertEqual(found['tenantId'], user['tenant_id'])
-
-            # also ensure we can auth with that user, and do something
-            # on the cloud. We don't care about the results except that it
-            # remains authorized.
-            client = client_for_user(user['name'])
-            client.servers.list_servers()
+        _run_concurrently(self._check_user, six.itervalues(self.users))
+
+    def _check_user(self, user):
+        client = keystone_admin()
+        found = client.users.show_user(user['id'])['user']
+        self.assertEqual(found['name'], user['name'])
+        self.assertEqual(found['tenantId'], user['tenant_id'])
+
+        # also ensure we can auth with that user, and do something
+        # on the cloud. We don't care about the results except that it
+        # remains authorized.
+        client = client_for_user(user['name'])
+        client.servers.list_servers()
 
     def check_objects(self):
         """Check that the objects created are still there."""
         if not self.res.get('objects'):
             return
         LOG.info("checking objects")
-        for obj in self.res['objects']:
-            client = client_for_user(obj['owner'])
-            r, contents = client.objects.get_object(
-                obj['container'], obj['name'])
-            source = _file_contents(obj['file'])
-            self.assertEqual(contents, source)
+        _run_concurrently(self._check_object, self.res['objects'])
+
+    def _check_object(self, obj):
+        client = client_for_user(obj['owner'])
+        r, contents = client.objects.get_object(
+            obj['container'], obj['name'])
+        source = _file_contents(obj['file'])
+        self.assertEqual(contents, source)
 
     def check_servers(self):
         """Check that the servers are still up and running."""
         if not self.res.get('servers'):
             return
         LOG.info("checking servers")
-        for server in self.res['servers']:
-            client = client_for_user(server['owner'])
-            found = _get_server_by_name(client, server['name'])
-            self.assertIsNotNone(
-                found,
-                "Couldn't find expected server %s" % server['name'])
-
-            found = client.servers.show_server(found['id'])['server']
-            # validate neutron is enabled and ironic disabled:
-            if (CONF.service_available.neutron and
-                    not CONF.baremetal.driver_enabled):
-                _floating_is_alive = False
-                for network_name, body in found['addresses'].items():
-                    for addr in body:
-                        ip = addr['addr']
-                        # Use floating IP, fixed IP or other type to
-                        # reach the server.
-                        # This is useful in multi-node environment.
-                        if CONF.validation.connect_method == 'floating':
-                            if addr.get('OS-EXT-IPS:type',
-                                        'floating') == 'floating':
-                                self._ping_ip(ip, 60)
-                                _floating_is_alive = True
-                        elif CONF.validation.connect_method == 'fixed':
-                            if addr.get('OS-EXT-IPS:type',
-                                        'fixed') == 'fixed':
-                                namespace = _get_router_namespace(client,
-                                                                  network_name)
-                                self._ping_ip(ip, 60, namespace)
-                        else:
+        _run_concurrently(self._check_server, self.res['servers'])
+
+    def _check_server(self, server):
+        client = client_for_user(server['owner'])
+        found = _get_server_by_name(client, server['name'])
+        self.assertIsNotNone(
+            found,
+            "Couldn't find expected server %s" % server['name'])
+
+        found = client.servers.show_server(found['id'])['server']
+        # validate neutron is enabled and ironic disabled:
+        if (CONF.service_available.neutron and
+                not CONF.baremetal.driver_enabled):
+            _floating_is_alive = False
+            for network_name, body in found['addresses'].items():
+                for addr in body:
+                    ip = addr['addr']
+                    # Use floating IP, fixed IP or other type to
+                    # reach the server.
+                    # This is useful in multi-node environment.
+                    if CONF.validation.connect_method == 'floating':
+                        if addr.get('OS-EXT-IPS:type',
+                                    'floating') == 'floating':
                             self._ping_ip(ip, 60)
-                # If CONF.validation.connect_method is floating, validate
-                # that the floating IP is attached to the server and the
-                # the server is pingable.
-                if CONF.validation.connect_method == 'floating':
-                    self.assertTrue(_floating_is_alive,
-                                    "Server %s has no floating IP." %
-                                    server['name'])
-            else:
-                addr = found['addresses']['private'][0]['addr']
-                self._ping_ip(addr, 60)
+                            _floating_is_alive = True
+                    elif CONF.validation.connect_method == 'fixed':
+                        if addr.get('OS-EXT-IPS:type',
+                                    'fixed') == 'fixed':
+                            namespace = _get_router_namespace(client,
+                                                              network_name)
+                            self._ping_ip(ip, 60, namespace)
+                    else:
+                        self._ping_ip(ip, 60)
+            # If CONF.validation.connect_method is floating, validate
+            # that the floating IP is attached to the server and the
+            # the server is pingable.
+            if CONF.validation.connect_method == 'floating':
+                self.assertTrue(_floating_is_alive,
+                                "Server %s has no floating IP." %
+                                server['name'])
+        else:
+            addr = found['addresses']['private'][0]['addr']
+            self._ping_ip(addr, 60)
 
     def check_secgroups(self):
         """Check that the security groups still exist."""
         LOG.info("Checking security groups")
-        for secgroup in self.res['secgroups']:
-            client = client_for_user(secgroup['owner'])
-            found = _get_resource_by_name(client.secgroups, 'security_groups',
-                                          secgroup['name'])
-            self.assertIsNotNone(
-                found,
-                "Couldn't find expected secgroup %s" % secgroup['name'])
+        _run_concurrently(self._check_secgroup, self.res['secgroups'])
+
+    def _check_secgroup(self, secgroup):
+        client = client_for_user(secgroup['owner'])
+        found = _get_resource_by_name(client.secgroups, 'security_groups',
+                                      secgroup['name'])
+        self.assertIsNotNone(
+            found,
+            "Couldn't find expected secgroup %s" % secgroup['name'])
 
     def check_telemetry(self):
         """Check that ceilometer provides a sane sample.
@@ -575,32 +644,36 @@ class JavelinCheck(unittest.TestCase):
         if not self.res.get('telemetry'):
             return
         LOG.info("checking telemetry")
-        for server in self.res['servers']:
-            client = client_for_user(server['owner'])
-            body = client.telemetry.list_samples(
-                'instance',
-                query=('metadata.display_name', 'eq', server['name'])
-            )
-            self.assertTrue(len(body) >= 1, 'expecting at least one sample')
-            self._confirm_telemetry_sample(server, body[-1])
+        _run_concurrently(self._check_server_telemetry, self.res['servers'])
+
+    def _check_server_telemetry(self, server):
+        client = client_for_user(server['owner'])
+        body = client.telemetry.list_samples(
+            'instance',
+            query=('metadata.display_name', 'eq', server['name'])
+        )
+        self.assertTrue(len(body) >= 1, 'expecting at least one sample')
+        self._confirm_telemetry_sample(server, body[-1])
 
     def check_volumes(self):
         """Check that the volumes are still there and attached."""
         if not self.res.get('volumes'):
             return
         LOG.info("checking volumes")
-        for volume in self.res['volumes']:
-            client = client_for_user(volume['owner'])
-            vol_body = _get_volume_by_name(client, volume['name'])
-            self.assertIsNotNone(
-                vol_body,
-                "Couldn't find expected volume %s" % volume['name'])
-
-            # Verify that a volume's attachment retrieved
-            server_id = _get_server_by_name(client, volume['server'])['id']
-            attachment = client.volumes.get_attachment_from_volume(vol_body)
-            self.assertEqual(vol_body['id'], attachment['volume_id'])
-            self.assertEqual(server_id, attachment['server_id'])
+        _run_concurrently(self._check_volume, self.res['volumes'])
+
+    def _check_volume(self, volume):
+        client = client_for_user(volume['owner'])
+        vol_body = _get_volume_by_name(client, volume['name'])
+        self.assertIsNotNone(
+            vol_body,
+            "Couldn't find expected volume %s" % volume['name'])
+
+        # Verify that a volume's attachment retrieved
+        server_id = _get_server_by_name(client, volume['server'])['id']
+        attachment = client.volumes.get_attachment_from_volume(vol_body)
+        self.assertEqual(vol_body['id'], attachment['volume_id'])
+        self.assertEqual(server_id, attachment['server_id'])
 
     def _confirm_telemetry_sample(self, server, sample):
         """Check this sample matches the expected resource metadata."""
@@ -624,14 +697,19 @@ class JavelinCheck(unittest.TestCase):
 
     def check_networking(self):
         """Check that the networks are still there."""
-        for res_type in ('networks', 'subnets', 'routers'):
-            for res in self.res[res_type]:
-                client = client_for_user(res['owner'])
-                found = _get_resource_by_name(client.networks, res_type,
-                                              res['name'])
-                self.assertIsNotNone(
-                    found,
-                    "Couldn't find expected resource %s" % res['name'])
+        _run_concurrently(self._check_network_resource,
+                          [(res_type, res)
+                           for res_type in ('networks', 'subnets', 'routers')
+                           for res in self.res[res_type]])
+
+    def _check_network_resource(self, args):
+        res_type, res = args
+        client = client_for_user(res['owner'])
+        found = _get_resource_by_name(client.networks, res_type,
+                                      res['name'])
+        self.assertIsNotNone(
+            found,
+            "Couldn't find expected resource %s" % res['name'])
 
 
 #######################
@@ -650,23 +728,29 @@ def create_objects(objects):
     if not objects:
         return
     LOG.info("Creating objects")
-    for obj in objects:
-        LOG.debug("Object %s" % obj)
-        swift_role = obj.get('swift_role', 'Member')
-        _assign_swift_role(obj['owner'], swift_role)
-        client = client_for_user(obj['owner'])
-        client.containers.create_container(obj['container'])
-        client.objects.create_object(
-            obj['container'], obj['name'],
-            _file_contents(obj['file']))
+    _run_concurrently(_create_object, objects)
+
+
+def _create_object(obj):
+    LOG.debug("Object %s" % obj)
+    swift_role = obj.get('swift_role', 'Member')
+    _assign_swift_role(obj['owner'], swift_role)
+    client = client_for_user(obj['owner'])
+    client.containers.create_container(obj['container'])
+    client.objects.create_object(
+        obj['container'], obj['name'],
+        _file_contents(obj['file']))
 
 
 def destroy_objects(objects):
-    for obj in objects:
-        client = client_for_user(obj['owner'])
-        r, body = client.objects.delete_object(obj['container'], obj['name'])
-        if not (200 <= int(r['status']) < 299):
-            raise ValueError("unable to destroy object: [%s] %s" % (r, body))
+    _run_concurrently(_destroy_object, objects)
+
+
+def _destroy_object(obj):
+    client = client_for_user(obj['owner'])
+    r, body = client.objects.delete_object(obj['container'], obj['name'])
+    if not (200 <= int(r['status']) < 299):
+        raise ValueError("unable to destroy object: [%s] %s" % (r, body))
 
 
 #######################
@@ -694,58 +778,64 @@ def create_images(images):
     if not images:
         return
     LOG.info("Creating images")
-    for image in images:
-        client = client_for_user(image['owner'])
-
-        # DEPRECATED: 'format' was used for ami images
-        # Use 'disk_format' and 'container_format' instead
-        if 'format' in image:
-            LOG.warning("Deprecated: 'format' is deprecated for images "
-                        "description. Please use 'disk_format' and 'container_"
-                        "format' instead.")
-            image['disk_format'] = image['format']
-            image['container_format'] = image['format']
-
-        # only upload a new image if the name isn't there
-        if _get_image_by_name(client, image['name']):
-            LOG.info("Image '%s' already exists" % image['name'])
-            continue
-
-        # special handling for 3 part image
-        extras = {}
-        if image['disk_format'] == 'ami':
-            name, fname = _resolve_image(image, 'aki')
-            aki = client.images.create_image(
-                'javelin_' + name, 'aki', 'aki')
-            client.images.store_image_file(aki.get('id'), open(fname, 'r'))
-            extras['kernel_id'] = aki.get('id')
-
-            name, fname = _resolve_image(image, 'ari')
-            ari = client.images.create_image(
-                'javelin_' + name, 'ari', 'ari')
-            client.images.store_image_file(ari.get('id'), open(fname, 'r'))
-            extras['ramdisk_id'] = ari.get('id')
-
-        _, fname = _resolve_image(image, 'file')
-        body = client.images.create_image(
-            image['name'], image['container_format'],
-            image['disk_format'], **extras)
-        image_id = body.get('id')
-        client.images.store_image_file(image_id, open(fname, 'r'))
+    _run_concurrently(_create_image, images)
+
+
+def _create_image(image):
+    client = client_for_user(image['owner'])
+
+    # DEPRECATED: 'format' was used for ami images
+    # Use 'disk_format' and 'container_format' instead
+    if 'format' in image:
+        LOG.warning("Deprecated: 'format' is deprecated for images "
+                    "description. Please use 'disk_format' and 'container_"
+                    "format' instead.")
+        image['disk_format'] = image['format']
+        image['container_format'] = image['format']
+
+    # only upload a new image if the name isn't there
+    if _get_image_by_name(client, image['name']):
+        LOG.info("Image '%s' already exists" % image['name'])
+        return
+
+    # special handling for 3 part image
+    extras = {}
+    if image['disk_format'] == 'ami':
+        name, fname = _resolve_image(image, 'aki')
+        aki = client.images.create_image(
+            'javelin_' + name, 'aki', 'aki')
+        client.images.store_image_file(aki.get('id'), open(fname, 'r'))
+        extras['kernel_id'] = aki.get('id')
+
+        name, fname = _resolve_image(image, 'ari')
+        ari = client.images.create_image(
+            'javelin_' + name, 'ari', 'ari')
+        client.images.store_image_file(ari.get('id'), open(fname, 'r'))
+        extras['ramdisk_id'] = ari.get('id')
+
+    _, fname = _resolve_image(image, 'file')
+    body = client.images.create_image(
+        image['name'], image['container_format'],
+        image['disk_format'], **extras)
+    image_id = body.get('id')
+    client.images.store_image_file(image_id, open(fname, 'r'))
 
 
 def destroy_images(images):
     if not images:
         return
     LOG.info("Destroying images")
-    for image in images:
-        client = client_for_user(image['owner'])
+    _run_concurrently(_destroy_image, images)
 
-        response = _get_image_by_name(client, image['name'])
-        if not response:
-            LOG.info("Image '%s' does not exist" % image['name'])
-            continue
-        client.images.delete_image(response['id'])
+
+def _destroy_image(image):
+    client = client_for_user(image['owner'])
+
+    response = _get_image_by_name(client, image['name'])
+    if not response:
+        LOG.info("Image '%s' does not exist" % image['name'])
+        return
+    client.images.delete_image(response['id'])
 
 
 #######################
@@ -786,105 +876,126 @@ def _get_resource_by_name(client, resource, name):
 
 def create_networks(networks):
     LOG.info("Creating networks")
-    for network in networks:
-        client = client_for_user(network['owner'])
+    _run_concurrently(_create_network, networks)
+
 
-        # only create a network if the name isn't here
-        body = client.networks.list_networks()
-        if any(item['name'] == network['name'] for item in body['networks']):
-            LOG.warning("Duplicated network name: %s" % network['name'])
-            continue
+def _create_network(network):
+    client = client_for_user(network['owner'])
+
+    # only create a network if the name isn't here
+    body = client.networks.list_networks()
+    if any(item['name'] == network['name'] for item in body['networks']):
+        LOG.warning("Duplicated network name: %s" % network['name'])
+        return
 
-        client.networks.create_network(name=network['name'])
+    client.networks.create_network(name=network['name'])
 
 
 def destroy_networks(networks):
     LOG.info("Destroying subnets")
-    for network in networks:
-        client = client_for_user(network['owner'])
-        network_id = _get_resource_by_name(client.networks, 'networks',
-                                           network['name'])['id']
-        client.networks.delete_network(network_id)
+    _run_concurrently(_destroy_network, networks)
+
+
+def _destroy_network(network):
+    client = client_for_user(network['owner'])
+    network_id = _get_resource_by_name(client.networks, 'networks',
+                                       network['name'])['id']
+    client.networks.delete_network(network_id)
 
 
 def create_subnets(subnets):
     LOG.info("Creating subnets")
-    for subnet in subnets:
-        client = client_for_user(subnet['owner'])
-
-        network = _get_resource_by_name(client.networks, 'networks',
-                                        subnet['network'])
-        ip_version = netaddr.IPNetwork(subnet['range']).version
-        # ensure we don't overlap with another subnet in the network
-        try:
-            client.networks.create_subnet(network_id=network['id'],
-                                          cidr=subnet['range'],
-                                          name=subnet['name'],
-                                          ip_version=ip_version)
-        except lib_exc.BadRequest as e:
-            is_overlapping_cidr = 'overlaps with another subnet' in str(e)
-            if not is_overlapping_cidr:
-                raise
+    _run_concurrently(_create_subnet, subnets)
+
+
+def _create_subnet(subnet):
+    client = client_for_user(subnet['owner'])
+
+    network = _get_resource_by_name(client.networks, 'networks',
+                                    subnet['network'])
+    ip_version = netaddr.IPNetwork(subnet['range']).version
+    # ensure we don't overlap with another subnet in the network
+    try:
+        client.networks.create_subnet(network_id=network['id'],
+                                      cidr=subnet['range'],
+                                      name=subnet['name'],
+                                      ip_version=ip_version)
+    except lib_exc.BadRequest as e:
+        is_overlapping_cidr = 'overlaps with another subnet' in str(e)
+        if not is_overlapping_cidr:
+            raise
 
 
 def destroy_subnets(subnets):
     LOG.info("Destroying subnets")
-    for subnet in subnets:
-        client = client_for_user(subnet['owner'])
-        subnet_id = _get_resource_by_name(client.subnets,
-                                          'subnets', subnet['name'])['id']
-        client.subnets.delete_subnet(subnet_id)
+    _run_concurrently(_destroy_subnet, subnets)
+
+
+def _destroy_subnet(subnet):
+    client = client_for_user(subnet['owner'])
+    subnet_id = _get_resource_by_name(client.subnets,
+                                      'subnets', subnet['name'])['id']
+    client.subnets.delete_subnet(subnet_id)
 
 
 def create_routers(routers):
     LOG.info("Creating routers")
-    for router in routers:
-        client = client_for_user(router['owner'])
+    _run_concurrently(_create_router, routers)
+
 
-        # only create a router if the name isn't here
-        body = client.routers.list_routers()
-        if any(item['name'] == router['name'] for item in body['routers']):
-            LOG.warning("Duplicated router name: %s" % router['name'])
-            continue
+def _create_router(router):
+    client = client_for_user(router['owner'])
+
+    # only create a router if the name isn't here
+    body = client.routers.list_routers()
+    if any(item['name'] == router['name'] for item in body['routers']):
+        LOG.warning("Duplicated router name: %s" % router['name'])
+        return
 
-        client.networks.create_router(name=router['name'])
+    client.networks.create_router(name=router['name'])
 
 
 def destroy_routers(routers):
     LOG.info("Destroying routers")
-    for router in routers:
-        client = client_for_user(router['owner'])
-        router_id = _get_resource_by_name(client.networks,
-                                          'routers', router['name'])['id']
-        for subnet in router['subnet']:
-            subnet_id = _get_resource_by_name(client.networks,
-                                              'subnets', subnet)['id']
-            client.routers.remove_router_interface(router_id,
-                                                   subnet_id=subnet_id)
-        client.routers.delete_router(router_id)
+    _run_concurrently(_destroy_router, routers)
+
+
+def _destroy_router(router):
+    client = client_for_user(router['owner'])
+    router_id = _get_resource_by_name(client.networks,
+                                      'routers', router['name'])['id']
+    for subnet in router['subnet']:
+        subnet_id = _get_resource_by_name(client.networks,
+                                          'subnets', subnet)['id']
+        client.routers.remove_router_interface(router_id,
+                                               subnet_id=subnet_id)
+    client.routers.delete_router(router_id)
 
 
 def add_router_interface(routers):
-    for router in routers:
-        client = client_for_user(router['owner'])
-        router_id = _get_resource_by_name(client.networks,
-                                          'routers', router['name'])['id']
-
-        for subnet in router['subnet']:
-            subnet_id = _get_resource_by_name(client.networks,
-                                              'subnets', subnet)['id']
-            # connect routers to their subnets
-            client.routers.add_router_interface(router_id,
-                                                subnet_id=subnet_id)
-        # connect routers to external network if set to "gateway"
-        if router['gateway']:
-            if CONF.network.public_network_id:
-                ext_net = CONF.network.public_network_id
-                client.routers._update_router(
-                    router_id, set_enable_snat=True,
-                    external_gateway_info={"network_id": ext_net})
-            else:
-                raise ValueError('public_network_id is not configured.')
+    _run_concurrently(_add_router_interfaces, routers)
+
+
+def _add_router_interfaces(router):
+    client = client_for_user(router['owner'])
+    router_id = _get_resource_by_name(client.networks,
+                                      'routers', router['name'])['id']
+
+    for subnet in router['subnet']:
+        subnet_id = _get_resource_by_name(client.networks,
+                                          'subnets', subnet)['id']
+        # connect routers to their subnets
+        client.routers.add_router_interface(router_id,
+                                            subnet_id=subnet_id)
+    # connect routers to external network if set to "gateway"
+    if router['gateway']:
+        if CONF.network.public_network_id:
+            ext_net = CONF.network.public_network_id
+            client.routers._update_router(
+                router_id, set_enable_snat=True,
+                external_gateway_info={"network_id": ext_net})
+        else:
+            raise ValueError('public_network_id is not configured.')
 
 
 #######################
@@ -913,92 +1024,115 @@ def create_servers(servers):
     if not servers:
         return
     LOG.info("Creating servers")
-    for server in servers:
-        client = client_for_user(server['owner'])
-
-        if _get_server_by_name(client, server['name']):
-            LOG.info("Server '%s' already exists" % server['name'])
-            continue
-
-        image_id = _get_image_by_name(client, server['image'])['id']
-        flavor_id = _get_flavor_by_name(client, server['flavor'])['id']
-        # validate neutron is enabled and ironic disabled
-        kwargs = dict()
-        if (CONF.service_available.neutron and
-                not CONF.baremetal.driver_enabled and server.get('networks')):
-            get_net_id = lambda x: (_get_resource_by_name(
-                client.networks, 'networks', x)['id'])
-            kwargs['networks'] = [{'uuid': get_net_id(network)}
-                                  for network in server['networks']]
-        body = client.servers.create_server(
-            name=server['name'], imageRef=image_id, flavorRef=flavor_id,
-            **kwargs)['server']
-        server_id = body['id']
-        client.servers.wait_for_server_status(server_id, 'ACTIVE')
-        # create security group(s) after server spawning
-        for secgroup in server['secgroups']:
-            client.servers.add_security_group(server_id, name=secgroup)
-        if CONF.validation.connect_method == 'floating':
-            floating_ip_pool = server.get('floating_ip_pool')
-            floating_ip = client.floating_ips.create_floating_ip(
-                pool_name=floating_ip_pool)['floating_ip']
-            client.floating_ips.associate_floating_ip_to_server(
-                floating_ip['ip'], server_id)
+    # Boot all the servers before waiting for any, so they build together
+    server_ids = _run_concurrently(_boot_server, servers)
+    _run_concurrently(_setup_server,
+                      [(server, server_id) for server, server_id
+                       in zip(servers, server_ids) if server_id])
+
+
+def _boot_server(server):
+    """Boots a server, returns its id or None if it already exists."""
+    client = client_for_user(server['owner'])
+
+    if _get_server_by_name(client, server['name']):
+        LOG.info("Server '%s' already exists" % server['name'])
+        return None
+
+    image_id = _get_image_by_name(client, server['image'])['id']
+    flavor_id = _get_flavor_by_name(client, server['flavor'])['id']
+    # validate neutron is enabled and ironic disabled
+    kwargs = dict()
+    if (CONF.service_available.neutron and
+            not CONF.baremetal.driver_enabled and server.get('networks')):
+        get_net_id = lambda x: (_get_resource_by_name(
+            client.networks, 'networks', x)['id'])
+        kwargs['networks'] = [{'uuid': get_net_id(network)}
+                              for network in server['networks']]
+    body = client.servers.create_server(
+        name=server['name'], imageRef=image_id, flavorRef=flavor_id,
+        **kwargs)['server']
+    return body['id']
+
+
+def _setup_server(args):
+    """Waits for a booted server and adds its secgroups and floating ip."""
+    server, server_id = args
+    client = client_for_user(server['owner'])
+    waiters.wait_for_server_status(client.servers, server_id, 'ACTIVE')
+    # create security group(s) after server spawning
+    for secgroup in server['secgroups']:
+        client.servers.add_security_group(server_id, name=secgroup)
+    if CONF.validation.connect_method == 'floating':
+        floating_ip_pool = server.get('floating_ip_pool')
+        floating_ip = client.floating_ips.create_floating_ip(
+            pool_name=floating_ip_pool)['floating_ip']
+        client.floating_ips.associate_floating_ip_to_server(
+            floating_ip['ip'], server_id)
 
 
 def destroy_servers(servers):
     if not servers:
         return
     LOG.info("Destroying servers")
-    for server in servers:
-        client = client_for_user(server['owner'])
+    _run_concurrently(_destroy_server, servers)
+
 
-        response = _get_server_by_name(client, server['name'])
-        if not response:
-            LOG.info("Server '%s' does not exist" % server['name'])
-            continue
+def _destroy_server(server):
+    client = client_for_user(server['owner'])
+
+    response = _get_server_by_name(client, server['name'])
+    if not response:
+        LOG.info("Server '%s' does not exist" % server['name'])
+        return
 
-        # TODO(EmilienM): disassociate floating IP from server and release it.
-        client.servers.delete_server(response['id'])
-        waiters.wait_for_server_termination(client.servers, response['id'],
-                                            ignore_error=True)
+    # TODO(EmilienM): disassociate floating IP from server and release it.
+    client.servers.delete_server(response['id'])
+    waiters.wait_for_server_termination(client.servers, response['id'],
+                                        ignore_error=True)
 
 
 def create_secgroups(secgroups):
     LOG.info("Creating security groups")
-    for secgroup in secgroups:
-        client = client_for_user(secgroup['owner'])
+    _run_concurrently(_create_secgroup, secgroups)
+
 
-        # only create a security group if the name isn't here
-        # i.e. a security group may be used by another server
-        # only create a router if the name isn't here
-        body = client.secgroups.list_security_groups()['security_groups']
-        if any(item['name'] == secgroup['name'] for item in body):
-            LOG.warning("Security group '%s' already exists" %
-                        secgroup['name'])
-            continue
-
-        body = client.secgroups.create_security_group(
-            name=secgroup['name'],
-            description=secgroup['description'])['security_group']
-        secgroup_id = body['id']
-        # for each security group, create the rules
-        for rule in secgroup['rules']:
-            ip_proto, from_port, to_port, cidr = rule.split()
-            client.secrules.create_security_group_rule(
-                parent_group_id=secgroup_id, ip_protocol=ip_proto,
-                from_port=from_port, to_port=to_port, cidr=cidr)
+def _create_secgroup(secgroup):
+    client = client_for_user(secgroup['owner'])
+
+    # only create a security group if the name isn't here
+    # i.e. a security group may be used by another server
+    # only create a router if the name isn't here
+    body = client.secgroups.list_security_groups()['security_groups']
+    if any(item['name'] == secgroup['name'] for item in body):
+        LOG.warning("Security group '%s' already exists" %
+                    secgroup['name'])
+        return
+
+    body = client.secgroups.create_security_group(
+        name=secgroup['name'],
+        description=secgroup['description'])['security_group']
+    secgroup_id = body['id']
+    # for each security group, create the rules
+    for rule in secgroup['rules']:
+        ip_proto, from_port, to_port, cidr = rule.split()
+        client.secrules.create_security_group_rule(
+            parent_group_id=secgroup_id, ip_protocol=ip_proto,
+            from_port=from_port, to_port=to_port, cidr=cidr)
 
 
 def destroy_secgroups(secgroups):
     LOG.info("Destroying security groups")
-    for secgroup in secgroups:
-        client = client_for_user(secgroup['owner'])
-        sg_id = _get_resource_by_name(client.secgroups,
-                                      'security_groups',
-                                      secgroup['name'])
-        # sg rules are deleted automatically
-        client.secgroups.delete_security_group(sg_id['id'])
+    _run_concurrently(_destroy_secgroup, secgroups)
+
+
+def _destroy_secgroup(secgroup):
+    client = client_for_user(secgroup['owner'])
+    sg_id = _get_resource_by_name(client.secgroups,
+                                  'security_groups',
+                                  secgroup['name'])
+    # sg rules are deleted automatically
+    client.secgroups.delete_security_group(sg_id['id'])
 
 
 #######################
@@ -1019,38 +1153,58 @@ def create_volumes(volumes):
     if not volumes:
         return
     LOG.info("Creating volumes")
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
+    # Create all the volumes before waiting for any
+    volume_ids = _run_concurrently(_create_volume, volumes)
+    _run_concurrently(_wait_for_volume,
+                      [(volume, volume_id) for volume, volume_id
+                       in zip(volumes, volume_ids) if volume_id])
+
 
-        # only create a volume if the name isn't here
-        if _get_volume_by_name(client, volume['name']):
-            LOG.info("volume '%s' already exists" % volume['name'])
-            continue
+def _create_volume(volume):
+    """Creates a volume, returns its id or None if it already exists."""
+    client = client_for_user(volume['owner'])
 
-        size = volume['gb']
-        v_name = volume['name']
-        body = client.volumes.create_volume(size=size,
-                                            display_name=v_name)['volume']
-        waiters.wait_for_volume_status(client.volumes, body['id'], 'available')
+    # only create a volume if the name isn't here
+    if _get_volume_by_name(client, volume['name']):
+        LOG.info("volume '%s' already exists" % volume['name'])
+        return None
+
+    size = volume['gb']
+    v_name = volume['name']
+    body = client.volumes.create_volume(size=size,
+                                        display_name=v_name)['volume']
+    return body['id']
+
+
+def _wait_for_volume(args):
+    volume, volume_id = args
+    client = client_for_user(volume['owner'])
+    waiters.wait_for_volume_status(client.volumes, volume_id, 'available')
 
 
 def destroy_volumes(volumes):
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
-        volume_id = _get_volume_by_name(client, volume['name'])['id']
-        client.volumes.detach_volume(volume_id)
-        client.volumes.delete_volume(volume_id)
+    _run_concurrently(_destroy_volume, volumes)
+
+
+def _destroy_volume(volume):
+    client = client_for_user(volume['owner'])
+    volume_id = _get_volume_by_name(client, volume['name'])['id']
+    client.volumes.detach_volume(volume_id)
+    client.volumes.delete_volume(volume_id)
 
 
 def attach_volumes(volumes):
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
-        server_id = _get_server_by_name(client, volume['server'])['id']
-        volume_id = _get_volume_by_name(client, volume['name'])['id']
-        device = volume['device']
-        client.volumes.attach_volume(volume_id,
-                                     instance_uuid=server_id,
-                                     mountpoint=device)
+    _run_concurrently(_attach_volume, volumes)
+
+
+def _attach_volume(volume):
+    client = client_for_user(volume['owner'])
+    server_id = _get_server_by_name(client, volume['server'])['id']
+    volume_id = _get_volume_by_name(client, volume['name'])['id']
+    device = volume['device']
+    client.volumes.attach_volume(volume_id,
+                                 instance_uuid=server_id,
+                                 mountpoint=device)
 
 
 #######################
@@ -1127,6 +1281,13 @@ def get_options():
         '-c', '--config-file',
         metavar='/etc/tempest.conf',
         help='path to javelin2(tempest) config file')
+    parser.add_argument(
+        '-j', '--concurrency',
+        type=int,
+        default=1,
+        metavar='<count>',
+        help='Number of resources of a same type handled at once, '
+             'defaults to 1')
 
     # auth bits, letting us also just source the devstack openrc
     parser.add_argument('--os-username',
@@ -1160,26 +1321,34 @@ def setup_logging():
 def main():
     print("Javelin is deprecated and will be removed from Tempest in the "
           "future.")
-    global RES
+    global RES, POOL
     get_options()
     setup_logging()
     RES.update(load_resources(OPTS.resources))
 
-    if OPTS.mode == 'create':
-        create_resources()
-        # Make sure the resources we just created actually work
-        checker = JavelinCheck(USERS, RES)
-        checker.check()
-    elif OPTS.mode == 'check':
-        collect_users(RES['users'])
-        checker = JavelinCheck(USERS, RES)
-        checker.check()
-    elif OPTS.mode == 'destroy':
-        collect_users(RES['users'])
-        destroy_resources()
-    else:
-        LOG.error('Unknown mode %s' % OPTS.mode)
-        return 1
+    if OPTS.concurrency > 1:
+        POOL = ThreadPool(OPTS.concurrency)
+    try:
+        if OPTS.mode == 'create':
+            create_resources()
+            # Make sure the resources we just created actually work
+            checker = JavelinCheck(USERS, RES)
+            checker.check()
+        elif OPTS.mode == 'check':
+            collect_users(RES['users'])
+            checker = JavelinCheck(USERS, RES)
+            checker.check()
+        elif OPTS.mode == 'destroy':
+            collect_users(RES['users'])
+            destroy_resources()
+        else:
+            LOG.error('Unknown mode %s' % OPTS.mode)
+            return 1
+    finally:
+        if POOL is not None:
+            POOL.close()
+            POOL.join()
+            POOL = None
     LOG.info('javelin2 successfully finished')
     return 0
 
@@ -12,6 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
+import collections
+from multiprocessing.pool import ThreadPool
+import threading
+
 import netaddr
 from oslo_log import log as logging
 import six
@@ -27,6 +32,97 @@ from tempest.lib import exceptions as lib_exc
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Pre-warmed credential pools of the process, by provider settings
+_prewarmed_pools = {}
+_prewarmed_pools_lock = threading.Lock()
+
+
+class _PrewarmedCredentialPool(object):
+    """Credential sets created ahead of demand by background threads.
+
+    Every thread creates the sets through its own DynamicCredentialProvider,
+    as REST clients are not thread safe, and the pool is refilled whenever
+    a set is taken.
+    """
+
+    def __init__(self, size, admin, provider_kwargs):
+        self.size = size
+        self.admin = admin
+        self._provider_kwargs = provider_kwargs
+        self._ready = collections.deque()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._workers = ThreadPool(size)
+        self._fill()
+
+    def _get_provider(self):
+        provider = getattr(self._local, 'provider', None)
+        if provider is None:
+            provider = DynamicCredentialProvider(**self._provider_kwargs)
+            self._local.provider = provider
+        return provider
+
+    def _create(self):
+        credentials = None
+        try:
+            provider = self._get_provider()
+            credentials = provider._create_creds(admin=self.admin)
+            provider._creds['prewarmed'] = credentials
+            provider._set_network_resources(credentials)
+            provider._creds = {}
+        except Exception:
+            LOG.exception("Failed to pre-warm dynamic credentials")
+            if credentials is not None:
+                provider.clear_creds()
+                credentials = None
+        with self._lock:
+            self._pending -= 1
+            if credentials is not None:
+                self._ready.append(credentials)
+
+    def _delete(self, credentials):
+        provider = self._get_provider()
+        provider._creds = {'prewarmed': credentials}
+        provider.clear_creds()
+
+    def _fill(self):
+        with self._lock:
+            missing = max(self.size - len(self._ready) - self._pending, 0)
+            self._pending += missing
+        for i in six.moves.xrange(missing):
+            self._workers.apply_async(self._create)
+
+    def take(self):
+        """Returns a ready credential set, or None if there is none yet."""
+        with self._lock:
+            credentials = self._ready.popleft() if self._ready else None
+        self._fill()
+        return credentials
+
+    def clear(self):
+        """Deletes the sets which were not taken, concurrently."""
+        self.size = 0
+        self._workers.close()
+        self._workers.join()
+        unused = list(self._ready)
+        self._ready.clear()
+        if unused:
+            LOG.info("Deleting %d unused pre-warmed dynamic credentials",
+                     len(unused))
+            workers = ThreadPool(len(unused))
+            workers.map(self._delete, unused)
+            workers.close()
+            workers.join()
+
+
+def _clear_prewarmed_pools():
+    with _prewarmed_pools_lock:
+        pools = list(_prewarmed_pools.values())
+        _prewarmed_pools.clear()
+    for pool in pools:
+        pool.clear()
+
 
 class DynamicCredentialProvider(cred_provider.CredentialProvider):
 
@@ -83,6 +179,32 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             self.domains_admin_client,
             self.creds_domain_name)
 
+    def _get_prewarmed_pool(self, admin):
+        """Returns the process pool of sets created with these settings.
+
+        The pool is created, and starts being filled, on the first call.
+        """
+        network_resources = self.network_resources
+        if network_resources is not None:
+            network_resources = tuple(sorted(network_resources.items()))
+        key = (admin, self.identity_version, str(self.default_admin_creds),
+               self.credentials_domain, self.admin_role, network_resources)
+        with _prewarmed_pools_lock:
+            pool = _prewarmed_pools.get(key)
+            if pool is None:
+                if not _prewarmed_pools:
+                    atexit.register(_clear_prewarmed_pools)
+                pool = _PrewarmedCredentialPool(
+                    CONF.auth.dynamic_credentials_pool_size, admin,
+                    dict(identity_version=self.identity_version,
+                         name='prewarmed',
+                         network_resources=self.network_resources,
+                         credentials_domain=self.credentials_domain,
+                         admin_role=self.admin_role,
+                         admin_creds=self.default_admin_creds))
+                _prewarmed_pools[key] = pool
+        return pool
+
     def _get_admin_clients(self):
         """Returns a tuple with instances of the following admin clients
 
@@ -249,10 +371,34 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
         self.routers_admin_client.add_router_interface(router_id,
                                                        subnet_id=subnet_id)
 
+    def _set_network_resources(self, credentials):
+        if (CONF.service_available.neutron and
+            not CONF.baremetal.driver_enabled and
+            CONF.auth.create_isolated_networks):
+            network, subnet, router = self._create_network_resources(
+                credentials.tenant_id)
+            credentials.set_resources(network=network, subnet=subnet,
+                                      router=router)
+            LOG.info("Created isolated network resources for : \n"
+                     + " credentials: %s" % credentials)
+
+    def _take_prewarmed_creds(self, credential_type):
+        if (CONF.auth.dynamic_credentials_pool_size <= 0 or
+                credential_type not in ['primary', 'alt', 'admin']):
+            return None
+        pool = self._get_prewarmed_pool(admin=(credential_type == 'admin'))
+        return pool.take()
+
     def get_credentials(self, credential_type):
         if self._creds.get(str(credential_type)):
             credentials = self._creds[str(credential_type)]
         else:
+            credentials = self._take_prewarmed_creds(credential_type)
+            if credentials is not None:
+                self._creds[str(credential_type)] = credentials
+                LOG.info("Acquired pre-warmed dynamic creds:\n"
+                         " credentials: %s" % credentials)
+                return credentials
             if credential_type in ['primary', 'alt', 'admin']:
                 is_admin = (credential_type == 'admin')
                 credentials = self._create_creds(admin=is_admin)
@@ -262,15 +408,7 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             # Maintained until tests are ported
             LOG.info("Acquired dynamic creds:\n credentials: %s"
                      % credentials)
-            if (CONF.service_available.neutron and
-                not CONF.baremetal.driver_enabled and
-                CONF.auth.create_isolated_networks):
-                network, subnet, router = self._create_network_resources(
-                    credentials.tenant_id)
-                credentials.set_resources(network=network, subnet=subnet,
-                                          router=router)
-                LOG.info("Created isolated network resources for : \n"
-                         + " credentials: %s" % credentials)
+            self._set_network_resources(credentials)
         return credentials
 
     def get_primary_creds(self):
@@ -17,6 +17,7 @@
 
 import copy
 import hashlib
+import os
 import posixpath
 import re
 import socket
@@ -34,6 +35,10 @@ from tempest import exceptions as exc
 LOG = logging.getLogger(__name__)
 USER_AGENT = 'tempest'
 CHUNKSIZE = 1024 * 64  # 64kB
+# Size of the chunks of the streamed image uploads and downloads
+STREAM_CHUNKSIZE = 1024 * 1024  # 1MB
+# Times an interrupted download is resumed before giving up
+DOWNLOAD_RETRIES = 3
 TOKEN_CHARS_RE = re.compile('^[-A-Za-z0-9+/=]*$')
 
 
@@ -87,6 +92,7 @@ class HTTPClient(object):
         Wrapper around httplib.HTTP(S)Connection.request to handle tasks such
         as setting headers and error handling.
         """
+        chunk_size = kwargs.pop('chunk_size', CHUNKSIZE)
         # Copy the kwargs so we can reuse the original in case of redirects
         kwargs['headers'] = copy.deepcopy(kwargs.get('headers', {}))
         kwargs['headers'].setdefault('User-Agent', USER_AGENT)
@@ -99,20 +105,19 @@ class HTTPClient(object):
             url_parts = urlparse.urlparse(url)
             conn_url = posixpath.normpath(url_parts.path)
             LOG.debug('Actual Path: {path}'.format(path=conn_url))
+            upload_checksum = None
             if kwargs['headers'].get('Transfer-Encoding') == 'chunked':
                 conn.putrequest(method, conn_url)
                 for header, value in kwargs['headers'].items():
                     conn.putheader(header, value)
                 conn.endheaders()
-                chunk = kwargs['body'].read(CHUNKSIZE)
-                # Chunk it, baby...
-                while chunk:
-                    conn.send('%x\r\n%s\r\n' % (len(chunk), chunk))
-                    chunk = kwargs['body'].read(CHUNKSIZE)
-                conn.send('0\r\n\r\n')
+                upload_checksum = _send_chunked(conn, kwargs['body'],
+                                                STREAM_CHUNKSIZE)
             else:
                 conn.request(method, conn_url, **kwargs)
             resp = conn.getresponse()
+            # The md5 of the streamed body, as glance computes it
+            resp.upload_checksum = upload_checksum
         except socket.gaierror as e:
             message = ("Error finding address for %(url)s: %(e)s" %
                        {'url': url, 'e': e})
@@ -122,14 +127,13 @@ class HTTPClient(object):
                        {'endpoint': self.endpoint, 'e': e})
             raise exc.TimeoutException(message)
 
-        body_iter = ResponseBodyIterator(resp)
+        body_iter = ResponseBodyIterator(resp, chunk_size)
         # Read body into string if it isn't obviously image data
         if resp.getheader('content-type', None) != 'application/octet-stream':
             body_str = ''.join([body_chunk for body_chunk in body_iter])
             body_iter = six.StringIO(body_str)
-            self._log_response(resp, None)
-        else:
-            self._log_response(resp, body_iter)
+        # Image data is streamed, it is never logged
+        self._log_response(resp, None)
 
         return resp, body_iter
 
@@ -175,6 +179,161 @@ class HTTPClient(object):
                 body=kwargs.get('body', None), filters=self.filters)
         return self._http_request(req_url, method, **kwargs)
 
+    def _get_image_size(self, url, resp):
+        """Returns the size and checksum of the image data at url.
+
+        They are read from the headers of resp, or from a HEAD request of
+        url when resp does not tell the size. Either is None when unknown.
+        """
+        size = _get_content_range_size(resp)
+        if size is None and resp.getheader('x-image-meta-size', None):
+            size = int(resp.getheader('x-image-meta-size'))
+        checksum = resp.getheader('x-image-meta-checksum', None)
+        if size is None:
+            head, body_iter = self.raw_request('HEAD', url)
+            for _ in body_iter:
+                pass
+            if head.status == 200:
+                size = (head.getheader('x-image-meta-size', None) or
+                        head.getheader('content-length', None))
+                size = int(size) if size is not None else None
+                checksum = checksum or head.getheader(
+                    'x-image-meta-checksum', None)
+        return size, checksum
+
+    def download(self, url, path, resume=True, checksum=None,
+                 retries=DOWNLOAD_RETRIES):
+        """Streams the image data of url into the file at path.
+
+        The data is written to disk as it is received, and hashed along
+        the way. With resume, an existing file is taken as the beginning
+        of the data and only the remaining bytes are requested. A
+        download interrupted by a connection error is resumed the same
+        way, up to retries times.
+
+        :param checksum: the expected md5 of the data, by default the one
+                         of the Content-MD5 header of a complete response
+                         or of the x-image-meta-checksum header
+        :returns: the response and the md5 of the file, or the response
+                  and its body when it is an error, left to the caller. The
+                  response is the 416 one of the range request when the
+                  file already held the whole data.
+        :raises ImageChecksumMismatch: if the data does not match checksum
+        """
+        md5 = hashlib.md5()
+        written = 0
+        if resume and os.path.exists(path):
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(STREAM_CHUNKSIZE), b''):
+                    md5.update(chunk)
+                    written += len(chunk)
+        while True:
+            headers = {}
+            if written:
+                headers['Range'] = 'bytes=%d-' % written
+            try:
+                resp, body_iter = self.raw_request(
+                    'GET', url, headers=headers, chunk_size=STREAM_CHUNKSIZE)
+                if written and resp.status == 416:
+                    for _ in body_iter:
+                        pass
+                    size, image_checksum = self._get_image_size(url, resp)
+                    if size == written:
+                        LOG.info("%s was already downloaded to %s", url,
+                                 path)
+                        break
+                if written and resp.status in (200, 416):
+                    # The whole data was sent, or the file is no prefix of
+                    # it: start over
+                    md5 = hashlib.md5()
+                    written = 0
+                    if resp.status == 416:
+                        continue
+                if resp.status not in (200, 206):
+                    return resp, body_iter
+                with open(path, 'r+b' if written else 'wb') as f:
+                    f.seek(written)
+                    f.truncate()
+                    for chunk in body_iter:
+                        f.write(chunk)
+                        md5.update(chunk)
+                        written += len(chunk)
+                break
+            except (socket.error, httplib.HTTPException,
+                    exc.TimeoutException) as e:
+                if retries <= 0:
+                    raise
+                retries -= 1
+                LOG.warning("Download of %s interrupted after %d bytes, "
+                            "resuming: %s", url, written, e)
+
+        if checksum is None:
+            # The md5 covers the resumed beginning of the file as well, so
+            # it is the one of the whole data in every case
+            if resp.status == 200:
+                checksum = resp.getheader('content-md5', None)
+            elif resp.status == 416:
+                checksum = image_checksum
+            checksum = checksum or resp.getheader('x-image-meta-checksum',
+                                                  None)
+        if checksum and checksum != md5.hexdigest():
+            raise exc.ImageChecksumMismatch(name=url, checksum=checksum,
+                                            actual=md5.hexdigest())
+        return resp, md5.hexdigest()
+
+
+def _get_content_range_size(resp):
+    """Returns the size in the Content-Range header of resp, if any."""
+    content_range = resp.getheader('content-range', None) or ''
+    size = content_range.rpartition('/')[2].strip()
+    return int(size) if size.isdigit() else None
+
+
+def _read_into(body, buf):
+    """Reads the next bytes of a file-like or mmap body into buf.
+
+    Returns the number of bytes read, 0 at the end of the body.
+    """
+    if hasattr(body, 'readinto'):
+        return body.readinto(buf) or 0
+    try:
+        # mmap objects are copied once, straight from the mapping
+        view = memoryview(body)
+    except TypeError:
+        data = body.read(len(buf))
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+    else:
+        position = body.tell()
+        data = view[position:position + len(buf)]
+        body.seek(position + len(data))
+    buf[:len(data)] = data
+    return len(data)
+
+
+def _send_chunked(conn, body, chunk_size):
+    """Sends body with the chunked transfer encoding, returns its md5.
+
+    Every frame is built in the same buffer, the data being read right
+    after the room left for the size line, and sent with a single call.
+    """
+    md5 = hashlib.md5()
+    room = len('%x\r\n' % chunk_size)
+    frame = bytearray(room + chunk_size + 2)
+    view = memoryview(frame)
+    while True:
+        size = _read_into(body, view[room:room + chunk_size])
+        if not size:
+            break
+        md5.update(view[room:room + size])
+        size_line = ('%x\r\n' % size).encode('ascii')
+        start = room - len(size_line)
+        frame[start:room] = size_line
+        frame[room + size:room + size + 2] = b'\r\n'
+        conn.send(view[start:room + size + 2])
+    conn.send(b'0\r\n\r\n')
+    return md5.hexdigest()
+
 
 class OpenSSLConnectionDelegator(object):
     """An OpenSSL.SSL.Connection delegator.
@@ -327,16 +486,18 @@ class VerifiedHTTPSConnection(httplib.HTTPSConnection):
 class ResponseBodyIterator(object):
     """A class that acts as an iterator over an HTTP response."""
 
-    def __init__(self, resp):
+    def __init__(self, resp, chunk_size=CHUNKSIZE):
         self.resp = resp
+        self.chunk_size = chunk_size
 
     def __iter__(self):
-        while True:
-            yield self.next()
+        return self
 
     def next(self):
-        chunk = self.resp.read(CHUNKSIZE)
+        chunk = self.resp.read(self.chunk_size)
         if chunk:
             return chunk
         else:
             raise StopIteration()
+
+    __next__ = next
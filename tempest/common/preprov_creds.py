@@ -12,10 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import errno
 import hashlib
 import os
+import random
 
-from oslo_concurrency import lockutils
 from oslo_log import log as logging
 import six
 import yaml
@@ -51,9 +52,10 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
 
         This credentials provider loads the details of pre-provisioned
         accounts from a YAML file, in the format specified by
-        `etc/accounts.yaml.sample`. It locks accounts while in use, using the
-        external locking mechanism, allowing for multiple python processes
-        to share a single account file, and thus running tests in parallel.
+        `etc/accounts.yaml.sample`. It locks accounts while in use, by
+        atomically creating a file per account in accounts_lock_dir,
+        allowing for multiple python processes to share a single account
+        file, and thus running tests in parallel.
 
         The accounts_lock_dir must be generated using `lockutils.get_lock_path`
         from the oslo.concurrency library. For instance:
@@ -168,32 +170,51 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
         return self.is_multi_user()
 
     def _create_hash_file(self, hash_string):
-        path = os.path.join(os.path.join(self.accounts_dir, hash_string))
-        if not os.path.isfile(path):
-            with open(path, 'w') as fd:
-                fd.write(self.name)
-            return True
-        return False
-
-    @lockutils.synchronized('test_accounts_io', external=True)
+        """Claims an account, returns False if it is already in use.
+
+        The claim is the atomic creation of the account lock file, so no
+        other lock is needed between the processes sharing the accounts.
+        """
+        path = os.path.join(self.accounts_dir, hash_string)
+        while True:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                             0o666)
+                break
+            except OSError as e:
+                if e.errno == errno.EEXIST:
+                    return False
+                if e.errno != errno.ENOENT:
+                    raise
+            # The lock dir does not exist yet, or was just removed when the
+            # last account in use was released
+            try:
+                os.mkdir(self.accounts_dir)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+        with os.fdopen(fd, 'w') as lock_file:
+            lock_file.write(self.name)
+        return True
+
     def _get_free_hash(self, hashes):
         # Cast as a list because in some edge cases a set will be passed in
         hashes = list(hashes)
-        if not os.path.isdir(self.accounts_dir):
-            os.mkdir(self.accounts_dir)
-            # Create File from first hash (since none are in use)
-            self._create_hash_file(hashes[0])
-            return hashes[0]
-        names = []
+        # Processes allocating accounts at the same time try them in a
+        # different order, so they seldom race for the same ones
+        random.shuffle(hashes)
         for _hash in hashes:
-            res = self._create_hash_file(_hash)
-            if res:
+            if self._create_hash_file(_hash):
                 return _hash
-            else:
-                path = os.path.join(os.path.join(self.accounts_dir,
-                                                 _hash))
+        names = []
+        for _hash in hashes:
+            path = os.path.join(self.accounts_dir, _hash)
+            try:
                 with open(path, 'r') as fd:
                     names.append(fd.read())
+            except IOError:
+                # Released in the meantime
+                pass
         msg = ('Insufficient number of users provided. %s have allocated all '
                'the credentials for this allocation request' % ','.join(names))
         raise lib_exc.InvalidCredentials(msg)
@@ -247,16 +268,23 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
         LOG.info('%s allocated creds:\n%s' % (self.name, clean_creds))
         return self._wrap_creds_with_network(free_hash)
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def remove_hash(self, hash_string):
         hash_path = os.path.join(self.accounts_dir, hash_string)
-        if not os.path.isfile(hash_path):
+        try:
+            os.remove(hash_path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
             LOG.warning('Expected an account lock file %s to remove, but '
                         'one did not exist' % hash_path)
-        else:
-            os.remove(hash_path)
-            if not os.listdir(self.accounts_dir):
-                os.rmdir(self.accounts_dir)
+            return
+        # Remove the lock dir along with the last account in use, rmdir
+        # only succeeds when it is empty
+        try:
+            os.rmdir(self.accounts_dir)
+        except OSError as e:
+            if e.errno not in (errno.ENOTEMPTY, errno.EEXIST, errno.ENOENT):
+                raise
 
     def get_hash(self, creds):
         for _hash in self.hash_dict['creds']:
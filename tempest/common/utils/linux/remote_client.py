@@ -12,12 +12,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
+import gzip
+import hashlib
+import io
 import os
 import netaddr
 import re
+import shutil
+import tarfile
+import tempfile
+import threading
 import time
 
 from oslo_log import log as logging
+from six.moves import shlex_quote
 
 from tempest import config
 from tempest import exceptions
@@ -29,15 +38,108 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+TEMPEST_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+LIS_DIR = os.path.join(TEMPEST_DIR, 'lis')
+
+CPU_SYSFS_DIR = '/sys/devices/system/cpu'
+_PROBE_MARKER = '@@probe@@'
+
+
+def _list_guest_scripts():
+    """Yields the paths of the scripts run on the guests with execute_script.
+
+    These are the files of every 'scripts' directory of the LIS tests,
+    and the scripts next to this module.
+    """
+    my_path = os.path.dirname(os.path.abspath(__file__))
+    for filename in sorted(os.listdir(my_path)):
+        if filename.endswith('.sh'):
+            yield os.path.join(my_path, filename)
+    for dirpath, dirnames, filenames in os.walk(LIS_DIR):
+        dirnames.sort()
+        if os.path.basename(dirpath).endswith('scripts'):
+            for filename in sorted(filenames):
+                yield os.path.join(dirpath, filename)
+
+
+def _parse_cpu_list(cpu_list):
+    """Parses a sysfs CPU list, e.g. '0-3,8', to a sorted list of ids."""
+    cpus = []
+    for item in (cpu_list or '').split(','):
+        if not item.strip():
+            continue
+        first, _, last = item.partition('-')
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return sorted(cpus)
+
+
+class ScriptBundle(object):
+    """Tarball of all the guest scripts, staged once on every guest.
+
+    The line endings of the scripts are normalized and they are made
+    executable when the bundle is built, so running a staged script takes
+    a single command. The bundle is built once per run and its content is
+    reproducible, so its digest names the directory it is extracted to on
+    the guests.
+    """
+
+    def __init__(self):
+        self.members = {}
+        data = io.BytesIO()
+        # NOTE: fixed gzip and tar mtimes keep the digest stable across runs
+        with gzip.GzipFile(fileobj=data, mode='wb', mtime=0) as gz:
+            with tarfile.open(fileobj=gz, mode='w') as tar:
+                for path in _list_guest_scripts():
+                    name = os.path.relpath(path, TEMPEST_DIR).replace(
+                        os.sep, '/')
+                    with open(path, 'rb') as f:
+                        content = f.read().replace(b'\r', b'')
+                    info = tarfile.TarInfo(name)
+                    info.size = len(content)
+                    info.mode = 0o755
+                    tar.addfile(info, io.BytesIO(content))
+                    self.members[os.path.realpath(path)] = name
+        data = data.getvalue()
+        name = 'lis-scripts-%s' % hashlib.sha1(data).hexdigest()[:12]
+        self.remote_dir = '/tmp/' + name
+        self._local_dir = tempfile.mkdtemp(prefix='tempest-')
+        atexit.register(shutil.rmtree, self._local_dir, True)
+        self.path = os.path.join(self._local_dir, name + '.tar.gz')
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def get_remote_path(self, source):
+        """Returns the path of a staged script or None if not bundled."""
+        name = self.members.get(os.path.realpath(source))
+        if name is not None:
+            return '%s/%s' % (self.remote_dir, name)
+
+
+_script_bundle = None
+_script_bundle_lock = threading.Lock()
+# (host, remote bundle directory) of the guests the bundle was staged on
+_staged_guests = set()
+
+
+def get_script_bundle():
+    global _script_bundle
+    with _script_bundle_lock:
+        if _script_bundle is None:
+            _script_bundle = ScriptBundle()
+        return _script_bundle
+
+
 class RemoteClientBase():
 
     def __init__(self, ip_address, username, password=None, pkey=None):
         ssh_timeout = CONF.validation.ssh_timeout
         connect_timeout = CONF.validation.connect_timeout
 
-        self.ssh_client = ssh.Client(ip_address, username, password,
-                                     ssh_timeout, pkey=pkey,
-                                     channel_timeout=connect_timeout)
+        self.ssh_client = ssh.Client(
+            ip_address, username, password, ssh_timeout, pkey=pkey,
+            channel_timeout=connect_timeout,
+            reuse_connection=CONF.validation.ssh_reuse_connections)
 
     def get_os_type(self):
         script_name = 'get_os.sh'
@@ -68,10 +170,55 @@ class RemoteClientBase():
         """
         self.ssh_client.test_connection_auth()
 
+    def stage_script_bundle(self, force=False):
+        """Copies and extracts the guest script bundle on the guest.
+
+        This is done once per guest, unless forced.
+
+        :returns: the bundle staged on the guest.
+        """
+        bundle = get_script_bundle()
+        key = (self.ssh_client.host, bundle.remote_dir)
+        if force or key not in _staged_guests:
+            self.copy_over(bundle.path, '/tmp/')
+            cmd = ('rm -rf %(dir)s.new; mkdir -p %(dir)s.new; '
+                   'tar -xzpf %(dir)s.tar.gz -C %(dir)s.new; '
+                   'rm -rf %(dir)s; mv %(dir)s.new %(dir)s') % {
+                'dir': bundle.remote_dir}
+            self.exec_command(cmd)
+            _staged_guests.add(key)
+        return bundle
+
+    def _is_script_bundle_staged(self, bundle):
+        cmd = '[ -d %s ] && echo staged || true' % bundle.remote_dir
+        return self.exec_command(cmd).strip() == 'staged'
+
+    def _execute_staged_script(self, script, cmd_args, destination):
+        command = 'cd %(dest)s; sudo %(script)s %(cmd_args)s' % {
+            'dest': destination,
+            'script': script,
+            'cmd_args': cmd_args}
+        return self.exec_command(command)
+
     def execute_script(self, cmd, cmd_params, source, destination):
         try:
-            self.copy_over(source, destination)
             cmd_args = ' '.join(str(x) for x in cmd_params)
+            bundle = get_script_bundle()
+            script = bundle.get_remote_path(source)
+            if script is not None:
+                self.stage_script_bundle()
+                try:
+                    return self._execute_staged_script(script, cmd_args,
+                                                       destination)
+                except tempest.lib.exceptions.SSHExecCommandFailed:
+                    # The guest may have lost the bundle, e.g. on reboot
+                    if self._is_script_bundle_staged(bundle):
+                        raise
+                    self.stage_script_bundle(force=True)
+                    return self._execute_staged_script(script, cmd_args,
+                                                       destination)
+
+            self.copy_over(source, destination)
             command = ("cd %(dest)s; chmod +x %(cmd)s; sed -i 's/\r//' %(cmd)s; "
                        'sudo ./%(cmd)s %(cmd_args)s') % {
                 'dest': destination,
@@ -346,32 +493,109 @@ class RemoteClient(RemoteClientBase):
             cmd += " -M do -s {mtu_size}".format(mtu_size=mtu_size)
         return self.exec_command(cmd)
 
-    def set_cpu_count_online(self, cpu_count):
-        total_cpus = int(self.exec_command('find /sys/devices/system/cpu/ '
-                                           '-maxdepth 1 -regextype sed '
-                                           '-regex ".*cpu[0-9]\+" | wc -l'))
-        if cpu_count > total_cpus:
-            raise Exception('Request is exceeding the number of online cpus')
+    def probe_files(self, reads=(), writes=None):
+        """Reads and writes many sysfs or procfs files in one round trip.
 
-        for i in range(cpu_count, total_cpus):
-            cmd = "echo 0 > /sys/devices/system/cpu/cpu{}/online".format(i)
-            self.exec_command(cmd)
+        :param reads: paths of the files to read
+        :param writes: dict of path -> value of the files to write, they are
+                       written in order before any file is read
+        :returns: dict of path -> stripped content of the files read, None
+                  for the ones which do not exist
+        """
+        commands = ['echo %s > %s' % (shlex_quote(str(value)),
+                                      shlex_quote(path))
+                    for path, value in (writes or {}).items()]
+        reads = list(reads)
+        for index, path in enumerate(reads):
+            commands.append('if [ -e %(path)s ]; then echo "%(marker)s %(i)d";'
+                            ' cat %(path)s; fi' % {'path': shlex_quote(path),
+                                                   'marker': _PROBE_MARKER,
+                                                   'i': index})
+        if not commands:
+            return {}
+        output = self.exec_command('; '.join(commands))
+        contents = dict((path, None) for path in reads)
+        lines = None
+        for line in output.splitlines():
+            if line.startswith(_PROBE_MARKER + ' '):
+                lines = []
+                contents[reads[int(line[len(_PROBE_MARKER) + 1:])]] = lines
+            elif lines is not None:
+                lines.append(line)
+        return dict((path, '\n'.join(lines).strip() if lines is not None
+                     else None) for path, lines in contents.items())
+
+    def get_meminfo(self):
+        """Returns /proc/meminfo as a dict of field -> value in kB."""
+        output = self.probe_files(['/proc/meminfo'])['/proc/meminfo']
+        meminfo = {}
+        for line in output.splitlines():
+            field, _, value = line.partition(':')
+            value = value.split()
+            if value:
+                meminfo[field.strip()] = int(value[0])
+        return meminfo
+
+    def get_cpus(self):
+        """Returns the ids of the present and of the online CPUs."""
+        paths = ['%s/present' % CPU_SYSFS_DIR, '%s/online' % CPU_SYSFS_DIR]
+        contents = self.probe_files(paths)
+        return tuple(_parse_cpu_list(contents[path]) for path in paths)
+
+    def set_cpus_online(self, cpus, online=True):
+        """Brings the given CPUs online or offline in one round trip."""
+        self.probe_files(writes=dict(
+            ('%s/cpu%d/online' % (CPU_SYSFS_DIR, cpu), int(online))
+            for cpu in cpus))
 
-    def kvp_verify_value(self, key, value, pool):
-        cmd = "chmod 755 /tmp/kvp_client; "
-        self.exec_command(cmd)
-        cmd = "/tmp/kvp_client {pool} | grep \"{key}; Value: {value}\"".format(
-            pool=pool, key=key, value=value)
+    def set_cpu_count_online(self, cpu_count):
+        present_cpus = self.get_cpus()[0]
+        if cpu_count > len(present_cpus):
+            raise Exception('Request is exceeding the number of online cpus')
+        self.set_cpus_online(present_cpus[cpu_count:], online=False)
 
-        """ kvp_client returned wrong exit code 4. Modified exec_command
-            so it could ignore exit status to work around the problem.
+    def kvp_read_values(self, pool):
+        """Returns the KVP items of a pool as a dict, from one kvp_client dump.
 
+        kvp_client lists at most 200 items per pool.
+        """
+        # NOTE: kvp_client returns wrong exit codes, e.g. 4, so the exit
+        # status is ignored and the dump is checked instead
+        output = self.exec_command(
+            "chmod 755 /tmp/kvp_client; /tmp/kvp_client {pool}".format(
+                pool=pool), ignore_exit_status=True)
+        if 'Pool is' not in output:
+            raise Exception("Failed to read KVP pool %s: %s" % (pool, output))
+        if 'More records available' in output:
+            LOG.warning("KVP pool %s holds more items than kvp_client lists",
+                        pool)
+        values = {}
+        for line in output.splitlines():
+            if line.startswith('Key: ') and '; Value: ' in line:
+                key, _, value = line[len('Key: '):].partition('; Value: ')
+                values[key] = value
+        return values
+
+    def kvp_verify_values(self, expected, pool, absent=()):
+        """Checks a whole set of KVP items with a single kvp_client dump.
+
+        :param expected: dict of key -> value the pool must hold
+        :param absent: keys the pool must not hold
+        :returns: the dict of all the KVP items of the pool
         """
-        output = self.exec_command(cmd, ignore_exit_status=True)
-        if "Value: {value}".format(value=value) in output:
-            return(output)
-        else:
-            raise Exception("Invalid KVP: " + output)
+        values = self.kvp_read_values(pool)
+        errors = ["%s: expected %s, got %s" % (key, value, values.get(key))
+                  for key, value in sorted(expected.items())
+                  if values.get(key) != str(value)]
+        errors.extend("%s: expected no value, got %s" % (key, values[key])
+                      for key in sorted(absent) if key in values)
+        if errors:
+            raise Exception("Invalid KVP items in pool %s:\n%s" % (
+                pool, "\n".join(errors)))
+        return values
+
+    def kvp_verify_value(self, key, value, pool):
+        return self.kvp_verify_values({key: value}, pool)
 
     def verify_memory_hotadd_support(self):
         cmd = "find /etc/udev/rules.d/ /lib/udev/rules.d/ -type f -exec grep -iEw \"SUBSYSTEM==\\\"memory\\\".*ACTION==\\\"add\\\".*ATTR{state}=\\\"online\\\"\" /dev/null {} +"
@@ -387,10 +611,7 @@ class RemoteClient(RemoteClientBase):
         self.exec_command(cmd)
 
     def memory_check(self, data="MemTotal"):
-        cmd = "cat /proc/meminfo | grep -i {data} | awk '{ print $2 }'".format(
-            data=data)
-        memory = self.exec_command(cmd)
-        return long(memory)
+        return self.get_meminfo()[data]
 
 
 class FedoraUtils(RemoteClient):
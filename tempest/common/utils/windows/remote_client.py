@@ -15,13 +15,265 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
+import base64
+import collections
+import threading
+import time
 
 from oslo_log import log
+from oslo_serialization import jsonutils as json
 from winrm import protocol
 
+from tempest import config
 
+CONF = config.CONF
 LOG = log.getLogger(__name__)
 SUCCESS_RETURN_CODE = 0
+# NOTE: WinRM runs commands through cmd.exe, which limits a command line
+# to 8191 characters, so larger batches are split into several scripts.
+MAX_COMMAND_LENGTH = 8000
+RESULT_MARKER = '#LIS-RESULT#'
+
+BATCH_SCRIPT_HEADER = """$__results = @()
+function __run([scriptblock]$operation, [bool]$stop) {
+    $r = @{output = $null; error = $null; exit_code = 0}
+    try {
+        $global:LASTEXITCODE = 0
+        if ($stop) { $ErrorActionPreference = 'Stop' }
+        $r.output = (& $operation | Out-String)
+        if ($LASTEXITCODE) { $r.exit_code = $LASTEXITCODE }
+    } catch {
+        $r.error = $_.ToString()
+        $r.exit_code = 1
+    }
+    $r
+}
+"""
+BATCH_OPERATION = "$__results += __run { %(operation)s } $%(stop)s\n"
+BATCH_SCRIPT_FOOTER = ("Write-Output '%s'\n"
+                       "ConvertTo-Json -InputObject @($__results) -Compress\n"
+                       % RESULT_MARKER)
+
+QUERY_SCRIPT = """function __plain($v) {
+    if ($v -is [array]) { return ,@($v | ForEach-Object { __plain $_ }) }
+    if ($v -is [enum] -or $v -is [guid] -or $v -is [timespan] -or
+        $v -is [datetime]) { return $v.ToString() }
+    return $v
+}
+$__objects = @(%(cmd)s | ForEach-Object {
+    $o = $_
+    $names = @(%(properties)s)
+    if (-not $names) {
+        $names = $o.PSObject.Properties | ForEach-Object { $_.Name }
+    }
+    $h = @{}
+    foreach ($name in $names) { $h[$name] = __plain $o.$name }
+    $h
+})
+Write-Output '%(marker)s'
+ConvertTo-Json -InputObject $__objects -Depth 3 -Compress
+"""
+
+BatchResult = collections.namedtuple(
+    'BatchResult', ['command', 'output', 'error', 'exit_code'])
+
+
+class ShellPool(object):
+    """Open WinRM shells kept per host endpoint and user.
+
+    Opening a shell costs a full WS-Management round trip, so shells are
+    returned to the pool after each command and handed out again to the
+    next one. Every shell runs a single command at a time; concurrent
+    callers simply get different shells. Shells idle for longer than
+    ``idle_timeout`` seconds are closed, and at most ``max_idle_shells``
+    are kept open per host.
+    """
+
+    def __init__(self, max_idle_shells=4, idle_timeout=600):
+        self.max_idle_shells = max_idle_shells
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._protocols = {}
+        self._idle = collections.defaultdict(collections.deque)
+
+    @staticmethod
+    def _close_shell(p, shell_id):
+        try:
+            p.close_shell(shell_id)
+        except Exception:
+            LOG.debug("Failed to close WinRM shell %s", shell_id,
+                      exc_info=True)
+
+    def acquire(self, key, protocol_factory):
+        """Returns a (protocol, shell_id, reused) tuple for key."""
+        expired = []
+        with self._lock:
+            p = self._protocols.get(key)
+            if p is None:
+                p = self._protocols[key] = protocol_factory()
+            idle = self._idle[key]
+            now = time.time()
+            shell_id = None
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used > self.idle_timeout:
+                    expired.append(candidate)
+                else:
+                    shell_id = candidate
+                    break
+        for expired_id in expired:
+            self._close_shell(p, expired_id)
+        if shell_id is not None:
+            return p, shell_id, True
+        return p, p.open_shell(), False
+
+    def release(self, key, p, shell_id):
+        """Hands a shell back to the pool once its command is done."""
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_shells:
+                idle.append((shell_id, time.time()))
+                return
+        self._close_shell(p, shell_id)
+
+    def discard(self, p, shell_id):
+        """Closes a shell that must not be used again."""
+        self._close_shell(p, shell_id)
+
+    def clear(self):
+        """Closes every idle shell."""
+        with self._lock:
+            entries = [(self._protocols[key], shell_id)
+                       for key, idle in self._idle.items()
+                       for shell_id, _ in idle]
+            self._idle.clear()
+        for p, shell_id in entries:
+            self._close_shell(p, shell_id)
+
+
+_shell_pool = ShellPool()
+atexit.register(_shell_pool.clear)
+
+
+def _format_kvargs(kvargs):
+    return " ".join(["-%s %s" % (k, v) for k, v in kvargs.items()])
+
+
+def _encode_command(script):
+    encoded = base64.b64encode(script.encode('utf-16-le'))
+    if not isinstance(encoded, str):
+        encoded = encoded.decode('ascii')
+    return 'powershell -EncodedCommand ' + encoded
+
+
+class PowerShellBatch(object):
+    """Host commands queued to run in a single PowerShell invocation.
+
+    Operations are added with the same arguments as
+    ``WinRemoteClient.run_powershell_cmd`` and
+    ``WinRemoteClient.get_powershell_cmd_attribute``. ``execute`` sends them
+    as one encoded script (or a few, when the script would not fit in one
+    command line) and returns a ``BatchResult`` per operation, in order.
+    Cmdlet errors are terminating inside the batch so one failed operation
+    is reported without stopping the following ones; scripts keep their
+    own error handling and report failure through their exit code.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._operations = []
+
+    def __len__(self):
+        return len(self._operations)
+
+    def _add(self, operation):
+        self._operations.append(operation)
+        return len(self._operations) - 1
+
+    def add_cmd(self, *args, **kvargs):
+        """Queues a cmdlet or script call, returns its result index."""
+        operation = "%s %s" % (" ".join(args), _format_kvargs(kvargs))
+        if args and args[0].lower().endswith('.ps1'):
+            operation = '& ' + operation
+        return self._add(operation.strip())
+
+    def add_cmd_attribute(self, cmd, attribute, **kvargs):
+        """Queues an attribute read of a cmdlet result."""
+        return self._add("(%s %s).%s" % (cmd, _format_kvargs(kvargs),
+                                         attribute))
+
+    @staticmethod
+    def _build_script(operations):
+        script = BATCH_SCRIPT_HEADER
+        for operation in operations:
+            stop = 'false' if operation.startswith('&') else 'true'
+            script += BATCH_OPERATION % {'operation': operation,
+                                         'stop': stop}
+        return script + BATCH_SCRIPT_FOOTER
+
+    def _split(self):
+        chunk = []
+        for operation in self._operations:
+            candidate = _encode_command(
+                self._build_script(chunk + [operation]))
+            if chunk and len(candidate) > MAX_COMMAND_LENGTH:
+                yield chunk
+                chunk = []
+            chunk.append(operation)
+        if chunk:
+            yield chunk
+
+    def _run(self, operations):
+        cmd = _encode_command(self._build_script(operations))
+        s_out, s_err, r_code = self.client.run_wsman_cmd(cmd)
+        if (r_code != SUCCESS_RETURN_CODE or
+                RESULT_MARKER not in s_out):
+            raise Exception("Batch execution failed with code %(code)s:\n"
+                            "Commands: %(cmd)s\n"
+                            "Output: %(output)s\n"
+                            "Error: %(error)s" % {
+                                'code': r_code,
+                                'cmd': '; '.join(operations),
+                                'output': s_out,
+                                'error': s_err})
+        host_output, _, data = s_out.rpartition(RESULT_MARKER)
+        if host_output.strip():
+            LOG.debug('Batch host output: %s', host_output)
+        return [BatchResult(operation, item['output'], item['error'],
+                            item['exit_code'])
+                for operation, item in zip(operations, json.loads(data))]
+
+    @staticmethod
+    def raise_for_errors(results):
+        """Raises an Exception describing every failed operation."""
+        failed = [r for r in results if r.exit_code != SUCCESS_RETURN_CODE]
+        if failed:
+            raise Exception("%(failed)d of %(total)d batched host commands "
+                            "failed:\n%(details)s" % {
+                                'failed': len(failed),
+                                'total': len(results),
+                                'details': "\n".join(
+                                    "Command: %s\nCode: %s\nOutput: %s\n"
+                                    "Error: %s" % (r.command, r.exit_code,
+                                                   r.output, r.error)
+                                    for r in failed)})
+
+    def execute(self, raise_on_error=True):
+        """Runs every queued operation and empties the queue.
+
+        :param raise_on_error: raise if any operation failed instead of
+                               just returning its result.
+        :returns: a list of BatchResult, one per queued operation.
+        """
+        results = []
+        for operations in self._split():
+            results.extend(self._run(operations))
+        self._operations = []
+        LOG.info('Batch of %d host commands executed', len(results))
+        if raise_on_error:
+            self.raise_for_errors(results)
+        return results
 
 
 class WinRemoteClient(object):
@@ -31,22 +283,68 @@ class WinRemoteClient(object):
         self.hostname = 'https://' + hostname + ':5986/wsman'
         self.username = username
         self.password = password
+        self.reuse_shells = CONF.host_credentials.host_reuse_shells
+        self._query_cache = {}
+
+    def _get_protocol(self):
+        return protocol.Protocol(endpoint=self.hostname,
+                                 transport='plaintext',
+                                 username=self.username,
+                                 password=self.password)
+
+    @staticmethod
+    def _get_command_output(p, shell_id, command_id):
+        std_out, std_err, status_code = p.get_command_output(
+            shell_id, command_id)
+        p.cleanup_command(shell_id, command_id)
+        return (std_out, std_err, status_code)
+
+    def _run_in_pooled_shell(self, cmd):
+        key = (self.hostname, self.username, self.password)
+        p, shell_id, reused = _shell_pool.acquire(key, self._get_protocol)
+        try:
+            command_id = p.run_command(shell_id, cmd)
+        except Exception as exc:
+            _shell_pool.discard(p, shell_id)
+            if not reused:
+                raise
+            # NOTE: the host may have dropped an idle shell; the command
+            # was never started, so it is safe to retry on a fresh one.
+            LOG.info("Pooled WinRM shell %s on %s is unusable (%s), "
+                     "opening a new one", shell_id, self.hostname, exc)
+            shell_id = p.open_shell()
+            try:
+                command_id = p.run_command(shell_id, cmd)
+            except Exception:
+                _shell_pool.discard(p, shell_id)
+                raise
+        try:
+            result = self._get_command_output(p, shell_id, command_id)
+        except Exception:
+            _shell_pool.discard(p, shell_id)
+            raise
+        _shell_pool.release(key, p, shell_id)
+        return result
 
     def run_wsman_cmd(self, cmd):
+        # NOTE: any command may change host state, so cached query results
+        # are only served until the next command runs on this host.
+        self._query_cache.clear()
+        return self._run_wsman_cmd(cmd)
+
+    def _run_wsman_cmd(self, cmd):
         protocol.Protocol.DEFAULT_TIMEOUT = "PT3600S"
         try:
-            p = protocol.Protocol(endpoint=self.hostname,
-                                  transport='plaintext',
-                                  username=self.username,
-                                  password=self.password)
+            if self.reuse_shells:
+                return self._run_in_pooled_shell(cmd)
 
+            p = self._get_protocol()
             shell_id = p.open_shell()
 
             command_id = p.run_command(shell_id, cmd)
-            std_out, std_err, status_code = p.get_command_output(
-                shell_id, command_id)
+            std_out, std_err, status_code = self._get_command_output(
+                p, shell_id, command_id)
 
-            p.cleanup_command(shell_id, command_id)
             p.close_shell(shell_id)
 
             return (std_out, std_err, status_code)
@@ -55,6 +353,10 @@ class WinRemoteClient(object):
             LOG.exception(exc)
             raise exc
 
+    def batch(self):
+        """Returns a PowerShellBatch running its commands on this host."""
+        return PowerShellBatch(self)
+
     def run_powershell_cmd(self, *args, **kvargs):
         list_args = " ".join(args)
         kv_args = " ".join(["-%s %s" % (k, v) for k, v in kvargs.iteritems()])
@@ -93,3 +395,58 @@ class WinRemoteClient(object):
         LOG.info('Command %(cmd)s result: %(output)s',
                  {'cmd': full_cmd, 'output': s_out})
         return s_out
+
+    def get_powershell_cmd_objects(self, cmd, properties=None, cache=False,
+                                   **kvargs):
+        """Returns the objects output by a cmdlet as a list of dicts.
+
+        The objects are serialized with ConvertTo-Json on the host, so many
+        attributes are read in a single call. Enum, guid, timespan and
+        datetime values are returned as strings.
+
+        :param cmd: the cmdlet to run, e.g. 'Get-VM'.
+        :param properties: names of the properties to return; all of them
+                           when None.
+        :param cache: serve the result from the query cache if the same
+                      query already ran and no other command has been run
+                      on this host since.
+        """
+        properties = tuple(properties or ())
+        key = (cmd, properties, tuple(sorted(kvargs.items())))
+        if cache and key in self._query_cache:
+            return self._query_cache[key]
+
+        script = QUERY_SCRIPT % {
+            'cmd': "%s %s" % (cmd, _format_kvargs(kvargs)),
+            'properties': ",".join("'%s'" % p for p in properties),
+            'marker': RESULT_MARKER}
+        s_out, s_err, r_code = self._run_wsman_cmd(_encode_command(script))
+        if (r_code != SUCCESS_RETURN_CODE or
+                RESULT_MARKER not in s_out):
+            raise Exception("Command execution failed with code %(code)s:\n"
+                            "Command: %(cmd)s\n"
+                            "Output: %(output)s\n"
+                            "Error: %(error)s" % {
+                                'code': r_code,
+                                'cmd': key,
+                                'output': s_out,
+                                'error': s_err})
+        objects = json.loads(s_out.rpartition(RESULT_MARKER)[2])
+        # Older PowerShell versions unroll single item and empty arrays
+        if objects is None:
+            objects = []
+        elif isinstance(objects, dict):
+            objects = [objects]
+        LOG.info('Query %(cmd)s result: %(objects)s',
+                 {'cmd': cmd, 'objects': objects})
+        self._query_cache[key] = objects
+        return objects
+
+    def get_powershell_cmd_object(self, cmd, properties=None, cache=False,
+                                  **kvargs):
+        """Returns the first object output by a cmdlet as a dict."""
+        objects = self.get_powershell_cmd_objects(cmd, properties, cache,
+                                                  **kvargs)
+        if not objects:
+            raise Exception("Command %s returned no object" % cmd)
+        return objects[0]
@@ -11,7 +11,11 @@
 #    under the License.
 
 
+import contextlib
+import functools
+import threading
 import time
+import weakref
 
 from oslo_log import log as logging
 
@@ -23,6 +27,202 @@ from tempest.lib import exceptions as lib_exc
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Upper bound of the shared polling interval, in build_interval units, which
+# the interval backs off to while none of the watched resources change.
+MAX_POLL_BACKOFF = 4
+
+
+def _updated_at(body):
+    return body.get('updated', body.get('updated_at'))
+
+
+def _show_server(client, server_id):
+    return client.show_server(server_id)['server']
+
+
+def _list_servers(client, since):
+    params = {'changes-since': since} if since else {}
+    return client.list_servers(detail=True, **params)['servers']
+
+
+def _show_image(client, image_id):
+    image = client.show_image(image_id)
+    # Compute image client return response wrapped in 'image' element
+    # which is not case with glance image client.
+    if 'image' in image:
+        image = image['image']
+    return image
+
+
+def _list_images(client, since):
+    params = {'changes-since': since} if since else {}
+    return client.list_images(detail=True, **params)['images']
+
+
+def _show_volume(client, volume_id):
+    return client.show_volume(volume_id)['volume']
+
+
+def _list_volumes(client, since):
+    return client.list_volumes(detail=True)['volumes']
+
+
+def _show_snapshot(client, snapshot_id):
+    return client.show_snapshot(snapshot_id)['snapshot']
+
+
+def _list_snapshots(client, since):
+    return client.list_snapshots(detail=True)['snapshots']
+
+
+# resource type: (show, list, whether list filters with changes-since)
+_POLLED_RESOURCES = {
+    'server': (_show_server, _list_servers, True),
+    'image': (_show_image, _list_images, True),
+    'volume': (_show_volume, _list_volumes, False),
+    'snapshot': (_show_snapshot, _list_snapshots, False),
+}
+
+
+class _StatusPoller(object):
+    """Shares the status polling of the waits on one client.
+
+    A lone wait polls its resource with a show call every build_interval.
+    While several waits are in progress on the same client, they are all
+    served by a single detailed list call per interval, filtered with
+    changes-since when the API supports it, and every waiter is woken up
+    with the latest body of its resource. The shared interval backs off
+    while none of the watched resources change.
+    """
+
+    def __init__(self, show, list_changes, changes_since):
+        self._show = show
+        self._list = list_changes
+        self._changes_since = changes_since
+        self._cond = threading.Condition()
+        self._watchers = {}
+        self._bodies = {}
+        self._waits = 0
+        self._round = 0
+        self._polling = False
+        self._interval = None
+
+    def watch(self, client, resource_id):
+        """Registers a wait and returns the current body of the resource."""
+        with self._cond:
+            self._watchers[resource_id] = self._watchers.get(resource_id,
+                                                             0) + 1
+            self._waits += 1
+        try:
+            body = self._show(client, resource_id)
+        except Exception:
+            self.unwatch(resource_id)
+            raise
+        with self._cond:
+            self._bodies[resource_id] = body
+        return body
+
+    def unwatch(self, resource_id):
+        with self._cond:
+            self._waits -= 1
+            self._watchers[resource_id] -= 1
+            if not self._watchers[resource_id]:
+                del self._watchers[resource_id]
+                self._bodies.pop(resource_id, None)
+
+    def _get_since(self):
+        if not self._changes_since:
+            return None
+        updated = [_updated_at(self._bodies[resource_id])
+                   for resource_id in self._watchers
+                   if self._bodies.get(resource_id)]
+        # Any later change of a watched resource is at least as recent as
+        # the oldest update seen so far
+        return min(updated) if updated else None
+
+    def _update(self, client, bodies):
+        listed = dict((body['id'], body) for body in bodies)
+        changed = False
+        for resource_id in self._watchers:
+            body = listed.get(resource_id)
+            if body is None:
+                # Gone from the full list, or left out of the changes, e.g.
+                # by a truncated listing: let the waiter show it rather than
+                # serve a stale body
+                self._bodies[resource_id] = None
+                continue
+            changed = changed or body != self._bodies.get(resource_id)
+            self._bodies[resource_id] = body
+        if changed or self._interval is None:
+            self._interval = client.build_interval
+        else:
+            self._interval = min(self._interval * 2,
+                                 client.build_interval * MAX_POLL_BACKOFF)
+
+    def next(self, client, resource_id):
+        """Waits for the next polling round and returns the resource."""
+        with self._cond:
+            shared = self._waits > 1 or self._polling
+            if not shared:
+                self._interval = None
+        if not shared:
+            time.sleep(client.build_interval)
+            body = self._show(client, resource_id)
+            with self._cond:
+                self._bodies[resource_id] = body
+            return body
+
+        with self._cond:
+            target = self._round + 1
+            while self._round < target:
+                if self._polling:
+                    self._cond.wait()
+                    continue
+                self._polling = True
+                since = self._get_since()
+                interval = self._interval or client.build_interval
+                self._cond.release()
+                try:
+                    time.sleep(interval)
+                    bodies = self._list(client, since)
+                finally:
+                    self._cond.acquire()
+                    self._polling = False
+                    self._cond.notify_all()
+                self._update(client, bodies)
+                self._round += 1
+            body = self._bodies.get(resource_id)
+        if body is None:
+            body = self._show(client, resource_id)
+            with self._cond:
+                if resource_id in self._watchers:
+                    self._bodies[resource_id] = body
+        return body
+
+
+_pollers = weakref.WeakKeyDictionary()
+_pollers_lock = threading.Lock()
+
+
+def _get_poller(client, resource_type):
+    with _pollers_lock:
+        client_pollers = _pollers.setdefault(client, {})
+        if resource_type not in client_pollers:
+            client_pollers[resource_type] = _StatusPoller(
+                *_POLLED_RESOURCES[resource_type])
+        return client_pollers[resource_type]
+
+
+@contextlib.contextmanager
+def _watch(client, resource_type, resource_id):
+    """Yields the current resource body and a callable polling it again."""
+    poller = _get_poller(client, resource_type)
+    body = poller.watch(client, resource_id)
+    try:
+        yield body, functools.partial(poller.next, client, resource_id)
+    finally:
+        poller.unwatch(resource_id)
+
 
 # NOTE(afazekas): This function needs to know a token and a subject.
 def wait_for_server_status(client, server_id, status, ready_wait=True,
@@ -34,67 +234,66 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
 
     # NOTE(afazekas): UNKNOWN status possible on ERROR
     # or in a very early stage.
-    body = client.show_server(server_id)['server']
-    old_status = server_status = body['status']
-    old_task_state = task_state = _get_task_state(body)
-    start_time = int(time.time())
-    timeout = client.build_timeout + extra_timeout
-    while True:
-        # NOTE(afazekas): Now the BUILD status only reached
-        # between the UNKNOWN->ACTIVE transition.
-        # TODO(afazekas): enumerate and validate the stable status set
-        if status == 'BUILD' and server_status != 'UNKNOWN':
-            return
-        if server_status == status:
-            if ready_wait:
-                if status == 'BUILD':
-                    return
-                # NOTE(afazekas): The instance is in "ready for action state"
-                # when no task in progress
-                # NOTE(afazekas): Converted to string because of the XML
-                # responses
-                if str(task_state) == "None":
-                    # without state api extension 3 sec usually enough
-                    time.sleep(CONF.compute.ready_wait)
-                    return
-            else:
+    with _watch(client, 'server', server_id) as (body, poll):
+        old_status = server_status = body['status']
+        old_task_state = task_state = _get_task_state(body)
+        start_time = int(time.time())
+        timeout = client.build_timeout + extra_timeout
+        while True:
+            # NOTE(afazekas): Now the BUILD status only reached
+            # between the UNKNOWN->ACTIVE transition.
+            # TODO(afazekas): enumerate and validate the stable status set
+            if status == 'BUILD' and server_status != 'UNKNOWN':
                 return
+            if server_status == status:
+                if ready_wait:
+                    if status == 'BUILD':
+                        return
+                    # NOTE(afazekas): The instance is in "ready for action
+                    # state" when no task in progress
+                    # NOTE(afazekas): Converted to string because of the XML
+                    # responses
+                    if str(task_state) == "None":
+                        # without state api extension 3 sec usually enough
+                        time.sleep(CONF.compute.ready_wait)
+                        return
+                else:
+                    return
 
-        time.sleep(client.build_interval)
-        body = client.show_server(server_id)['server']
-        server_status = body['status']
-        task_state = _get_task_state(body)
-        if (server_status != old_status) or (task_state != old_task_state):
-            LOG.info('State transition "%s" ==> "%s" after %d second wait',
-                     '/'.join((old_status, str(old_task_state))),
-                     '/'.join((server_status, str(task_state))),
-                     time.time() - start_time)
-        if (server_status == 'ERROR') and raise_on_error:
-            if 'fault' in body:
-                raise exceptions.BuildErrorException(body['fault'],
-                                                     server_id=server_id)
-            else:
-                raise exceptions.BuildErrorException(server_id=server_id)
-
-        timed_out = int(time.time()) - start_time >= timeout
-
-        if timed_out:
-            expected_task_state = 'None' if ready_wait else 'n/a'
-            message = ('Server %(server_id)s failed to reach %(status)s '
-                       'status and task state "%(expected_task_state)s" '
-                       'within the required time (%(timeout)s s).' %
-                       {'server_id': server_id,
-                        'status': status,
-                        'expected_task_state': expected_task_state,
-                        'timeout': timeout})
-            message += ' Current status: %s.' % server_status
-            message += ' Current task state: %s.' % task_state
-            caller = misc_utils.find_test_caller()
-            if caller:
-                message = '(%s) %s' % (caller, message)
-            raise exceptions.TimeoutException(message)
-        old_status = server_status
-        old_task_state = task_state
+            body = poll()
+            server_status = body['status']
+            task_state = _get_task_state(body)
+            if (server_status != old_status) or (task_state != old_task_state):
+                LOG.info('State transition "%s" ==> "%s" after %d second wait',
+                         '/'.join((old_status, str(old_task_state))),
+                         '/'.join((server_status, str(task_state))),
+                         time.time() - start_time)
+            if (server_status == 'ERROR') and raise_on_error:
+                if 'fault' in body:
+                    raise exceptions.BuildErrorException(body['fault'],
+                                                         server_id=server_id)
+                else:
+                    raise exceptions.BuildErrorException(server_id=server_id)
+
+            timed_out = int(time.time()) - start_time >= timeout
+
+            if timed_out:
+                expected_task_state = 'None' if ready_wait else 'n/a'
+                message = ('Server %(server_id)s failed to reach %(status)s '
+                           'status and task state "%(expected_task_state)s" '
+                           'within the required time (%(timeout)s s).' %
+                           {'server_id': server_id,
+                            'status': status,
+                            'expected_task_state': expected_task_state,
+                            'timeout': timeout})
+                message += ' Current status: %s.' % server_status
+                message += ' Current task state: %s.' % task_state
+                caller = misc_utils.find_test_caller()
+                if caller:
+                    message = '(%s) %s' % (caller, message)
+                raise exceptions.TimeoutException(message)
+            old_status = server_status
+            old_task_state = task_state
 
 
 def wait_for_server_termination(client, server_id, ignore_error=False):
@@ -122,86 +321,76 @@ def wait_for_image_status(client, image_id, status):
     The client should have a show_image(image_id) method to get the image.
     The client should also have build_interval and build_timeout attributes.
     """
-    image = client.show_image(image_id)
-    # Compute image client return response wrapped in 'image' element
-    # which is not case with glance image client.
-    if 'image' in image:
-        image = image['image']
-    start = int(time.time())
-
-    while image['status'] != status:
-        time.sleep(client.build_interval)
-        image = client.show_image(image_id)
-        # Compute image client return response wrapped in 'image' element
-        # which is not case with glance image client.
-        if 'image' in image:
-            image = image['image']
-        status_curr = image['status']
-        if status_curr == 'ERROR':
-            raise exceptions.AddImageException(image_id=image_id)
-
-        # check the status again to avoid a false negative where we hit
-        # the timeout at the same time that the image reached the expected
-        # status
-        if status_curr == status:
-            return
+    with _watch(client, 'image', image_id) as (image, poll):
+        start = int(time.time())
+
+        while image['status'] != status:
+            image = poll()
+            status_curr = image['status']
+            if status_curr == 'ERROR':
+                raise exceptions.AddImageException(image_id=image_id)
+
+            # check the status again to avoid a false negative where we hit
+            # the timeout at the same time that the image reached the
+            # expected status
+            if status_curr == status:
+                return
 
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Image %(image_id)s failed to reach %(status)s state'
-                       '(current state %(status_curr)s) '
-                       'within the required time (%(timeout)s s).' %
-                       {'image_id': image_id,
-                        'status': status,
-                        'status_curr': status_curr,
-                        'timeout': client.build_timeout})
-            caller = misc_utils.find_test_caller()
-            if caller:
-                message = '(%s) %s' % (caller, message)
-            raise exceptions.TimeoutException(message)
+            if int(time.time()) - start >= client.build_timeout:
+                message = ('Image %(image_id)s failed to reach %(status)s '
+                           'state(current state %(status_curr)s) '
+                           'within the required time (%(timeout)s s).' %
+                           {'image_id': image_id,
+                            'status': status,
+                            'status_curr': status_curr,
+                            'timeout': client.build_timeout})
+                caller = misc_utils.find_test_caller()
+                if caller:
+                    message = '(%s) %s' % (caller, message)
+                raise exceptions.TimeoutException(message)
 
 
 def wait_for_volume_status(client, volume_id, status):
     """Waits for a Volume to reach a given status."""
-    body = client.show_volume(volume_id)['volume']
-    volume_status = body['status']
-    start = int(time.time())
-
-    while volume_status != status:
-        time.sleep(client.build_interval)
-        body = client.show_volume(volume_id)['volume']
+    with _watch(client, 'volume', volume_id) as (body, poll):
         volume_status = body['status']
-        if volume_status == 'error':
-            raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
-        if volume_status == 'error_restoring':
-            raise exceptions.VolumeRestoreErrorException(volume_id=volume_id)
+        start = int(time.time())
 
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Volume %s failed to reach %s status (current %s) '
-                       'within the required time (%s s).' %
-                       (volume_id, status, volume_status,
-                        client.build_timeout))
-            raise exceptions.TimeoutException(message)
+        while volume_status != status:
+            body = poll()
+            volume_status = body['status']
+            if volume_status == 'error':
+                raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
+            if volume_status == 'error_restoring':
+                raise exceptions.VolumeRestoreErrorException(
+                    volume_id=volume_id)
+
+            if int(time.time()) - start >= client.build_timeout:
+                message = ('Volume %s failed to reach %s status (current %s) '
+                           'within the required time (%s s).' %
+                           (volume_id, status, volume_status,
+                            client.build_timeout))
+                raise exceptions.TimeoutException(message)
 
 
 def wait_for_snapshot_status(client, snapshot_id, status):
     """Waits for a Snapshot to reach a given status."""
-    body = client.show_snapshot(snapshot_id)['snapshot']
-    snapshot_status = body['status']
-    start = int(time.time())
-
-    while snapshot_status != status:
-        time.sleep(client.build_interval)
-        body = client.show_snapshot(snapshot_id)['snapshot']
+    with _watch(client, 'snapshot', snapshot_id) as (body, poll):
         snapshot_status = body['status']
-        if snapshot_status == 'error':
-            raise exceptions.SnapshotBuildErrorException(
-                snapshot_id=snapshot_id)
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Snapshot %s failed to reach %s status (current %s) '
-                       'within the required time (%s s).' %
-                       (snapshot_id, status, snapshot_status,
-                        client.build_timeout))
-            raise exceptions.TimeoutException(message)
+        start = int(time.time())
+
+        while snapshot_status != status:
+            body = poll()
+            snapshot_status = body['status']
+            if snapshot_status == 'error':
+                raise exceptions.SnapshotBuildErrorException(
+                    snapshot_id=snapshot_id)
+            if int(time.time()) - start >= client.build_timeout:
+                message = ('Snapshot %s failed to reach %s status '
+                           '(current %s) within the required time (%s s).' %
+                           (snapshot_id, status, snapshot_status,
+                            client.build_timeout))
+                raise exceptions.TimeoutException(message)
 
 
 def wait_for_bm_node_status(client, node_id, attr, status):
@@ -85,6 +85,14 @@ AuthGroup = [
                      "creates. However in some neutron configurations, like "
                      "with VLAN provider networks, this doesn't work. So if "
                      "set to False the isolated networks will not be created"),
+    cfg.IntOpt('dynamic_credentials_pool_size',
+               default=0,
+               help="Number of primary and admin dynamic credential sets, "
+                    "with their isolated network resources, that each test "
+                    "process creates ahead of demand in background threads. "
+                    "Test classes then take a ready set instead of creating "
+                    "one, and the unused sets are deleted when the process "
+                    "exits. 0 disables the pre-warming."),
     cfg.StrOpt('admin_username',
                help="Username for an administrative user. This is needed for "
                     "authenticating requests made by tenant isolation to "
@@ -327,7 +335,12 @@ HostGroup = [
     cfg.StrOpt('host_vssbackup_drive',
                help='Target drive for the Hyper-V VSS backups.'
                     'This drive has to be different from the boot drive.'
-                    'This is a required option')
+                    'This is a required option'),
+    cfg.BoolOpt('host_reuse_shells',
+                default=True,
+                help='Keep WinRM shells to the Hyper-V hosts open between '
+                     'commands instead of opening and closing a shell for '
+                     'every host command.')
 ]
 
 lis_group = cfg.OptGroup(name='lis',
@@ -337,7 +350,23 @@ LisGroup = [
     cfg.StrOpt('private_network',
                help='Valid private network needed by some test cases'
                     'This has to not overlap with existing openstack networks'
-                    "This is a required option")
+                    "This is a required option"),
+    cfg.ListOpt('hosts',
+                default=[],
+                help="Hyper-V hosts, as 'zone:host' or 'host' (in the 'nova' "
+                     "zone), the LIS tests are spread across when run by "
+                     "parallel workers. Each worker is pinned to the least "
+                     "used host. When empty, Nova schedules every instance."),
+    cfg.IntOpt('max_vm_operations_per_host',
+               default=2,
+               help="Maximum number of instance boots run at once on a "
+                    "Hyper-V host by all the parallel workers. 0 means no "
+                    "limit."),
+    cfg.IntOpt('max_disk_operations_per_host',
+               default=2,
+               help="Maximum number of disk attach, detach and removal "
+                    "operations run at once on a Hyper-V host by all the "
+                    "parallel workers. 0 means no limit."),
 ]
 
 compute_features_group = cfg.OptGroup(name='compute-feature-enabled',
@@ -652,6 +681,12 @@ ValidationGroup = [
     cfg.IntOpt('ssh_timeout',
                default=300,
                help='Timeout in seconds to wait for the ssh banner.'),
+    cfg.BoolOpt('ssh_reuse_connections',
+                default=True,
+                help='Keep one authenticated ssh connection per guest and '
+                     'user open and run every remote command on a new '
+                     'channel of it, instead of connecting for each '
+                     'command.'),
     cfg.StrOpt('image_ssh_user',
                default="root",
                help="User name used to authenticate to an instance.",
@@ -1038,7 +1073,19 @@ StressGroup = [
                 default=False,
                 help='Allows a full cleaning process after a stress test.'
                      ' Caution : this cleanup will remove every objects of'
-                     ' every tenant.')
+                     ' every tenant.'),
+    cfg.StrOpt('isolated_tenants_file',
+               help='YAML file keeping the credentials of the isolated'
+                    ' tenants of stress actions across runs. The tenants'
+                    ' found in it are reused, the missing ones are created'
+                    ' and added to it, and none are deleted after the'
+                    ' test. When unset, isolated tenants are created for'
+                    ' every run and deleted afterwards.'),
+    cfg.IntOpt('max_keystone_concurrency',
+               default=8,
+               help='Maximum number of concurrent Keystone requests made'
+                    ' to create or delete the isolated tenants of stress'
+                    ' actions.')
 ]
 
 
@@ -1230,6 +1277,22 @@ NegativeGroup = [
                help="Test generator class for all negative tests"),
 ]
 
+service_clients_group = cfg.OptGroup(name='service-clients',
+                                     title='Service Clients Options')
+
+ServiceClientsGroup = [
+    cfg.BoolOpt('http_keep_alive',
+                default=True,
+                help='Send the service client requests over kept-alive '
+                     'HTTP connections shared by all the clients, instead '
+                     'of opening a new connection for every request.'),
+    cfg.IntOpt('http_max_connections',
+               default=10,
+               help='Maximum number of kept-alive HTTP connections to each '
+                    'API endpoint. Requests beyond it wait for a free '
+                    'connection.'),
+]
+
 DefaultGroup = [
     cfg.StrOpt('resources_prefix',
                default='tempest',
@@ -1271,6 +1334,7 @@ _opts = [
     (baremetal_group, BaremetalGroup),
     (input_scenario_group, InputScenarioGroup),
     (negative_group, NegativeGroup),
+    (service_clients_group, ServiceClientsGroup),
     (None, DefaultGroup)
 ]
 
@@ -1342,6 +1406,7 @@ class TempestConfigPrivate(object):
         self.baremetal = _CONF.baremetal
         self.input_scenario = _CONF['input-scenario']
         self.negative = _CONF.negative
+        self.service_clients = _CONF['service-clients']
         _CONF.set_default('domain_name',
                           self.auth.default_credentials_domain_name,
                           group='identity')
@@ -127,6 +127,15 @@ class ImageFault(TempestException):
     message = "Got image fault"
 
 
+class ImageChecksumMismatch(TempestException):
+    message = ("Image data of %(name)s has checksum %(actual)s instead of "
+               "%(checksum)s")
+
+
+class ObjectTransferError(TempestException):
+    message = "Transfer of object %(name)s failed: %(reason)s"
+
+
 class IdentityError(TempestException):
     message = "Got identity error"
 
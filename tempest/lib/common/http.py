@@ -14,7 +14,23 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import os
+import socket
+import threading
+
 import httplib2
+from oslo_log import log as logging
+import six
+from six.moves import http_client
+from six.moves.urllib import parse as urlparse
+
+
+LOG = logging.getLogger(__name__)
+
+# Methods which can safely be sent again when a kept-alive connection turns
+# out to have been closed by the server.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
 
 
 class ClosingHttp(httplib2.Http):
@@ -23,3 +39,141 @@ class ClosingHttp(httplib2.Http):
         new_headers = dict(original_headers, connection='close')
         new_kwargs = dict(kwargs, headers=new_headers)
         return super(ClosingHttp, self).request(*args, **new_kwargs)
+
+
+class PooledHttp(object):
+    """Thread-safe keep-alive HTTP transport.
+
+    Exposes the same ``request`` method as ``httplib2.Http``, but keeps the
+    connections open and hands them out again to later requests for the
+    same endpoint (scheme, host and port). At most ``maxsize`` requests are
+    in flight per endpoint; further callers block until a connection is
+    free. A request failing on a kept-alive connection the server has
+    already closed is retried once on a new connection, if its method is
+    idempotent and its body can be sent again. A forked process never uses
+    the connections inherited from its parent, which still owns them.
+
+    :param int maxsize: maximum number of connections per endpoint.
+    :param kwargs: passed as-is to every ``httplib2.Http`` created.
+    """
+
+    def __init__(self, maxsize=10, **kwargs):
+        self.maxsize = maxsize
+        self._http_kwargs = kwargs
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(list)
+        self._slots = {}
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            # Forked: the idle connections are the sockets of the parent,
+            # sharing them would interleave the requests of both processes.
+            # They are only dropped, closing them here is of no use to the
+            # parent.
+            self._reset()
+
+    @staticmethod
+    def _get_endpoint(uri):
+        parts = urlparse.urlsplit(uri)
+        return parts.scheme.lower(), parts.netloc.lower()
+
+    def _get_slots(self, endpoint):
+        with self._lock:
+            slots = self._slots.get(endpoint)
+            if slots is None:
+                slots = self._slots[endpoint] = threading.BoundedSemaphore(
+                    self.maxsize)
+            return slots
+
+    def _checkout(self, endpoint):
+        with self._lock:
+            idle = self._idle[endpoint]
+            if idle:
+                return idle.pop()
+        return httplib2.Http(**self._http_kwargs)
+
+    def _checkin(self, endpoint, http):
+        with self._lock:
+            idle = self._idle[endpoint]
+            if len(idle) < self.maxsize:
+                idle.append(http)
+                return
+        self._close(http)
+
+    @staticmethod
+    def _close(http):
+        for conn in list(http.connections.values()):
+            try:
+                conn.close()
+            except Exception:
+                pass
+        http.connections.clear()
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        self._check_pid()
+        endpoint = self._get_endpoint(uri)
+        retriable = (method in IDEMPOTENT_METHODS and
+                     (body is None or
+                      isinstance(body, (six.binary_type, six.text_type))))
+        slots = self._get_slots(endpoint)
+        slots.acquire()
+        try:
+            while True:
+                http = self._checkout(endpoint)
+                reused = bool(http.connections)
+                try:
+                    resp, content = http.request(uri, method, body=body,
+                                                 headers=headers, **kwargs)
+                except (socket.error, http_client.HTTPException) as e:
+                    self._close(http)
+                    if not (reused and retriable):
+                        raise
+                    LOG.debug("Kept-alive connection to %s failed (%s), "
+                              "retrying on a new one", endpoint[1], e)
+                    retriable = False
+                    continue
+                except Exception:
+                    self._close(http)
+                    raise
+                self._checkin(endpoint, http)
+                return resp, content
+        finally:
+            slots.release()
+
+    def clear(self):
+        """Closes every idle connection."""
+        self._check_pid()
+        with self._lock:
+            idle = [http for https in self._idle.values() for http in https]
+            self._idle.clear()
+        for http in idle:
+            self._close(http)
+
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+_shared_pools_pid = os.getpid()
+
+
+def get_shared_pooled_http(maxsize=10, **kwargs):
+    """Returns a PooledHttp shared by every caller with the same settings.
+
+    :param int maxsize: maximum number of connections per endpoint.
+    :param kwargs: passed as-is to every ``httplib2.Http`` created.
+    """
+    global _shared_pools, _shared_pools_lock, _shared_pools_pid
+    if _shared_pools_pid != os.getpid():
+        # Forked, the pools of the parent are not shared with it
+        _shared_pools = {}
+        _shared_pools_lock = threading.Lock()
+        _shared_pools_pid = os.getpid()
+    key = (maxsize, tuple(sorted(kwargs.items())))
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = PooledHttp(maxsize, **kwargs)
+        return pool
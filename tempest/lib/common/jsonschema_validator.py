@@ -0,0 +1,258 @@
+# Copyright 2016 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cached JSON schema validators.
+
+Checking a schema and building its validator costs more than validating
+most API responses, so every schema is checked and compiled once and its
+validator is cached, keyed by the identity of the schema object. The
+response schemas are module level constants, so they are never mutated
+nor collected while cached.
+
+Schemas only made of the keywords of ``COMPILED_KEYWORDS`` are also
+compiled into plain Python checks, which only tell whether a document is
+valid. The jsonschema validator is then only run on the invalid documents,
+to raise the same ValidationError as ``jsonschema.validate`` would.
+"""
+
+import re
+import threading
+
+import six
+
+# Keywords handled by the compiled checks, schemas with any other keyword
+# are only validated by jsonschema
+COMPILED_KEYWORDS = frozenset([
+    'additionalProperties', 'enum', 'format', 'items', 'oneOf', 'pattern',
+    'patternProperties', 'properties', 'required', 'type',
+    # Annotations, with no effect on validation
+    '$schema', 'default', 'description', 'id', 'title'])
+# Validators cached at most, the cache is emptied once it holds more
+MAX_CACHED_VALIDATORS = 1024
+
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+class UnsupportedSchema(Exception):
+    """The schema can not be compiled into plain Python checks."""
+
+
+def _is_valid(instance, checks):
+    for check in checks:
+        if not check(instance):
+            return False
+    return True
+
+
+class _Compiler(object):
+
+    def __init__(self, validator_cls, format_checker):
+        self.types = getattr(validator_cls, 'DEFAULT_TYPES', {})
+        self.format_checker = format_checker
+
+    def compile(self, schema):
+        """Returns a function telling whether a document matches schema."""
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema('Schema %r is not an object' % schema)
+        unsupported = set(schema) - COMPILED_KEYWORDS
+        if unsupported:
+            raise UnsupportedSchema('Keywords %s can not be compiled' %
+                                    ', '.join(sorted(unsupported)))
+        checks = []
+        if 'type' in schema:
+            checks.append(self._compile_type(schema['type']))
+        if 'enum' in schema:
+            enum = schema['enum']
+            checks.append(lambda instance: instance in enum)
+        if 'format' in schema and self.format_checker is not None:
+            format_name = schema['format']
+            conforms = self.format_checker.conforms
+            checks.append(lambda instance: conforms(instance, format_name))
+        if 'pattern' in schema:
+            checks.append(self._compile_pattern(schema['pattern']))
+        if set(schema) & set(['properties', 'required', 'patternProperties',
+                              'additionalProperties']):
+            checks.append(self._compile_object(schema))
+        if 'items' in schema:
+            checks.append(self._compile_items(schema['items']))
+        if 'oneOf' in schema:
+            checks.append(self._compile_one_of(schema['oneOf']))
+
+        if not checks:
+            return lambda instance: True
+        if len(checks) == 1:
+            return checks[0]
+        return lambda instance: _is_valid(instance, checks)
+
+    def _get_pytypes(self, type_name):
+        if not isinstance(type_name, six.string_types) or (
+                type_name not in self.types):
+            raise UnsupportedSchema('Type %r can not be compiled' %
+                                    (type_name,))
+        pytypes = self.types[type_name]
+        return pytypes if isinstance(pytypes, tuple) else (pytypes,)
+
+    def _compile_type(self, types):
+        if not isinstance(types, list):
+            types = [types]
+        pytypes = tuple(pytype for type_name in types
+                        for pytype in self._get_pytypes(type_name))
+        # NOTE: bool is an int, but jsonschema only takes booleans for the
+        # 'boolean' type
+        if 'boolean' in types:
+            return lambda instance: isinstance(instance, pytypes)
+        return lambda instance: (isinstance(instance, pytypes) and
+                                 not isinstance(instance, bool))
+
+    def _compile_pattern(self, pattern):
+        search = re.compile(pattern).search
+        string_types = self._get_pytypes('string')
+        return lambda instance: (not isinstance(instance, string_types) or
+                                 search(instance) is not None)
+
+    def _compile_object(self, schema):
+        object_types = self._get_pytypes('object')
+        required = schema.get('required', [])
+        if not isinstance(required, list):
+            raise UnsupportedSchema('required %r can not be compiled' %
+                                    (required,))
+        properties = [(name, self.compile(subschema))
+                      for name, subschema in
+                      six.iteritems(schema.get('properties', {}))]
+        names = set(schema.get('properties', {}))
+        pattern_properties = [(re.compile(pattern).search,
+                               self.compile(subschema))
+                              for pattern, subschema in
+                              six.iteritems(schema.get('patternProperties',
+                                                       {}))]
+        patterns = '|'.join(schema.get('patternProperties', {}))
+        patterns = re.compile(patterns).search if patterns else None
+        additional = schema.get('additionalProperties', True)
+        if isinstance(additional, dict):
+            additional = self.compile(additional)
+        elif additional is True:
+            additional = None
+        elif additional is not False:
+            raise UnsupportedSchema('additionalProperties %r can not be '
+                                    'compiled' % (additional,))
+
+        def check(instance):
+            if not isinstance(instance, object_types):
+                return True
+            for name in required:
+                if name not in instance:
+                    return False
+            for name, check_property in properties:
+                if name in instance and not check_property(instance[name]):
+                    return False
+            for search, check_property in pattern_properties:
+                for key, value in six.iteritems(instance):
+                    if search(key) and not check_property(value):
+                        return False
+            if additional is not None:
+                for key in instance:
+                    if key in names or (patterns is not None and
+                                        patterns(key)):
+                        continue
+                    if additional is False or not additional(instance[key]):
+                        return False
+            return True
+        return check
+
+    def _compile_items(self, items):
+        array_types = self._get_pytypes('array')
+        if isinstance(items, dict):
+            check_item = self.compile(items)
+
+            def check(instance):
+                if not isinstance(instance, array_types):
+                    return True
+                for item in instance:
+                    if not check_item(item):
+                        return False
+                return True
+        else:
+            check_items = [self.compile(subschema) for subschema in items]
+
+            def check(instance):
+                if not isinstance(instance, array_types):
+                    return True
+                for item, check_item in zip(instance, check_items):
+                    if not check_item(item):
+                        return False
+                return True
+        return check
+
+    def _compile_one_of(self, subschemas):
+        checks = [self.compile(subschema) for subschema in subschemas]
+
+        def check(instance):
+            valid = 0
+            for check_subschema in checks:
+                if check_subschema(instance):
+                    valid += 1
+                    if valid > 1:
+                        return False
+            return valid == 1
+        return check
+
+
+def compile_schema(schema, validator_cls, format_checker=None):
+    """Compiles a schema into a function telling whether a document is valid.
+
+    :raises UnsupportedSchema: if the schema holds keywords which are not
+                               in COMPILED_KEYWORDS
+    """
+    return _Compiler(validator_cls, format_checker).compile(schema)
+
+
+class SchemaValidator(object):
+    """Validates documents against a schema checked and compiled once."""
+
+    def __init__(self, schema, validator_cls, format_checker=None,
+                 compiled=True):
+        validator_cls.check_schema(schema)
+        self.schema = schema
+        self._validator = validator_cls(schema, format_checker=format_checker)
+        self._is_valid = None
+        if compiled:
+            try:
+                self._is_valid = compile_schema(schema, validator_cls,
+                                                format_checker)
+            except UnsupportedSchema:
+                pass
+
+    def validate(self, instance):
+        """Raises the first jsonschema.ValidationError of the document."""
+        if self._is_valid is not None and self._is_valid(instance):
+            return
+        self._validator.validate(instance)
+
+
+def get_validator(schema, validator_cls, format_checker=None, compiled=True):
+    """Returns the cached SchemaValidator of a schema object."""
+    key = (id(schema), validator_cls, id(format_checker), compiled)
+    validator = _validators.get(key)
+    # NOTE: the validator references its schema, so the id of a cached
+    # schema is never reused by another object
+    if validator is None or validator.schema is not schema:
+        validator = SchemaValidator(schema, validator_cls, format_checker,
+                                    compiled)
+        with _validators_lock:
+            if len(_validators) >= MAX_CACHED_VALIDATORS:
+                _validators.clear()
+            _validators[key] = validator
+    return validator
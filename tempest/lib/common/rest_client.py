@@ -25,6 +25,7 @@ from oslo_serialization import jsonutils as json
 import six
 
 from tempest.lib.common import http
+from tempest.lib.common import jsonschema_validator
 from tempest.lib.common.utils import misc as misc_utils
 from tempest.lib import exceptions
 
@@ -40,6 +41,8 @@ HTTP_REDIRECTION = (300, 301, 302, 303, 304, 305, 306, 307)
 # JSON Schema validator and format checker used for JSON Schema validation
 JSONSCHEMA_VALIDATOR = jsonschema.Draft4Validator
 FORMAT_CHECKER = jsonschema.draft4_format_checker
+# Compile the response schemas into plain Python checks when possible
+COMPILE_JSONSCHEMA = True
 
 
 class RestClient(object):
@@ -63,6 +66,11 @@ class RestClient(object):
                          TLS server cert
     :param str trace_request: Regex to use for specifying logging the entirety
                               of the request and response payload
+    :param bool keep_alive: Set to true to send requests over kept-alive
+                            connections shared with the other clients
+                            using the same ssl settings
+    :param int max_connections: The maximum number of kept-alive connections
+                                per endpoint when keep_alive is true
     """
     TYPE = "json"
 
@@ -75,7 +83,7 @@ class RestClient(object):
                  endpoint_type='publicURL',
                  build_interval=1, build_timeout=60,
                  disable_ssl_certificate_validation=False, ca_certs=None,
-                 trace_requests=''):
+                 trace_requests='', keep_alive=False, max_connections=10):
         self.auth_provider = auth_provider
         self.service = service
         self.region = region
@@ -94,8 +102,13 @@ class RestClient(object):
                                        'retry-after', 'server',
                                        'vary', 'www-authenticate'))
         dscv = disable_ssl_certificate_validation
-        self.http_obj = http.ClosingHttp(
-            disable_ssl_certificate_validation=dscv, ca_certs=ca_certs)
+        if keep_alive:
+            self.http_obj = http.get_shared_pooled_http(
+                max_connections, disable_ssl_certificate_validation=dscv,
+                ca_certs=ca_certs)
+        else:
+            self.http_obj = http.ClosingHttp(
+                disable_ssl_certificate_validation=dscv, ca_certs=ca_certs)
 
     def _get_type(self):
         return self.TYPE
@@ -810,6 +823,12 @@ class RestClient(object):
         """Returns the primary type of resource this client works with."""
         return 'resource'
 
+    @staticmethod
+    def _get_schema_validator(schema):
+        return jsonschema_validator.get_validator(
+            schema, JSONSCHEMA_VALIDATOR, FORMAT_CHECKER,
+            compiled=COMPILE_JSONSCHEMA)
+
     @classmethod
     def validate_response(cls, schema, resp, body):
         # Only check the response if the status code is a success code
@@ -824,9 +843,7 @@ class RestClient(object):
             body_schema = schema.get('response_body')
             if body_schema:
                 try:
-                    jsonschema.validate(body, body_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
+                    cls._get_schema_validator(body_schema).validate(body)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response body is invalid (%s)") % ex
                     raise exceptions.InvalidHTTPResponseBody(msg)
@@ -839,9 +856,7 @@ class RestClient(object):
             header_schema = schema.get('response_header')
             if header_schema:
                 try:
-                    jsonschema.validate(resp, header_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
+                    cls._get_schema_validator(header_schema).validate(resp)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response header is invalid (%s)") % ex
                     raise exceptions.InvalidHTTPResponseHeader(msg)
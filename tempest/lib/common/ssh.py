@@ -13,14 +13,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
+import collections
+import hashlib
 import os
+import posixpath
 import select
 import socket
+import threading
 import time
 import warnings
 
 from oslo_log import log as logging
 import six
+from six.moves import shlex_quote
 
 from tempest.lib import exceptions
 
@@ -33,10 +39,146 @@ with warnings.catch_warnings():
 LOG = logging.getLogger(__name__)
 
 
+def _md5sum(path, chunk_size=65536):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class _PooledConnection(object):
+
+    def __init__(self, ssh, last_used):
+        self.ssh = ssh
+        self.last_used = last_used
+        # Channels opened and not yet released
+        self.channels = 0
+
+
+class ConnectionPool(object):
+    """A bounded pool of authenticated ssh connections.
+
+    Connections are keyed by the target host and the credentials used to
+    log in, so every client talking to the same guest as the same user
+    shares a single paramiko transport and multiplexes its channels over it.
+    Connections returned by ``get`` and ``put`` are claimed for a channel
+    until ``release`` is called. Connections that have no open channel and
+    have been idle for longer than ``idle_timeout`` seconds, or whose
+    transport is no longer active, are closed and dropped. When the pool is
+    full the least recently used idle connection is closed.
+    """
+
+    def __init__(self, max_size=64, idle_timeout=600):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._connections = collections.OrderedDict()
+
+    @staticmethod
+    def _is_alive(ssh):
+        transport = ssh.get_transport()
+        return transport is not None and transport.is_active()
+
+    @staticmethod
+    def _close(ssh):
+        try:
+            ssh.close()
+        except Exception:
+            LOG.debug("Failed to close pooled ssh connection", exc_info=True)
+
+    def _evict_idle(self, now):
+        for key, entry in list(self._connections.items()):
+            if (not entry.channels and
+                    now - entry.last_used > self.idle_timeout):
+                del self._connections[key]
+                self._close(entry.ssh)
+
+    def _evict_lru(self):
+        for key, entry in list(self._connections.items()):
+            if len(self._connections) <= self.max_size:
+                return
+            if not entry.channels:
+                del self._connections[key]
+                self._close(entry.ssh)
+
+    def get(self, key):
+        """Claims a live pooled connection for key, returns None if none."""
+        with self._lock:
+            now = time.time()
+            self._evict_idle(now)
+            entry = self._connections.pop(key, None)
+            if entry is None:
+                return None
+            if not self._is_alive(entry.ssh):
+                self._close(entry.ssh)
+                return None
+            entry.last_used = now
+            entry.channels += 1
+            self._connections[key] = entry
+            return entry.ssh
+
+    def put(self, key, ssh):
+        """Adds a connection to the pool and claims it.
+
+        If another live connection was pooled for key meanwhile, it is kept
+        and claimed instead, and ssh is closed.
+
+        :returns: the pooled connection to use.
+        """
+        with self._lock:
+            entry = self._connections.pop(key, None)
+            if entry is not None and entry.ssh is not ssh:
+                if self._is_alive(entry.ssh):
+                    self._close(ssh)
+                else:
+                    self._close(entry.ssh)
+                    entry = None
+            if entry is None:
+                entry = _PooledConnection(ssh, time.time())
+            entry.last_used = time.time()
+            entry.channels += 1
+            self._connections[key] = entry
+            self._evict_lru()
+            return entry.ssh
+
+    def release(self, key, ssh):
+        """Ends a claim on the pooled connection for key."""
+        with self._lock:
+            entry = self._connections.get(key)
+            if entry is not None and entry.ssh is ssh:
+                entry.channels = max(entry.channels - 1, 0)
+                entry.last_used = time.time()
+
+    def discard(self, key):
+        """Closes and removes the connection for key, if any."""
+        with self._lock:
+            entry = self._connections.pop(key, None)
+        if entry is not None:
+            self._close(entry.ssh)
+
+    def clear(self):
+        """Closes every pooled connection."""
+        with self._lock:
+            entries = list(self._connections.values())
+            self._connections.clear()
+        for entry in entries:
+            self._close(entry.ssh)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._connections)
+
+
+_connection_pool = ConnectionPool()
+atexit.register(_connection_pool.clear)
+
+
 class Client(object):
 
     def __init__(self, host, username, password=None, timeout=300, pkey=None,
-                 channel_timeout=10, look_for_keys=False, key_filename=None):
+                 channel_timeout=10, look_for_keys=False, key_filename=None,
+                 reuse_connection=False, keepalive_interval=30):
         self.host = host
         self.port = 22
         self.username = username
@@ -50,6 +192,75 @@ class Client(object):
         self.timeout = int(timeout)
         self.channel_timeout = float(channel_timeout)
         self.buf_size = 1024
+        self.reuse_connection = reuse_connection
+        self.keepalive_interval = keepalive_interval
+        self._sftp = None
+
+    def _get_pool_key(self):
+        pkey = self.pkey
+        if pkey is not None and hasattr(pkey, 'get_fingerprint'):
+            pkey = pkey.get_fingerprint()
+        return (self.host, self.port, self.username, self.password,
+                pkey, self.key_filename)
+
+    def _get_pooled_connection(self):
+        """Returns a connection from the shared pool, creating it if needed.
+
+        :returns: a tuple of the connection and a flag telling whether it
+                  was reused from the pool.
+        """
+        key = self._get_pool_key()
+        ssh = _connection_pool.get(key)
+        if ssh is not None:
+            return ssh, True
+        ssh = self._get_ssh_connection()
+        if self.keepalive_interval:
+            ssh.get_transport().set_keepalive(self.keepalive_interval)
+        pooled = _connection_pool.put(key, ssh)
+        return pooled, pooled is not ssh
+
+    def _release(self, ssh):
+        """Ends the use of a pooled connection by a channel."""
+        if self.reuse_connection:
+            _connection_pool.release(self._get_pool_key(), ssh)
+
+    def _open_channel(self):
+        """Opens a session channel on a new or pooled connection.
+
+        A pooled transport may have died since it was last used (e.g. the
+        guest was rebooted), in which case it is dropped from the pool and
+        a fresh connection is made once.
+        """
+        if not self.reuse_connection:
+            ssh = self._get_ssh_connection()
+            return ssh, ssh.get_transport().open_session()
+        ssh, reused = self._get_pooled_connection()
+        try:
+            return ssh, ssh.get_transport().open_session(
+                timeout=self.channel_timeout)
+        except (EOFError, socket.error, paramiko.SSHException) as e:
+            if not reused:
+                self._release(ssh)
+                raise
+            LOG.info("Pooled ssh connection to %s@%s is stale (%s), "
+                     "reconnecting", self.username, self.host, e)
+            _connection_pool.discard(self._get_pool_key())
+            ssh, _ = self._get_pooled_connection()
+            try:
+                return ssh, ssh.get_transport().open_session(
+                    timeout=self.channel_timeout)
+            except Exception:
+                self._release(ssh)
+                raise
+
+    def close(self):
+        """Closes the pooled connection used by this client, if any."""
+        if self._sftp is not None:
+            self._sftp[1].close()
+            self._release(self._sftp[0])
+            self._sftp = None
+        if self.reuse_connection:
+            _connection_pool.discard(self._get_pool_key())
 
     def _get_ssh_connection(self, sleep=1.5, backoff=1):
         """Returns an ssh connection to the specified host."""
@@ -98,43 +309,126 @@ class Client(object):
     def _is_timed_out(self, start_time):
         return (time.time() - self.timeout) > start_time
 
-    def sftp(self, source, destination):
+    def _get_sftp(self):
+        """Returns the connection and the SFTP session to transfer over.
 
+        When connections are reused the SFTP session is kept open on the
+        pooled connection and shared by the following transfers.
+        """
+        if self._sftp is not None:
+            ssh, sftp = self._sftp
+            channel = sftp.get_channel()
+            if not channel.closed and channel.get_transport().is_active():
+                return self._sftp
+            self._sftp = None
+            self._release(ssh)
+        ssh, channel = self._open_channel()
+        channel.invoke_subsystem('sftp')
+        sftp = paramiko.SFTPClient(channel)
+        if self.reuse_connection:
+            self._sftp = (ssh, sftp)
+        return ssh, sftp
+
+    def _remote_md5(self, path):
+        output = self.exec_command('md5sum %s' % shlex_quote(path),
+                                   ignore_exit_status=True)
+        return output.split()[0] if output else None
+
+    def _is_up_to_date(self, sftp, source, destination):
+        """Tells whether a remote file already has the local file contents.
+
+        Files of different sizes differ. Files with the same size and
+        modification time (which is copied over on upload) are the same,
+        otherwise the MD5 digest is computed on the server and compared,
+        so the remote file never has to be downloaded.
+        """
         try:
-            transport = paramiko.Transport((self.host, self.port))
-            transport.start_client()
-            self.agent_auth(transport, self.username)
-            sftp = transport.open_session()
-            sftp = paramiko.SFTPClient.from_transport(transport)
-            is_up_to_date = False
+            remote_stat = sftp.stat(destination)
+        except IOError:
+            return False
+        local_stat = os.stat(source)
+        if remote_stat.st_size != local_stat.st_size:
+            return False
+        if remote_stat.st_mtime == int(local_stat.st_mtime):
+            return True
+        return self._remote_md5(destination) == _md5sum(source)
 
+    @staticmethod
+    def _makedirs(sftp, path):
+        current = '/' if path.startswith('/') else ''
+        for part in path.split('/'):
+            if not part:
+                continue
+            current = posixpath.join(current, part)
             try:
-                sftp.mkdir(destination)
-            except IOError as e:
-                LOG.exception(e)
+                sftp.stat(current)
+            except IOError:
+                sftp.mkdir(current)
 
-            destination_file = destination + '/' + os.path.basename(source)
-            try:
-                if sftp.stat(destination):
-                    source_data = open(source, "rb").read()
-                    destination_data = sftp.open(destination_file).read()
-                    md1 = md5.new(source_data).digest()
-                    md2 = md5.new(destination_data).digest()
-                    if md1 == md2:
-                        is_up_to_date = True
-            except:
-                pass
-
-            if not is_up_to_date:
-                sftp.put(source, destination_file)
-                LOG.info(
-                    "Successfuly copied over %s to %s", source, destination)
+    def sftp(self, source, destination):
+        """Copies a local file or directory into a remote directory.
+
+        A directory is copied with all its files, recursively, as
+        ``destination/<basename of source>``, over a single SFTP session.
+        Files already up to date on the server are skipped, the others are
+        streamed in pipelined chunks and get the local mode and
+        modification time.
+
+        :param str source: path of the local file or directory.
+        :param str destination: remote directory, created if missing.
+        :returns: list of the remote paths which were copied.
+        """
+        source = source.rstrip(os.sep) or source
+        if os.path.isdir(source):
+            root = posixpath.join(destination, os.path.basename(source))
+            files = []
+            for dirpath, _, filenames in os.walk(source):
+                relpath = os.path.relpath(dirpath, source)
+                remote_dir = root if relpath == os.curdir else \
+                    posixpath.join(root, *relpath.split(os.sep))
+                files.extend((os.path.join(dirpath, filename),
+                              posixpath.join(remote_dir, filename))
+                             for filename in sorted(filenames))
+        else:
+            files = [(source, posixpath.join(destination,
+                                             os.path.basename(source)))]
+
+        copied = []
+        try:
+            ssh, sftp = self._get_sftp()
         except Exception as e:
-            raise Exception ('*** Failed to sftp: %s: %s' % (e.__class__, e))
-            try:
-                transport.close()
-            except:
-                pass
+            raise Exception('*** Failed to sftp: %s: %s' % (e.__class__, e))
+        try:
+            created = set()
+            for local_path, remote_path in files:
+                remote_dir = posixpath.dirname(remote_path)
+                if remote_dir not in created:
+                    self._makedirs(sftp, remote_dir)
+                    created.add(remote_dir)
+                if self._is_up_to_date(sftp, local_path, remote_path):
+                    LOG.debug("%s is up to date on %s", remote_path,
+                              self.host)
+                    continue
+                local_stat = os.stat(local_path)
+                sftp.put(local_path, remote_path)
+                sftp.chmod(remote_path, local_stat.st_mode & 0o777)
+                sftp.utime(remote_path, (int(local_stat.st_atime),
+                                         int(local_stat.st_mtime)))
+                copied.append(remote_path)
+            LOG.info("Successfuly copied over %s to %s (%d of %d files "
+                     "transferred)", source, destination, len(copied),
+                     len(files))
+        except Exception as e:
+            if self._sftp is not None:
+                self._sftp = None
+                self._release(ssh)
+            sftp.close()
+            raise Exception('*** Failed to sftp: %s: %s' % (e.__class__, e))
+        finally:
+            if not self.reuse_connection:
+                sftp.close()
+                ssh.close()
+        return copied
 
     def agent_auth(self, transport, username):
 
@@ -147,7 +441,7 @@ class Client(object):
             try:
                 transport.auth_publickey(username, key)
                 return
-            except paramiko.SSHException, e:
+            except paramiko.SSHException as e:
                 raise e
 
     @staticmethod
@@ -168,9 +462,18 @@ class Client(object):
                  status. The exception contains command status stderr content.
         :raises: TimeoutException if cmd doesn't end when timeout expires.
         """
-        ssh = self._get_ssh_connection()
-        transport = ssh.get_transport()
-        channel = transport.open_session()
+        ssh, channel = self._open_channel()
+        try:
+            return self._exec_on_channel(channel, cmd, ignore_exit_status,
+                                         encoding)
+        finally:
+            channel.close()
+            if self.reuse_connection:
+                self._release(ssh)
+            else:
+                ssh.close()
+
+    def _exec_on_channel(self, channel, cmd, ignore_exit_status, encoding):
         channel.fileno()  # Register event pipe
         channel.exec_command(cmd)
         channel.shutdown_write()
@@ -222,6 +525,16 @@ class Client(object):
         return out_data
 
     def test_connection_auth(self):
-        """Raises an exception when we can not connect to server via ssh."""
+        """Raises an exception when we can not connect to server via ssh.
+
+        When connections are reused the freshly authenticated connection
+        replaces any pooled one, so a connection that went stale (e.g.
+        across a guest reboot) is never mistaken for a live server.
+        """
+        if self.reuse_connection:
+            _connection_pool.discard(self._get_pool_key())
+            ssh, _ = self._get_pooled_connection()
+            self._release(ssh)
+            return
         connection = self._get_ssh_connection()
         connection.close()
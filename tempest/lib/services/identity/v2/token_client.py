@@ -22,11 +22,13 @@ from tempest.lib import exceptions
 class TokenClient(rest_client.RestClient):
 
     def __init__(self, auth_url, disable_ssl_certificate_validation=None,
-                 ca_certs=None, trace_requests=None):
+                 ca_certs=None, trace_requests=None, keep_alive=False,
+                 max_connections=10):
         dscv = disable_ssl_certificate_validation
         super(TokenClient, self).__init__(
             None, None, None, disable_ssl_certificate_validation=dscv,
-            ca_certs=ca_certs, trace_requests=trace_requests)
+            ca_certs=ca_certs, trace_requests=trace_requests,
+            keep_alive=keep_alive, max_connections=max_connections)
 
         if auth_url is None:
             raise exceptions.IdentityError("Couldn't determine auth_url")
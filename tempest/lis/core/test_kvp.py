@@ -85,3 +85,21 @@ class KVP(manager.LisBase):
         self.linux_client.kvp_verify_value('EEE', '999', '0')
         self.kvp_remove_value(self.instance_name, 'EEE', '999', '0')
         self.servers_client.delete_server(self.instance['id'])
+
+    @test.attr(type=['core', 'kvp'])
+    @test.services('compute', 'network')
+    def test_kvp_bulk_key_values(self):
+        self.spawn_vm()
+        self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
+                                    self.ssh_user, self.keypair['private_key'])
+        self.verify_lis_status(self.instance_name, "'Key-Value Pair Exchange'")
+        self.send_kvp_client()
+        values = dict(('Key%03d' % i, str(i)) for i in range(100))
+        self.kvp_add_values(self.instance_name, values, '0')
+        self.linux_client.kvp_verify_values(values, '0')
+        modified = dict((key, value + '0') for key, value in values.items())
+        self.kvp_modify_values(self.instance_name, modified, '0')
+        self.linux_client.kvp_verify_values(modified, '0')
+        self.kvp_remove_values(self.instance_name, modified, '0')
+        self.linux_client.kvp_verify_values({}, '0', absent=modified)
+        self.servers_client.delete_server(self.instance['id'])
@@ -61,10 +61,8 @@ class Numa(manager.LisBase):
         self.change_cpu_numa(self.instance_name, numa_nodes, sockets)
         self.start_vm(self.server_id)
 
-        host_numa_nodes = self.host_client.get_powershell_cmd_attribute(
-            'Get-VM', 'NumaNodesCount',
-            ComputerName=self.host_name,
-            VMName=self.instance_name)
+        host_numa_nodes = self.get_vm_info(
+            self.instance_name)['NumaNodesCount']
         try:
             self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                         self.ssh_user, self.keypair['private_key'])
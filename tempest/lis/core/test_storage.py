@@ -73,9 +73,8 @@ class StorageBase(manager.LisBase):
         self.spawn_vm()
         self.stop_vm(self.server_id)
         if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
+            self.add_disks(self.instance_name, self.disk_type,
+                           pos, vhd_type, self.sector_size)
         else:
             self.add_disk(self.instance_name, self.disk_type,
                           pos, vhd_type, self.sector_size)
@@ -90,9 +89,8 @@ class StorageBase(manager.LisBase):
         self.spawn_vm()
         self.stop_vm(self.server_id)
         if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size, size)
+            self.add_disks(self.instance_name, self.disk_type,
+                           pos, vhd_type, self.sector_size, size)
         else:
             self.add_disk(self.instance_name, self.disk_type,
                           pos, vhd_type, self.sector_size, size)
@@ -153,8 +151,7 @@ class StorageBase(manager.LisBase):
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
-        for disk in self.disks:
-            self.detach_disk(self.instance_name, disk)
+        self.detach_disks(self.instance_name, self.disks)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
         self.servers_client.delete_server(self.instance['id'])
@@ -170,9 +167,8 @@ class StorageBase(manager.LisBase):
             self.servers_client, server_id, 'ACTIVE')
 
         if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
+            self.add_disks(self.instance_name, self.disk_type,
+                           pos, vhd_type, self.sector_size)
         else:
             self.add_disk(self.instance_name, self.disk_type,
                           pos, vhd_type, self.sector_size)
@@ -186,9 +182,8 @@ class StorageBase(manager.LisBase):
         self.spawn_vm()
         self.stop_vm(self.server_id)
         if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
+            self.add_disks(self.instance_name, self.disk_type,
+                           pos, vhd_type, self.sector_size)
         else:
             self.add_disk(self.instance_name, self.disk_type,
                           pos, vhd_type, self.sector_size)
@@ -196,8 +191,7 @@ class StorageBase(manager.LisBase):
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
-        for disk in self.disks:
-            self.detach_disk(self.instance_name, disk)
+        self.detach_disks(self.instance_name, self.disks)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
         self.servers_client.delete_server(self.instance['id'])
@@ -208,9 +202,8 @@ class StorageBase(manager.LisBase):
             self.servers_client, self.server_id, 'ACTIVE')
 
         if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
+            self.add_disks(self.instance_name, self.disk_type,
+                           pos, vhd_type, self.sector_size)
         else:
             self.add_disk(self.instance_name, self.disk_type,
                           pos, vhd_type, self.sector_size)
@@ -219,8 +212,7 @@ class StorageBase(manager.LisBase):
                                     self.ssh_user, self.keypair['private_key'])
         self.format_disk(exc_dsk_cnt, filesystem)
 
-        for disk in self.disks:
-            self.detach_disk(self.instance_name, disk)
+        self.detach_disks(self.instance_name, self.disks)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
         self.servers_client.delete_server(self.instance['id'])
@@ -242,9 +234,8 @@ class StorageBase(manager.LisBase):
                                            self.server_id, 'ACTIVE')
 
         if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
+            self.add_disks(self.instance_name, self.disk_type,
+                           pos, vhd_type, self.sector_size)
         else:
             self.add_disk(self.instance_name, self.disk_type,
                           pos, vhd_type, self.sector_size)
@@ -253,8 +244,7 @@ class StorageBase(manager.LisBase):
                                     self.ssh_user, self.keypair['private_key'])
         self.format_disk(exc_dsk_cnt, filesystem)
 
-        for disk in self.disks:
-            self.detach_disk(self.instance_name, disk)
+        self.detach_disks(self.instance_name, self.disks)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
         self.servers_client.delete_server(self.instance['id'])
@@ -110,13 +110,13 @@ class DynamicMemory(manager.LisBase):
         host_memory_total = self.get_host_memory('total')
         host_memory_free = self.get_host_memory('free')
 
-        instance_memory_total = self.get_ram_status(
-            self.instance_name, 'MemoryAssigned')
-        instance_memory_demand = self.get_ram_status(
-            self.instance_name, 'MemoryDemand')
+        vm_info = self.get_vm_info(self.instance_name)
+        instance_memory_total = long(vm_info['MemoryAssigned']) / 1024 / 1024
+        instance_memory_demand = long(vm_info['MemoryDemand']) / 1024 / 1024
 
-        guest_memory_total = self.linux_client.memory_check()
-        guest_memory_free = self.linux_client.memory_check('MemFree')
+        meminfo = self.linux_client.get_meminfo()
+        guest_memory_total = meminfo['MemTotal']
+        guest_memory_free = meminfo['MemFree']
         guest_memory_used = guest_memory_total - guest_memory_free
 
         instance_memory_total_progress.append(instance_memory_total)
@@ -131,13 +131,13 @@ class DynamicMemory(manager.LisBase):
 
         # Check memory status on the Hyper-V host and in the Linux guest
         # after memory stress has been applied
-        instance_memory_total = self.get_ram_status(
-            self.instance_name, 'MemoryAssigned')
-        instance_memory_demand = self.get_ram_status(
-            self.instance_name, 'MemoryDemand')
+        vm_info = self.get_vm_info(self.instance_name)
+        instance_memory_total = long(vm_info['MemoryAssigned']) / 1024 / 1024
+        instance_memory_demand = long(vm_info['MemoryDemand']) / 1024 / 1024
 
-        guest_memory_total = self.linux_client.memory_check()
-        guest_memory_free = self.linux_client.memory_check('MemFree')
+        meminfo = self.linux_client.get_meminfo()
+        guest_memory_total = meminfo['MemTotal']
+        guest_memory_free = meminfo['MemFree']
         guest_memory_used = guest_memory_total - guest_memory_free
 
         instance_memory_total_progress.append(instance_memory_total)
@@ -152,8 +152,9 @@ class DynamicMemory(manager.LisBase):
         # Also check swap. If it is unusually high, there is something wrong
         # with hot add support and the test should fail
 
-        guest_memory_swap_total = self.linux_client.memory_check('SwapTotal')
-        guest_memory_swap_free = self.linux_client.memory_check('SwapFree')
+        meminfo = self.linux_client.get_meminfo()
+        guest_memory_swap_total = meminfo['SwapTotal']
+        guest_memory_swap_free = meminfo['SwapFree']
         guest_memory_swap_used = guest_memory_swap_total - \
             guest_memory_swap_free
 
@@ -0,0 +1,163 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Spreads the LIS tests run by parallel testr workers over Hyper-V hosts.
+
+Every testr worker is a separate process. The first time a worker boots
+an instance it claims the least used of the [lis] hosts and pins all its
+instances there through the availability zone. The operations loading a
+host the most (booting instances, attaching and removing disks) take one
+of a fixed number of per-host slots, held as external file locks, so a
+host never runs more of them at once, whatever the number of workers.
+"""
+
+import atexit
+import contextlib
+import errno
+import functools
+import os
+import time
+
+from oslo_concurrency import lockutils
+from oslo_log import log as logging
+
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+DEFAULT_ZONE = 'nova'
+SLOT_POLL_INTERVAL = 1
+
+_worker_host = None
+
+
+def _get_lock_dir():
+    lock_dir = os.path.join(lockutils.get_lock_path(CONF), 'lis_hosts')
+    try:
+        os.makedirs(lock_dir)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    return lock_dir
+
+
+def _get_host_name(host):
+    """Returns the host name of a '[zone:]host' entry."""
+    return host.rsplit(':', 1)[-1].lower()
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+    return True
+
+
+def _remove_claim(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _count_claims(lock_dir, host_name):
+    """Counts the live workers which claimed a host, dropping stale claims."""
+    count = 0
+    prefix = host_name + '.claim.'
+    for filename in os.listdir(lock_dir):
+        if not filename.startswith(prefix):
+            continue
+        if _is_alive(int(filename[len(prefix):])):
+            count += 1
+        else:
+            _remove_claim(os.path.join(lock_dir, filename))
+    return count
+
+
+def get_worker_host():
+    """Returns the [lis] hosts entry this worker pins its instances to.
+
+    The entry is claimed on the first call, picking the host with the
+    fewest live workers. Returns None when no hosts are configured.
+    """
+    global _worker_host
+    if _worker_host is None and CONF.lis.hosts:
+        lock_dir = _get_lock_dir()
+        with lockutils.lock('lis_hosts', external=True, lock_path=lock_dir):
+            loads = [(_count_claims(lock_dir, _get_host_name(host)), i, host)
+                     for i, host in enumerate(CONF.lis.hosts)]
+            host = min(loads)[2]
+            claim = os.path.join(lock_dir, '%s.claim.%d' % (
+                _get_host_name(host), os.getpid()))
+            open(claim, 'w').close()
+        atexit.register(_remove_claim, claim)
+        LOG.info('LIS worker %d pinned to host %s', os.getpid(), host)
+        _worker_host = host
+    return _worker_host
+
+
+def get_availability_zone():
+    """Returns the 'zone:host' availability zone of the worker host or None."""
+    host = get_worker_host()
+    if host is None:
+        return None
+    if ':' not in host:
+        host = '%s:%s' % (DEFAULT_ZONE, host)
+    return host
+
+
+@contextlib.contextmanager
+def host_slot(host, operation):
+    """Waits for a free slot of the host to run an operation in.
+
+    :param host: host name or '[zone:]host' entry, nothing is throttled
+                 when None
+    :param operation: 'vm' or 'disk', which slots to take
+    """
+    size = {'vm': CONF.lis.max_vm_operations_per_host,
+            'disk': CONF.lis.max_disk_operations_per_host}[operation]
+    if not host or size <= 0:
+        yield
+        return
+    lock_dir = _get_lock_dir()
+    host_name = _get_host_name(host)
+    locks = [lockutils.InterProcessLock(os.path.join(
+        lock_dir, '%s.%s.%d' % (host_name, operation, slot)))
+        for slot in range(size)]
+    start_time = time.time()
+    while True:
+        for lock in locks:
+            if lock.acquire(blocking=False):
+                LOG.debug('Took a %s slot of host %s after %d seconds',
+                          operation, host_name, time.time() - start_time)
+                try:
+                    yield
+                finally:
+                    lock.release()
+                return
+        time.sleep(SLOT_POLL_INTERVAL)
+
+
+def host_operation(operation):
+    """Runs a LisBase method in a slot of its instance host (host_name)."""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(self, *args, **kwargs):
+            with host_slot(self.host_name, operation):
+                return f(self, *args, **kwargs)
+        return wrapper
+    return decorator
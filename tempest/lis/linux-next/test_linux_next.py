@@ -159,8 +159,7 @@ class LinuxNext(manager.LisBase):
         self.stop_vm(self.server_id)
         self.change_cpu(self.instance_name, vcpu_count)
         self.set_ram_settings(self.instance_name, memory_assigned)
-        for disk in self.disks:
-            self.detach_disk(self.instance_name, disk)
+        self.detach_disks(self.instance_name, self.disks)
         snapshot_image = self.create_server_snapshot_nocleanup(
             server=self.instance, name="linux-next-temp")
         # boot a second instance from the snapshot
@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from multiprocessing.pool import ThreadPool
 import time
 import subprocess
 import os
@@ -32,6 +33,7 @@ from tempest import exceptions
 from tempest.lib.common.utils import misc as misc_utils
 from tempest.common.utils.windows.remote_client import WinRemoteClient
 from tempest.lib import exceptions as lib_exc
+from tempest.lis import host_affinity
 from tempest.services.network import resources as net_resources
 import tempest.test
 
@@ -1503,12 +1505,34 @@ class ObjectStorageScenarioTest(ScenarioTest):
 
 class LisBase(ScenarioTest):
 
+    vm_properties = ['Name', 'State', 'Status', 'Uptime', 'Generation',
+                     'Version', 'ProcessorCount', 'NumaNodesCount',
+                     'DynamicMemoryEnabled', 'MemoryStartup',
+                     'MemoryMinimum', 'MemoryMaximum', 'MemoryAssigned',
+                     'MemoryDemand', 'IntegrationServicesVersion']
+    vm_memory_properties = ['DynamicMemoryEnabled', 'Minimum', 'Startup',
+                            'Maximum', 'Priority', 'Buffer']
+    vm_integration_service_properties = ['Name', 'Enabled',
+                                         'OperationalStatus',
+                                         'PrimaryStatusDescription',
+                                         'SecondaryStatusDescription']
+    vm_disk_properties = ['Name', 'ControllerType', 'ControllerNumber',
+                          'ControllerLocation', 'Path', 'DiskNumber']
+
     def setUp(self):
         super(LisBase, self).setUp()
         self.host_username = CONF.host_credentials.host_user_name
         self.host_password = CONF.host_credentials.host_password
         self.script_folder = CONF.host_credentials.host_setupscripts_folder
 
+    def host_batch(self):
+        """Returns a batch of host commands sent in one WinRM call.
+
+        Queue operations with add_cmd/add_cmd_attribute and run them with
+        execute(), which returns one result per queued operation.
+        """
+        return self.host_client.batch()
+
     def _initiate_host_client(self, host_name):
         try:
             self.host_client = WinRemoteClient(
@@ -1593,6 +1617,7 @@ class LisBase(ScenarioTest):
         self.servers_client.stop_server(vm_id)
         waiters.wait_for_server_status(self.servers_client, vm_id, 'SHUTOFF')
 
+    @host_affinity.host_operation('disk')
     def add_disk(self, instance_name, disk_type,
                  position, vhd_type, sec_size, size='1GB'):
         """Attach Disk to VM"""
@@ -1617,6 +1642,40 @@ class LisBase(ScenarioTest):
         self.addCleanup(self.remove_disk, instance_name, disk_name)
         self.disks.append(disk_name)
 
+    @host_affinity.host_operation('disk')
+    def add_disks(self, instance_name, disk_type, positions,
+                  vhd_type, sec_size, size='1GB'):
+        """Attach several disks to a VM in a single host round trip"""
+
+        script_location = "%s%s" % (self.script_folder,
+                                    'setupscripts\\attach-disk.ps1')
+        batch = self.host_batch()
+        disk_names = []
+        for ctrl_type, ctrl_id, ctrl_loc in positions:
+            batch.add_cmd(
+                script_location,
+                vmName=instance_name,
+                hvServer=self.host_name,
+                diskType=disk_type,
+                controllerType=ctrl_type,
+                controllerID=ctrl_id,
+                Lun=ctrl_loc,
+                vhdType=vhd_type,
+                sectorSize=sec_size,
+                diskSize=size)
+            disk_names.append('-'.join([instance_name, ctrl_type,
+                                        str(ctrl_id), str(ctrl_loc),
+                                        vhd_type]) + '.*')
+        results = batch.execute(raise_on_error=False)
+
+        attached = [name for name, result in zip(disk_names, results)
+                    if result.exit_code == SUCCESS_RETURN_CODE]
+        if attached:
+            self.addCleanup(self.remove_disks, instance_name, attached)
+            self.disks.extend(attached)
+        batch.raise_for_errors(results)
+
+    @host_affinity.host_operation('disk')
     def add_pass_disk(self, instance_name, position):
         """Create a passthrough disk and attach to VM"""
         ctrl_type, ctrl_id, ctrl_loc = position
@@ -1637,6 +1696,7 @@ class LisBase(ScenarioTest):
         self.addCleanup(self.remove_disk, instance_name, disk_name)
         self.disks.append(disk_name)
 
+    @host_affinity.host_operation('disk')
     def add_diff_disk(self, instance_name, position, vhd_type):
         """Attach diff Disk to VM"""
 
@@ -1677,6 +1737,7 @@ class LisBase(ScenarioTest):
             LOG.exception(exc)
             raise exc
 
+    @host_affinity.host_operation('disk')
     def remove_disk(self, instance_name, disk_name):
         """Cleanup for temporary disks"""
 
@@ -1688,6 +1749,37 @@ class LisBase(ScenarioTest):
             hvServer=self.host_name,
             diskName=disk_name)
 
+    @host_affinity.host_operation('disk')
+    def remove_disks(self, instance_name, disk_names):
+        """Cleanup for temporary disks, in a single host round trip"""
+
+        script_location = "%s%s" % (self.script_folder,
+                                    'setupscripts\\remove-disk.ps1')
+        batch = self.host_batch()
+        for disk_name in disk_names:
+            batch.add_cmd(
+                script_location,
+                vmName=instance_name,
+                hvServer=self.host_name,
+                diskName=disk_name)
+        batch.execute()
+
+    @host_affinity.host_operation('disk')
+    def detach_disks(self, instance_name, disk_names):
+        """Detach several disks from a vm in a single host round trip"""
+
+        script_location = "%s%s" % (self.script_folder,
+                                    'setupscripts\\detach-disk.ps1')
+        batch = self.host_batch()
+        for disk_name in disk_names:
+            batch.add_cmd(
+                script_location,
+                vmName=instance_name,
+                hvServer=self.host_name,
+                diskName=disk_name)
+        batch.execute()
+
+    @host_affinity.host_operation('disk')
     def detach_disk(self, instance_name, disk_name):
         """Detach a disk from a vm"""
 
@@ -1843,13 +1935,71 @@ class LisBase(ScenarioTest):
             Value=value,
             Pool=pool)
 
-    def get_cpu_settings(self, instance_name):
-        s_out = self.host_client.get_powershell_cmd_attribute(
-            'Get-VM', 'ProcessorCount',
+    def _kvp_batch(self, script_name, instance_name, values, pool):
+        script_location = "%s%s" % (self.script_folder,
+                                    'setupscripts\\' + script_name)
+        batch = self.host_batch()
+        for key, value in sorted(values.items()):
+            batch.add_cmd(
+                script_location,
+                hvServer=self.host_name,
+                vmName=instance_name,
+                key=key,
+                Value=value,
+                Pool=pool)
+        batch.execute()
+
+    def kvp_add_values(self, instance_name, values, pool):
+        """Adds a dict of KVP items in a single host round trip"""
+        self._kvp_batch('kvp_add_value.ps1', instance_name, values, pool)
+
+    def kvp_modify_values(self, instance_name, values, pool):
+        """Modifies a dict of KVP items in a single host round trip"""
+        self._kvp_batch('kvp_modify_value.ps1', instance_name, values, pool)
+
+    def kvp_remove_values(self, instance_name, values, pool):
+        """Removes a dict of KVP items in a single host round trip"""
+        self._kvp_batch('kvp_remove_value.ps1', instance_name, values, pool)
+
+    def get_vm_info(self, instance_name, cache=False):
+        """Returns the VM settings and runtime status as a dict.
+
+        Runtime values such as MemoryDemand, and settings changed outside
+        of the host client, e.g. by a resize, change without any host
+        command, so only pass cache=True when nothing can have changed them
+        since the last query.
+        """
+        return self.host_client.get_powershell_cmd_object(
+            'Get-VM', self.vm_properties, cache,
             ComputerName=self.host_name,
             VMName=instance_name)
 
-        return int(s_out)
+    def get_vm_memory_info(self, instance_name, cache=False):
+        """Returns the VM memory settings as a dict, see get_vm_info."""
+        return self.host_client.get_powershell_cmd_object(
+            'Get-VMMemory', self.vm_memory_properties, cache,
+            ComputerName=self.host_name,
+            VMName=instance_name)
+
+    def get_vm_integration_services(self, instance_name, cache=False):
+        """Returns the VM integration services as a dict keyed by name."""
+        services = self.host_client.get_powershell_cmd_objects(
+            'Get-VMIntegrationService',
+            self.vm_integration_service_properties, cache,
+            ComputerName=self.host_name,
+            VMName=instance_name)
+        return dict((service['Name'], service) for service in services)
+
+    def get_vm_disks(self, instance_name, cache=False):
+        """Returns the hard disk drives attached to the VM."""
+        return self.host_client.get_powershell_cmd_objects(
+            'Get-VMHardDiskDrive', self.vm_disk_properties, cache,
+            ComputerName=self.host_name,
+            VMName=instance_name)
+
+    def get_cpu_settings(self, instance_name, cache=False):
+        vm_info = self.get_vm_info(instance_name, cache)
+        return int(vm_info['ProcessorCount'])
 
     def change_cpu(self, instance_name, new_cpu_count):
         """Change the vcpu of a vm"""
@@ -1992,26 +2142,20 @@ class LisBase(ScenarioTest):
             DynamicMemoryEnabled='$false')
 
     def get_ram_settings(self, instance_name, memory_setting='Startup'):
-        s_out = self.host_client.get_powershell_cmd_attribute(
-            'Get-VMMemory', memory_setting,
-            ComputerName=self.host_name,
-            VMName=instance_name)
+        memory_info = self.get_vm_memory_info(instance_name)
 
         # setting can be: Minimum, Startup, Maximum
 
-        memory_size = long(s_out)
+        memory_size = long(memory_info[memory_setting])
         memory_size = memory_size / 1024 / 1024
         return memory_size
 
     def get_ram_status(self, instance_name, status='MemoryDemand'):
-        s_out = self.host_client.get_powershell_cmd_attribute(
-            'Get-VM', status,
-            ComputerName=self.host_name,
-            VMName=instance_name)
+        vm_info = self.get_vm_info(instance_name)
 
         # status can be: MemoryDemand, MemoryAssigned
 
-        memory_size = long(s_out)
+        memory_size = long(vm_info[status])
         memory_size = memory_size / 1024 / 1024
         return memory_size
 
@@ -2057,10 +2201,7 @@ class LisBase(ScenarioTest):
             memory = long(memory)
             memory_size = memory * 1024 * 1024 * 1024
         elif memory.endswith('%'):
-            cmd = "$osInfo = Get-WMIObject Win32_OperatingSystem; "
-            cmd += "$osInfo.FreePhysicalMemory * 1KB"
-            host_mem_capacity = self.host_client.run_powershell_cmd(cmd)
-            host_mem_capacity = long(host_mem_capacity)
+            host_mem_capacity = self.get_host_memory('free') * 1024
             memory = memory.replace('%', '')
             memory = float(memory)
             memory = memory / 100
@@ -2076,16 +2217,19 @@ class LisBase(ScenarioTest):
         return memory_size
 
     def get_host_memory(self, memory_info):
+        """Returns the host free or total memory in KB."""
         if memory_info.lower() == 'free':
             meminfo = 'FreePhysicalMemory'
-        elif memory_info.lower == 'total':
+        elif memory_info.lower() == 'total':
             meminfo = 'TotalVisibleMemorySize'
         else:
             raise Exception("Could not understand requirement {0}".format(memory_info))
 
-        meminfo = self.host_client.run_powershell_cmd('gwmi Win32_OperatingSystem | % {$_.{0}}'.format(meminfo))
+        os_info = self.host_client.get_powershell_cmd_object(
+            'Get-WmiObject', ['FreePhysicalMemory', 'TotalVisibleMemorySize'],
+            Class='Win32_OperatingSystem')
 
-        return meminfo
+        return long(os_info[meminfo])
 
     def determine_memory_stress_parameters(self):
         distro = self.linux_client.get_os_type()
@@ -2124,14 +2268,12 @@ class LisBase(ScenarioTest):
                     "Hot Add not supported on {distro}".format(distro=distro))
 
     def check_heartbeat_status(self, instance_name):
-        s_out = self.host_client.get_powershell_cmd_attribute(
-            'Get-VMIntegrationService', 'PrimaryStatusDescription',
-            ComputerName=self.host_name,
-            VMName=instance_name,
-            Name='Heartbeat')
+        heartbeat = self.get_vm_integration_services(instance_name)[
+            'Heartbeat']
+        status = heartbeat['PrimaryStatusDescription'] or ''
 
         assert_msg = 'Heartbeat lost communication to VM'
-        self.assertTrue(s_out.strip().lower() != 'lost communication', assert_msg)
+        self.assertTrue(status.strip().lower() != 'lost communication', assert_msg)
 
     def format_disk(self, expected_disk_count, filesystem):
         script_name = 'STOR_Lis_Disk.sh'
@@ -2271,11 +2413,16 @@ class LisBase(ScenarioTest):
         # Create server with image and flavor from input scenario
         security_group = self._create_security_group()
         security_groups = [{'name': security_group['name']}]
-        self.instance = self.create_server(flavor=self.flavor_ref,
-                                           image_id=self.image_ref,
-                                           key_name=self.keypair['name'],
-                                           security_groups=security_groups,
-                                           wait_until='ACTIVE')
+        kwargs = dict()
+        av_zone = host_affinity.get_availability_zone()
+        if av_zone is not None:
+            kwargs['availability_zone'] = av_zone
+        with host_affinity.host_slot(av_zone, 'vm'):
+            self.instance = self.create_server(
+                flavor=self.flavor_ref, image_id=self.image_ref,
+                key_name=self.keypair['name'],
+                security_groups=security_groups, wait_until='ACTIVE',
+                **kwargs)
         self.instance_name = self.instance["OS-EXT-SRV-ATTR:instance_name"]
         self.host_name = self.instance["OS-EXT-SRV-ATTR:hypervisor_hostname"]
         self._initiate_host_client(self.host_name)
@@ -2299,3 +2446,101 @@ class LisBase(ScenarioTest):
         self.nova_floating_ip_create()
         self.nova_floating_ip_add()
         self.server_id = self.instance['id']
+
+    def _wait_for_server_host(self, server_id):
+        """Waits until a server is scheduled on a hypervisor and returns it."""
+        start_time = int(time.time())
+        while True:
+            server = self.servers_client.show_server(server_id)['server']
+            if server.get('OS-EXT-SRV-ATTR:hypervisor_hostname'):
+                return server
+            if server['status'] == 'ERROR':
+                raise exceptions.BuildErrorException(server.get('fault'),
+                                                     server_id=server_id)
+            if int(time.time()) - start_time >= \
+                    self.servers_client.build_timeout:
+                raise exceptions.TimeoutException(
+                    'Server %s was not scheduled on any host within the '
+                    'required time (%s s).' %
+                    (server_id, self.servers_client.build_timeout))
+            time.sleep(self.servers_client.build_interval)
+
+    def _wait_for_active_server(self, server_id):
+        waiters.wait_for_server_status(self.servers_client, server_id,
+                                       'ACTIVE')
+        return self.servers_client.show_server(server_id)['server']
+
+    def _create_floating_ip_address(self):
+        floating_ip = self.floating_ips_client.create_floatingip(
+            floating_network_id=CONF.network.public_network_id)['floatingip']
+        self.addCleanup(self.delete_wrapper,
+                        self.floating_ips_client.delete_floatingip,
+                        floating_ip['id'])
+        return floating_ip['floating_ip_address']
+
+    def _associate_floating_ip_address(self, args):
+        instance, floating_ip = args
+        self.compute_floating_ips_client.associate_floating_ip_to_server(
+            floating_ip, instance['id'])
+        instance['floating_ip'] = floating_ip
+        return instance
+
+    def spawn_vms(self, count, same_host=False, av_zone=None):
+        """Boots several instances at once, each with a floating IP.
+
+        All the boot requests are sent before waiting on any of them, then
+        the instances are waited on and given floating IPs concurrently, so
+        the whole setup takes about as long as the slowest single boot.
+        The instances share one keypair (self.keypair) and security group.
+
+        :param count: number of instances to boot
+        :param same_host: when True, place every instance on the hypervisor
+                          the first one is scheduled on
+        :param av_zone: availability zone ('zone' or 'zone:host') to boot
+                        the instances in, defaults to the worker host when
+                        [lis] hosts are configured
+        :return: list of server dicts, with the floating IP address added
+                 under the 'floating_ip' key
+        :rtype: List
+        """
+        if count < 1:
+            raise ValueError("Cannot spawn %s instances" % count)
+        self.add_keypair()
+        security_group = self._create_security_group()
+        kwargs = dict(flavor=self.flavor_ref, image_id=self.image_ref,
+                      key_name=self.keypair['name'],
+                      security_groups=[{'name': security_group['name']}])
+        if av_zone is None:
+            av_zone = host_affinity.get_availability_zone()
+        if av_zone is not None:
+            kwargs['availability_zone'] = av_zone
+        # NOTE: a whole batch of boots takes a single slot of the host
+        with host_affinity.host_slot(av_zone, 'vm'):
+            server_ids = []
+            if same_host and av_zone is None:
+                # Only wait for the scheduler to pick a host for the first
+                # instance, the others are pinned to it and boot alongside.
+                server_ids.append(self.create_server(**kwargs)['id'])
+                server = self._wait_for_server_host(server_ids[0])
+                kwargs['availability_zone'] = '%s:%s' % (
+                    server['OS-EXT-AZ:availability_zone'],
+                    server['OS-EXT-SRV-ATTR:hypervisor_hostname'])
+            while len(server_ids) < count:
+                server_ids.append(self.create_server(**kwargs)['id'])
+
+            pool = ThreadPool(count)
+            try:
+                floating_ips = pool.map_async(
+                    lambda _: self._create_floating_ip_address(),
+                    range(count))
+                instances = pool.map(self._wait_for_active_server,
+                                     server_ids)
+                instances = pool.map(self._associate_floating_ip_address,
+                                     zip(instances, floating_ips.get()))
+            finally:
+                pool.close()
+                pool.join()
+        self.instances = instances
+        self._initiate_host_client(
+            instances[0]['OS-EXT-SRV-ATTR:hypervisor_hostname'])
+        return instances
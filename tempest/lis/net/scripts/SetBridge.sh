@@ -8,7 +8,7 @@ sudo su
 
 LogMsg()
 {
-	echo $(date "+%a %b %d %T %Y") : "${1}"  >> ~/$0.log
+	echo $(date "+%a %b %d %T %Y") : "${1}"  >> ~/$(basename $0).log
 }
 if [ $# -lt 2 ]; then
 	LogMsg "SetupBridge needs at least 2 parameters"
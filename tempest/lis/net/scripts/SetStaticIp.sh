@@ -9,7 +9,7 @@ sudo su
 
 LogMsg()
 {
-	echo $(date "+%a %b %d %T %Y") : "${1}" >> ~/$0.log
+	echo $(date "+%a %b %d %T %Y") : "${1}" >> ~/$(basename $0).log
 }
 
 if [ 2 -gt $# ]; then
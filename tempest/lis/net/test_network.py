@@ -14,6 +14,7 @@
 
 from tempest import config
 from tempest.common.utils.windows.remote_client import WinRemoteClient
+from tempest.lis import host_affinity
 from tempest.lis import manager
 from oslo_log import log as logging
 from tempest.scenario import utils as test_utils
@@ -199,13 +200,16 @@ class Network(manager.LisBase):
             security_group = self._create_security_group()
             security_groups = [{'name': security_group['name']}]
         kw_args = dict()
+        if av_zone is None:
+            av_zone = host_affinity.get_availability_zone()
         if av_zone is not None:
             kw_args['availability_zone'] = av_zone
-        instance = self.create_server(flavor=self.flavor_ref,
-                                      image_id=self.image_ref,
-                                      key_name=key_pair['name'],
-                                      security_groups=security_groups,
-                                      wait_until='ACTIVE', **kw_args)
+        with host_affinity.host_slot(av_zone, 'vm'):
+            instance = self.create_server(flavor=self.flavor_ref,
+                                          image_id=self.image_ref,
+                                          key_name=key_pair['name'],
+                                          security_groups=security_groups,
+                                          wait_until='ACTIVE', **kw_args)
         # Obtain a floating IP
         floating_ip = self._get_floating_ip()
         # Attach a floating IP
@@ -386,17 +390,9 @@ class Network(manager.LisBase):
             external_setup['host_name'] = host_name
         """
         # use existing external network assigning nova floating ips
-        key_pair = self.create_keypair()
-        security_group = self._create_security_group()
-        security_groups = [{'name': security_group['name']}]
-        inst1 = self._create_vm(key_pair=key_pair,
-                                security_groups=security_groups)
+        inst1, inst2 = self.spawn_vms(2, same_host=True)
+        key_pair = self.keypair
         host_name = inst1["OS-EXT-SRV-ATTR:hypervisor_hostname"]
-        host_zone = inst1['OS-EXT-AZ:availability_zone']
-        av_zone = host_zone + ':' + host_name
-        inst2 = self._create_vm(key_pair=key_pair,
-                                security_groups=security_groups,
-                                av_zone=av_zone)
 
         if create_sw is True:
             host_client, sw_names = self._create_vswitch(host_name,
@@ -456,17 +452,9 @@ class Network(manager.LisBase):
             internal_setup['host_ip'] = host_ip
             internal_setup['host_client'] = host_client
         """
-        key_pair = self.create_keypair()
-        security_group = self._create_security_group()
-        security_groups = [{'name': security_group['name']}]
-        inst1 = self._create_vm(key_pair=key_pair,
-                                security_groups=security_groups)
+        inst1, inst2 = self.spawn_vms(2, same_host=True)
+        key_pair = self.keypair
         host_name = inst1["OS-EXT-SRV-ATTR:hypervisor_hostname"]
-        host_zone = inst1['OS-EXT-AZ:availability_zone']
-        av_zone = host_zone + ':' + host_name
-        inst2 = self._create_vm(key_pair=key_pair,
-                                security_groups=security_groups,
-                                av_zone=av_zone)
 
         vlan_diff = None
         if isinstance(vlan, list):
@@ -513,17 +501,9 @@ class Network(manager.LisBase):
             private_setup['linux_ips'] = [ip1, ip2]
             private_setup['key_pair'] = key_pair
         """
-        key_pair = self.create_keypair()
-        security_group = self._create_security_group()
-        security_groups = [{'name': security_group['name']}]
-        inst1 = self._create_vm(key_pair=key_pair,
-                                security_groups=security_groups)
+        inst1, inst2 = self.spawn_vms(2, same_host=True)
+        key_pair = self.keypair
         host_name = inst1["OS-EXT-SRV-ATTR:hypervisor_hostname"]
-        host_zone = inst1['OS-EXT-AZ:availability_zone']
-        av_zone = host_zone + ':' + host_name
-        inst2 = self._create_vm(key_pair=key_pair,
-                                security_groups=security_groups,
-                                av_zone=av_zone)
 
         host_client, sw_names = self._create_vswitch(host_name, private_sw=True)
 
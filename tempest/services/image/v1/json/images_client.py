@@ -118,6 +118,7 @@ class ImagesClient(rest_client.RestClient):
         self._error_checker('POST', '/v1/images', headers, data, resp,
                             body_iter)
         body = json.loads(''.join([c for c in body_iter]))
+        self._check_upload_checksum(resp, body['image'])
         return rest_client.ResponseBody(resp, body)
 
     def _update_with_data(self, image_id, headers, data):
@@ -127,8 +128,17 @@ class ImagesClient(rest_client.RestClient):
         self._error_checker('PUT', url, headers, data,
                             resp, body_iter)
         body = json.loads(''.join([c for c in body_iter]))
+        self._check_upload_checksum(resp, body['image'])
         return rest_client.ResponseBody(resp, body)
 
+    def _check_upload_checksum(self, resp, image):
+        # Streamed uploads are hashed while sent, check glance got the same
+        checksum = getattr(resp, 'upload_checksum', None)
+        if checksum and image.get('checksum') not in (None, checksum):
+            raise exceptions.ImageChecksumMismatch(
+                name=image.get('id'), checksum=checksum,
+                actual=image['checksum'])
+
     @property
     def http(self):
         if self._http is None:
@@ -211,6 +221,21 @@ class ImagesClient(rest_client.RestClient):
         self.expected_success(200, resp.status)
         return rest_client.ResponseBodyData(resp, body)
 
+    def download_image(self, image_id, path, resume=True, checksum=None):
+        """Streams the data of an image into the file at path.
+
+        Unlike show_image, the data is never held in memory. With resume,
+        the download continues from the end of an existing file.
+        """
+        url = 'v1/images/%s' % image_id
+        resp, body = self.http.download(url, path, resume=resume,
+                                        checksum=checksum)
+        if resp.status != 416:
+            # 416: the file already held the whole image
+            self._error_checker('GET', url, {}, None, resp, body)
+            self.expected_success([200, 206], resp.status)
+        return rest_client.ResponseBody(resp, {'checksum': body})
+
     def is_resource_deleted(self, id):
         try:
             if self.get_image_meta(id)['status'] == 'deleted':
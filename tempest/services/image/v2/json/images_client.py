@@ -130,6 +130,22 @@ class ImagesClientV2(rest_client.RestClient):
         self.expected_success(200, resp.status)
         return rest_client.ResponseBodyData(resp, body)
 
+    def download_image_file(self, image_id, path, resume=True,
+                            checksum=None):
+        """Streams the data of an image into the file at path.
+
+        Unlike show_image_file, the data is never held in memory. With
+        resume, the download continues from the end of an existing file.
+        """
+        url = 'v2/images/%s/file' % image_id
+        resp, body = self.http.download(url, path, resume=resume,
+                                        checksum=checksum)
+        if resp.status != 416:
+            # 416: the file already held the whole image
+            self._error_checker('GET', url, {}, None, resp, body)
+            self.expected_success([200, 206], resp.status)
+        return rest_client.ResponseBody(resp, {'checksum': body})
+
     def add_image_tag(self, image_id, tag):
         url = 'v2/images/%s/tags/%s' % (image_id, tag)
         resp, body = self.put(url, body=None)
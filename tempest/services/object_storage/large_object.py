@@ -0,0 +1,234 @@
+# Copyright 2016 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Parallel transfers of Swift large objects.
+
+An object is uploaded as segments sent concurrently, then tied together by
+a static (SLO) or dynamic (DLO) large object manifest. Downloads fetch byte
+ranges of the object concurrently. The requests go through kept-alive
+connections of a shared pool, so the transfers are not bound by a single
+stream.
+
+At most a few segments per worker are held in memory at once: the data is
+read, hashed and written in order by the calling thread, only the requests
+run in the workers.
+"""
+
+import collections
+import copy
+import hashlib
+from multiprocessing.pool import ThreadPool
+import time
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+import six
+
+from tempest import exceptions
+from tempest.lib.common import http
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_SIZE = 1024 * 1024 * 16  # 16MB
+DEFAULT_CONCURRENCY = 8
+# Segments pending or waiting to be written, per worker
+SEGMENTS_PER_WORKER = 2
+
+
+def _ordered_map(pool, func, tasks, limit):
+    """Yields func(task) of every task, run in pool, in the order of tasks.
+
+    Unlike pool.imap, the tasks are only pulled from the iterator, in the
+    calling thread, while less than limit results are pending.
+    """
+    pending = collections.deque()
+    try:
+        for task in tasks:
+            if len(pending) >= limit:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(func, (task,)))
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        # Do not leave requests running behind the caller on errors
+        for result in pending:
+            result.wait()
+
+
+def _strip_etag(etag):
+    return etag.strip('"') if etag else etag
+
+
+class LargeObjectTransfer(object):
+    """Uploads and downloads Swift objects in parallel segments.
+
+    :param object_client: the ObjectClient of the account to use
+    :param segment_size: size in bytes of the segments and downloaded ranges
+    :param concurrency: number of segments or ranges transferred at once
+    """
+
+    def __init__(self, object_client, segment_size=DEFAULT_SEGMENT_SIZE,
+                 concurrency=DEFAULT_CONCURRENCY):
+        self.segment_size = segment_size
+        self.concurrency = max(concurrency, 1)
+        self.client = self._get_pooled_client(object_client)
+
+    def _get_pooled_client(self, object_client):
+        """Returns a copy of the client sending over kept-alive connections.
+
+        The client is then safe to share between the workers.
+        """
+        http_obj = object_client.http_obj
+        if (isinstance(http_obj, http.PooledHttp) and
+                http_obj.maxsize >= self.concurrency):
+            return object_client
+        client = copy.copy(object_client)
+        client.http_obj = http.get_shared_pooled_http(
+            self.concurrency,
+            disable_ssl_certificate_validation=getattr(
+                http_obj, 'disable_ssl_certificate_validation', False),
+            ca_certs=getattr(http_obj, 'ca_certs', None))
+        return client
+
+    def _run(self, func, tasks):
+        pool = ThreadPool(self.concurrency)
+        try:
+            for result in _ordered_map(
+                    pool, func, tasks,
+                    self.concurrency * SEGMENTS_PER_WORKER):
+                yield result
+        finally:
+            pool.close()
+            pool.join()
+
+    def _read_segments(self, data):
+        """Yields the (index, data, md5) segments of a file or stream."""
+        index = 0
+        while True:
+            chunk = data.read(self.segment_size)
+            if isinstance(chunk, six.text_type):
+                chunk = chunk.encode('utf-8')
+            if not chunk:
+                return
+            yield index, chunk, hashlib.md5(chunk).hexdigest()
+            index += 1
+
+    def _upload_segment(self, args):
+        container, prefix, (index, data, md5) = args
+        name = '%s/%08d' % (prefix, index)
+        resp, _ = self.client.create_object(container, name, data)
+        if _strip_etag(resp.get('etag')) != md5:
+            raise exceptions.ObjectTransferError(
+                name='%s/%s' % (container, name),
+                reason='etag %s instead of %s' % (resp.get('etag'), md5))
+        return {'path': '/%s/%s' % (container, name), 'etag': md5,
+                'size_bytes': len(data)}
+
+    def upload(self, container, name, data, static=True,
+               segment_container=None, metadata=None):
+        """Uploads the data of a path or file object as a large object.
+
+        The segments are stored in segment_container, the container of the
+        object by default, under a prefix unique to this upload.
+
+        :param static: write a static large object manifest if true, a
+                       dynamic large object manifest otherwise
+        :param metadata: headers of the manifest object
+        :returns: the response of the manifest upload and the list of the
+                  uploaded segments, as in a static large object manifest
+        :raises ObjectTransferError: if a segment or the manifest was not
+                                     stored as sent
+        """
+        if isinstance(data, six.string_types):
+            with open(data, 'rb') as f:
+                return self.upload(container, name, f, static,
+                                   segment_container, metadata)
+        segment_container = segment_container or container
+        prefix = '%s/%s/%.6f' % (name, 'slo' if static else 'dlo',
+                                 time.time())
+        segments = list(self._run(
+            self._upload_segment,
+            ((segment_container, prefix, segment)
+             for segment in self._read_segments(data))))
+        LOG.debug("Uploaded %d segments of %s/%s", len(segments), container,
+                  name)
+
+        metadata = dict(metadata or {})
+        if not segments:
+            resp, _ = self.client.create_object(container, name, '',
+                                                metadata=metadata)
+            return resp, segments
+        if static:
+            resp, _ = self.client.create_object(
+                container, name, json.dumps(segments),
+                params={'multipart-manifest': 'put'}, metadata=metadata)
+        else:
+            metadata['X-Object-Manifest'] = '%s/%s/' % (segment_container,
+                                                       prefix)
+            resp, _ = self.client.create_object(container, name, '',
+                                                metadata=metadata)
+        # The etag of a large object is the md5 of the etags of its segments
+        checksum = hashlib.md5(
+            ''.join(s['etag'] for s in segments).encode('ascii')).hexdigest()
+        etag = _strip_etag(resp.get('etag'))
+        if static and etag != checksum:
+            raise exceptions.ObjectTransferError(
+                name='%s/%s' % (container, name),
+                reason='etag %s instead of %s' % (etag, checksum))
+        return resp, segments
+
+    def _download_range(self, args):
+        container, name, start, end = args
+        _, body = self.client.get_object(
+            container, name, metadata={'Range': 'bytes=%d-%d' % (start, end)})
+        if len(body) != end - start + 1:
+            raise exceptions.ObjectTransferError(
+                name='%s/%s' % (container, name),
+                reason='got %d bytes of range %d-%d' % (len(body), start,
+                                                        end))
+        return body
+
+    def download(self, container, name, dest):
+        """Downloads an object into a path or file object, in ranges.
+
+        The ranges are fetched concurrently, and written in order.
+
+        :returns: the response of the object HEAD request and the md5 of
+                  the data
+        :raises ObjectTransferError: if a range is cut short, or if the
+                                     data of an object which is not a large
+                                     object does not match its etag
+        """
+        if isinstance(dest, six.string_types):
+            with open(dest, 'wb') as f:
+                return self.download(container, name, f)
+        resp, _ = self.client.list_object_metadata(container, name)
+        size = int(resp['content-length'])
+        ranges = ((container, name, start,
+                   min(start + self.segment_size, size) - 1)
+                  for start in six.moves.range(0, size, self.segment_size))
+        md5 = hashlib.md5()
+        for body in self._run(self._download_range, ranges):
+            dest.write(body)
+            md5.update(body)
+        # The etag of a large object is not the md5 of its data
+        is_large_object = ('x-static-large-object' in resp or
+                           'x-object-manifest' in resp)
+        etag = _strip_etag(resp.get('etag'))
+        if not is_large_object and etag and etag != md5.hexdigest():
+            raise exceptions.ObjectTransferError(
+                name='%s/%s' % (container, name),
+                reason='md5 %s instead of etag %s' % (md5.hexdigest(), etag))
+        return resp, md5.hexdigest()
@@ -12,6 +12,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import multiprocessing
 import os
 import signal
@@ -24,13 +25,15 @@ from six import moves
 
 
 from tempest import clients
-from tempest.common import cred_client
 from tempest.common import credentials_factory as credentials
-from tempest.common.utils import data_utils
 from tempest import config
 from tempest import exceptions
 from tempest.lib.common import ssh
 from tempest.stress import cleanup
+from tempest.stress import logwatch
+from tempest.stress import ratelimit
+from tempest.stress import statistics
+from tempest.stress import tenants
 
 CONF = config.CONF
 
@@ -67,19 +70,12 @@ def _get_compute_nodes(controller, ssh_user, ssh_key=None):
     return nodes
 
 
-def _has_error_in_logs(logfiles, nodes, ssh_user, ssh_key=None,
-                       stop_on_error=False):
-    """Detect errors in nova log files on the controller and compute nodes."""
-    grep = 'egrep "ERROR|TRACE" %s' % logfiles
-    ret = False
-    for node in nodes:
-        errors = do_ssh(grep, node, ssh_user, ssh_key)
-        if len(errors) > 0:
-            LOG.error('%s: %s' % (node, errors))
-            ret = True
-            if stop_on_error:
-                break
-    return ret
+def _has_error_in_logs(log_watcher):
+    """Detect new errors in nova log files on the compute nodes."""
+    node_errors = log_watcher.check()
+    for node, errors in six.iteritems(node_errors):
+        LOG.error('%s: %s' % (node, '\n'.join(errors)))
+    return bool(node_errors)
 
 
 def sigchld_handler(signalnum, frame):
@@ -127,132 +123,147 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
         computes = _get_compute_nodes(controller, ssh_user, ssh_key)
         for node in computes:
             do_ssh("rm -f %s" % logfiles, node, ssh_user, ssh_key)
-    skip = False
-    for test in tests:
-        for service in test.get('required_services', []):
-            if not CONF.service_available.get(service):
-                skip = True
-                break
-        if skip:
-            break
-        if test.get('use_admin', False):
-            manager = admin_manager
-        else:
-            manager = credentials.ConfiguredUserManager()
-        for p_number in moves.xrange(test.get('threads', default_thread_num)):
-            if test.get('use_isolated_tenants', False):
-                username = data_utils.rand_name("stress_user")
-                tenant_name = data_utils.rand_name("stress_tenant")
-                password = "pass"
-                if CONF.identity.auth_version == 'v2':
-                    identity_client = admin_manager.identity_client
-                    projects_client = admin_manager.tenants_client
-                    roles_client = admin_manager.roles_client
-                    users_client = admin_manager.users_client
-                    domains_client = None
-                else:
-                    identity_client = admin_manager.identity_v3_client
-                    projects_client = admin_manager.projects_client
-                    roles_client = admin_manager.roles_v3_client
-                    users_client = admin_manager.users_v3_client
-                    domains_client = admin_manager.domains_client
-                domain = (identity_client.auth_provider.credentials.
-                          get('project_domain_name', 'Default'))
-                credentials_client = cred_client.get_creds_client(
-                    identity_client, projects_client, users_client,
-                    roles_client, domains_client, project_domain_name=domain)
-                project = credentials_client.create_project(
-                    name=tenant_name, description=tenant_name)
-                user = credentials_client.create_user(username, password,
-                                                      project, "email")
-                # Add roles specified in config file
-                for conf_role in CONF.auth.tempest_roles:
-                    credentials_client.assign_user_role(user, project,
-                                                        conf_role)
-                creds = credentials_client.get_credentials(user, project,
-                                                           password)
-                manager = clients.Manager(credentials=creds)
-
-            test_obj = importutils.import_class(test['action'])
-            test_run = test_obj(manager, max_runs, stop_on_error)
-
-            kwargs = test.get('kwargs', {})
-            test_run.setUp(**dict(six.iteritems(kwargs)))
-
-            LOG.debug("calling Target Object %s" %
-                      test_run.__class__.__name__)
-
-            mp_manager = multiprocessing.Manager()
-            shared_statistic = mp_manager.dict()
-            shared_statistic['runs'] = 0
-            shared_statistic['fails'] = 0
-
-            p = multiprocessing.Process(target=test_run.execute,
-                                        args=(shared_statistic,))
-
-            process = {'process': p,
-                       'p_number': p_number,
-                       'action': test_run.action,
-                       'statistic': shared_statistic}
-
-            processes.append(process)
-            p.start()
-    if stop_on_error:
-        # NOTE(mkoderer): only the parent should register the handler
-        signal.signal(signal.SIGCHLD, sigchld_handler)
-    end_time = time.time() + duration
-    had_errors = False
+        log_watcher = logwatch.LogWatcher(logfiles, computes, ssh_user,
+                                          ssh_key)
+    # NOTE: every worker gets its own slot in a single shared memory block
+    statistic_block = statistics.StatisticsBlock(
+        sum(test.get('threads', default_thread_num) for test in tests))
+    slot = 0
+    # NOTE: the isolated tenants of all the workers are provisioned
+    # concurrently, before any load starts
+    tenant_provisioner = tenants.TenantProvisioner()
     try:
-        while True:
-            if max_runs is None:
-                remaining = end_time - time.time()
-                if remaining <= 0:
+        isolated_creds = tenant_provisioner.get_credentials(
+            sum(test.get('threads', default_thread_num) for test in tests
+                if test.get('use_isolated_tenants', False)))
+        start_time = time.time()
+        skip = False
+        for test in tests:
+            for service in test.get('required_services', []):
+                if not CONF.service_available.get(service):
+                    skip = True
                     break
+            if skip:
+                break
+            if test.get('use_admin', False):
+                manager = admin_manager
             else:
-                remaining = log_check_interval
-                all_proc_term = True
-                for process in processes:
-                    if process['process'].is_alive():
-                        all_proc_term = False
+                manager = credentials.ConfiguredUserManager()
+            for p_number in moves.xrange(test.get('threads',
+                                                  default_thread_num)):
+                if test.get('use_isolated_tenants', False):
+                    manager = clients.Manager(
+                        credentials=isolated_creds.pop())
+
+                test_obj = importutils.import_class(test['action'])
+                test_run = test_obj(manager, max_runs, stop_on_error)
+
+                kwargs = test.get('kwargs', {})
+                test_run.setUp(**dict(six.iteritems(kwargs)))
+
+                LOG.debug("calling Target Object %s" %
+                          test_run.__class__.__name__)
+
+                shared_statistic = statistic_block.get_slot(slot)
+                slot += 1
+
+                rate_limiter = None
+                if 'rate' in test:
+                    # NOTE: the workers of the action share its target rate
+                    rate_limiter = ratelimit.TokenBucket(
+                        ratelimit.RateProfile.from_dict(
+                            test['rate'],
+                            workers=test.get('threads', default_thread_num)),
+                        burst=test['rate'].get('burst', 1))
+
+                p = multiprocessing.Process(target=test_run.execute,
+                                            args=(shared_statistic,
+                                                  rate_limiter))
+
+                process = {'process': p,
+                           'p_number': p_number,
+                           'action': test_run.action,
+                           'statistic': shared_statistic}
+
+                processes.append(process)
+                p.start()
+        if stop_on_error:
+            # NOTE(mkoderer): only the parent should register the handler
+            signal.signal(signal.SIGCHLD, sigchld_handler)
+        end_time = time.time() + duration
+        had_errors = False
+        try:
+            while True:
+                if max_runs is None:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        break
+                else:
+                    remaining = log_check_interval
+                    all_proc_term = True
+                    for process in processes:
+                        if process['process'].is_alive():
+                            all_proc_term = False
+                            break
+                    if all_proc_term:
                         break
-                if all_proc_term:
-                    break
 
-            time.sleep(min(remaining, log_check_interval))
-            if stop_on_error:
-                if any([True for proc in processes
-                        if proc['statistic']['fails'] > 0]):
-                    break
+                time.sleep(min(remaining, log_check_interval))
+                if stop_on_error:
+                    if any([True for proc in processes
+                            if proc['statistic']['fails'] > 0]):
+                        break
 
-            if not logfiles:
-                continue
-            if _has_error_in_logs(logfiles, computes, ssh_user, ssh_key,
-                                  stop_on_error):
+                if not logfiles:
+                    continue
+                if _has_error_in_logs(log_watcher):
+                    had_errors = True
+                    break
+        except KeyboardInterrupt:
+            LOG.warning("Interrupted, going to print statistics and exit ...")
+
+        if stop_on_error:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        terminate_all_processes()
+        if logfiles:
+            log_watcher.close()
+        elapsed = time.time() - start_time
+
+        sum_fails = 0
+        sum_runs = 0
+        action_summaries = collections.OrderedDict()
+
+        LOG.info("Statistics (per process):")
+        for process in processes:
+            if process['statistic']['fails'] > 0:
                 had_errors = True
-                break
-    except KeyboardInterrupt:
-        LOG.warning("Interrupted, going to print statistics and exit ...")
-
-    if stop_on_error:
-        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
-    terminate_all_processes()
-
-    sum_fails = 0
-    sum_runs = 0
-
-    LOG.info("Statistics (per process):")
-    for process in processes:
-        if process['statistic']['fails'] > 0:
-            had_errors = True
-        sum_runs += process['statistic']['runs']
-        sum_fails += process['statistic']['fails']
-        print ("Process %d (%s): Run %d actions (%d failed)" % (
-               process['p_number'],
-               process['action'],
-               process['statistic']['runs'],
-               process['statistic']['fails']))
-    print ("Summary:")
-    print ("Run %d actions (%d failed)" % (sum_runs, sum_fails))
+            sum_runs += process['statistic']['runs']
+            sum_fails += process['statistic']['fails']
+            action_summaries.setdefault(
+                process['action'],
+                statistics.Summary()).add(process['statistic'])
+            print ("Process %d (%s): Run %d actions (%d failed)" % (
+                   process['p_number'],
+                   process['action'],
+                   process['statistic']['runs'],
+                   process['statistic']['fails']))
+        print ("Statistics (per action):")
+        for action, summary in six.iteritems(action_summaries):
+            print ("%s: %.2f runs/s, error rate %.2f%%, latency mean %.3fs "
+                   "p50 %.3fs p95 %.3fs p99 %.3fs max %.3fs" % (
+                       action,
+                       summary.runs / elapsed if elapsed > 0 else 0.0,
+                       summary.error_rate * 100,
+                       summary.latency_mean,
+                       summary.get_percentile(50),
+                       summary.get_percentile(95),
+                       summary.get_percentile(99),
+                       summary.latency_max))
+        print ("Summary:")
+        print ("Run %d actions (%d failed)" % (sum_runs, sum_fails))
+    finally:
+        # Also when the run fails or is interrupted
+        tenant_provisioner.cleanup()
 
     if not had_errors and CONF.stress.full_clean_stack:
         LOG.info("cleaning up")
@@ -0,0 +1,104 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from multiprocessing.pool import ThreadPool
+
+from oslo_log import log as logging
+from six.moves import shlex_quote
+
+from tempest.lib.common import ssh
+
+LOG = logging.getLogger(__name__)
+
+ERROR_PATTERN = 'ERROR|TRACE'
+_SIZE_MARKER = '@@logwatch-size@@'
+
+
+class LogWatcher(object):
+    """Scans the log files of nodes for errors while they grow.
+
+    One SSH connection is kept open per node, along with the size of each
+    log file already scanned, so every check only reads what was logged
+    since the previous one. The nodes are checked concurrently.
+
+    :param logfiles: shell glob of the log files on every node
+    :param nodes: host names of the nodes
+    """
+
+    def __init__(self, logfiles, nodes, ssh_user, ssh_key=None,
+                 pattern=ERROR_PATTERN):
+        self.logfiles = logfiles
+        self.nodes = list(nodes)
+        self.pattern = pattern
+        self._clients = dict(
+            (node, ssh.Client(node, ssh_user, key_filename=ssh_key,
+                              reuse_connection=True))
+            for node in self.nodes)
+        self._offsets = dict((node, {}) for node in self.nodes)
+        self._pool = None
+
+    def _get_command(self, node):
+        """Returns the script scanning the new data of the node logs.
+
+        It prints the current size of every log file, followed by the new
+        lines matching the pattern. A file smaller than the size seen last
+        time was rotated or truncated, and is scanned from the start.
+        """
+        offsets = ' '.join("%s) offset=%d ;;" % (shlex_quote(path), offset)
+                           for path, offset in
+                           sorted(self._offsets[node].items()))
+        return ('for f in %(logfiles)s; do '
+                '[ -f "$f" ] || continue; '
+                'offset=0; case "$f" in %(offsets)s esac; '
+                'size=$(stat -c %%s "$f"); '
+                '[ "$size" -lt "$offset" ] && offset=0; '
+                'echo "%(marker)s $size $f"; '
+                'tail -c +$((offset + 1)) "$f" | head -c $((size - offset)) '
+                '| egrep %(pattern)s; '
+                'done; true' % {'logfiles': self.logfiles,
+                                'offsets': offsets,
+                                'marker': _SIZE_MARKER,
+                                'pattern': shlex_quote(self.pattern)})
+
+    def _check_node(self, node):
+        try:
+            output = self._clients[node].exec_command(
+                self._get_command(node), ignore_exit_status=True)
+        except Exception:
+            LOG.exception('Failed to check the logs of %s', node)
+            return []
+        errors = []
+        path = None
+        for line in output.splitlines():
+            if line.startswith(_SIZE_MARKER + ' '):
+                size, path = line[len(_SIZE_MARKER) + 1:].split(' ', 1)
+                self._offsets[node][path] = int(size)
+            elif line:
+                errors.append('%s: %s' % (path, line))
+        return errors
+
+    def check(self):
+        """Returns the new error lines of every node with any."""
+        if self._pool is None:
+            self._pool = ThreadPool(max(len(self.nodes), 1))
+        results = self._pool.map(self._check_node, self.nodes)
+        return dict((node, errors)
+                    for node, errors in zip(self.nodes, results) if errors)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        for client in self._clients.values():
+            client.close()
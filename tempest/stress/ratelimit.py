@@ -0,0 +1,112 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+# Longest sleep of a token bucket wait, so that it follows rate changes.
+MAX_WAIT_INTERVAL = 1.0
+
+
+class RateProfile(object):
+    """Target operations per second of an action over time.
+
+    :param ops_per_second: the target rate
+    :param ramp_up: seconds over which the rate grows linearly from zero to
+                    the target rate
+    :param steps: list of {"after": seconds, "ops_per_second": rate} dicts,
+                  each changing the target rate once the given number of
+                  seconds passed since the start
+    """
+
+    def __init__(self, ops_per_second, ramp_up=0, steps=None):
+        self.ops_per_second = float(ops_per_second)
+        self.ramp_up = float(ramp_up)
+        self.steps = sorted((float(step['after']),
+                             float(step['ops_per_second']))
+                            for step in steps or [])
+
+    @classmethod
+    def from_dict(cls, rate, workers=1):
+        """Builds the profile of one of workers sharing a "rate" JSON entry.
+
+        Every worker gets an equal share of the rates of the entry.
+        """
+        return cls(float(rate['ops_per_second']) / workers,
+                   ramp_up=rate.get('ramp_up', 0),
+                   steps=[{'after': step['after'],
+                           'ops_per_second':
+                               float(step['ops_per_second']) / workers}
+                          for step in rate.get('steps', [])])
+
+    def get_rate(self, elapsed):
+        """Returns the target rate the given number of seconds in."""
+        rate = self.ops_per_second
+        for after, step_rate in self.steps:
+            if elapsed < after:
+                break
+            rate = step_rate
+        if elapsed < self.ramp_up:
+            rate *= elapsed / self.ramp_up
+        return rate
+
+
+class TokenBucket(object):
+    """Dispatches operations at the rate of a RateProfile.
+
+    Tokens are added at the profile rate from the first wait on, and every
+    operation takes one. The bucket holds up to burst tokens, so after a
+    slow operation up to burst operations are dispatched back to back to
+    catch up with the target rate.
+    """
+
+    def __init__(self, profile, burst=1):
+        self.profile = profile
+        self.burst = max(float(burst), 1.0)
+        self._tokens = 1.0
+        self._start_time = None
+        self._last_time = None
+        self._scheduled_time = None
+
+    def wait(self):
+        """Waits until the next operation is due.
+
+        :returns: the time the operation was due at, which is earlier than
+                  the current time when a slow operation delayed it. The
+                  latencies measured from it include that delay, instead of
+                  hiding it (coordinated omission).
+        """
+        now = time.time()
+        if self._start_time is None:
+            self._start_time = self._last_time = now
+        while True:
+            rate = self.profile.get_rate(now - self._start_time)
+            tokens = self._tokens + rate * (now - self._last_time)
+            self._last_time = now
+            if tokens >= 1:
+                # The token of the operation came in when the bucket got
+                # to one token
+                scheduled_time = now - (tokens - 1) / rate if rate else now
+                if self._scheduled_time is not None:
+                    scheduled_time = max(scheduled_time,
+                                         self._scheduled_time)
+                self._scheduled_time = scheduled_time
+                self._tokens = min(self.burst, tokens) - 1
+                return scheduled_time
+            self._tokens = tokens
+            if rate > 0:
+                delay = min((1 - self._tokens) / rate, MAX_WAIT_INTERVAL)
+            else:
+                delay = MAX_WAIT_INTERVAL
+            time.sleep(delay)
+            now = time.time()
@@ -0,0 +1,143 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import ctypes
+import math
+import multiprocessing
+
+# Latency histogram buckets grow geometrically from MIN_LATENCY seconds, so
+# percentiles are estimated within LATENCY_GROWTH of the actual value. The
+# last bucket holds all the latencies over about an hour.
+MIN_LATENCY = 0.001
+LATENCY_GROWTH = 1.1
+HISTOGRAM_BUCKETS = 160
+
+_RUNS = 0
+_FAILS = 1
+_LATENCY_SUM = 2
+_LATENCY_MAX = 3
+_HISTOGRAM = 4
+SLOT_SIZE = _HISTOGRAM + HISTOGRAM_BUCKETS
+
+
+def _get_bucket(latency):
+    if latency <= MIN_LATENCY:
+        return 0
+    bucket = int(math.ceil(math.log(latency / MIN_LATENCY) /
+                           math.log(LATENCY_GROWTH)))
+    return min(bucket, HISTOGRAM_BUCKETS - 1)
+
+
+def _get_bucket_limit(bucket):
+    return MIN_LATENCY * LATENCY_GROWTH ** bucket
+
+
+class StatisticsBlock(object):
+    """Run counters and latency histograms of all the stress workers.
+
+    The statistics live in a single shared memory block, allocated by the
+    driver before the workers are forked. Every worker writes to its own
+    slot only, so neither locks nor a manager process are involved, and
+    the driver reads all the slots to report.
+    """
+
+    def __init__(self, slots):
+        self.slots = slots
+        self._data = multiprocessing.RawArray(ctypes.c_double,
+                                              slots * SLOT_SIZE)
+
+    def get_slot(self, index):
+        if not 0 <= index < self.slots:
+            raise IndexError('No statistics slot %d' % index)
+        return WorkerStatistics(self._data, index * SLOT_SIZE)
+
+
+class WorkerStatistics(object):
+    """The statistics slot of a single worker.
+
+    The 'runs' and 'fails' counters are accessed like the keys of a dict.
+    """
+
+    _keys = {'runs': _RUNS, 'fails': _FAILS}
+
+    def __init__(self, data, offset):
+        self._data = data
+        self._offset = offset
+
+    def __getitem__(self, key):
+        return int(self._data[self._offset + self._keys[key]])
+
+    def __setitem__(self, key, value):
+        self._data[self._offset + self._keys[key]] = value
+
+    def record_latency(self, latency):
+        data, offset = self._data, self._offset
+        data[offset + _LATENCY_SUM] += latency
+        if latency > data[offset + _LATENCY_MAX]:
+            data[offset + _LATENCY_MAX] = latency
+        data[offset + _HISTOGRAM + _get_bucket(latency)] += 1
+
+    @property
+    def latency_sum(self):
+        return self._data[self._offset + _LATENCY_SUM]
+
+    @property
+    def latency_max(self):
+        return self._data[self._offset + _LATENCY_MAX]
+
+    @property
+    def histogram(self):
+        start = self._offset + _HISTOGRAM
+        return self._data[start:start + HISTOGRAM_BUCKETS]
+
+
+class Summary(object):
+    """Statistics of several workers, e.g. all the ones of an action."""
+
+    def __init__(self):
+        self.runs = 0
+        self.fails = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, statistics):
+        self.runs += statistics['runs']
+        self.fails += statistics['fails']
+        self.latency_sum += statistics.latency_sum
+        self.latency_max = max(self.latency_max, statistics.latency_max)
+        for bucket, count in enumerate(statistics.histogram):
+            self.histogram[bucket] += int(count)
+
+    @property
+    def error_rate(self):
+        return float(self.fails) / self.runs if self.runs else 0.0
+
+    @property
+    def latency_mean(self):
+        count = sum(self.histogram)
+        return self.latency_sum / count if count else 0.0
+
+    def get_percentile(self, percent):
+        """Returns an upper bound of the given latency percentile."""
+        count = sum(self.histogram)
+        if not count:
+            return 0.0
+        rank = percent / 100.0 * count
+        seen = 0
+        for bucket, bucket_count in enumerate(self.histogram):
+            seen += bucket_count
+            if seen >= rank:
+                return min(_get_bucket_limit(bucket), self.latency_max)
+        return self.latency_max
@@ -15,6 +15,7 @@
 import abc
 import signal
 import sys
+import time
 
 import six
 
@@ -64,25 +65,39 @@ class StressAction(object):
         """
         self.logger.debug("tearDown")
 
-    def execute(self, shared_statistic):
+    def execute(self, shared_statistic, rate_limiter=None):
         """This is the main execution entry point called by the driver.
 
         We register a signal handler to allow us to tearDown gracefully,
-        and then exit. We also keep track of how many runs we do.
+        and then exit. We also keep track of how many runs we do and, when
+        shared_statistic is a statistics.WorkerStatistics slot, how long
+        each of them takes.
+
+        Runs are started back to back, unless a rate_limiter (a
+        ratelimit.TokenBucket) is given to dispatch them at a fixed rate.
         """
         signal.signal(signal.SIGHUP, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
+        record_latency = getattr(shared_statistic, 'record_latency', None)
 
         while self.max_runs is None or (shared_statistic['runs'] <
                                         self.max_runs):
             self.logger.debug("Trigger new run (run %d)" %
                               shared_statistic['runs'])
+            if rate_limiter is not None:
+                # Latency counts from when the run was due, including any
+                # delay caused by the previous runs
+                start_time = rate_limiter.wait()
+            else:
+                start_time = time.time()
             try:
                 self.run()
             except Exception:
                 shared_statistic['fails'] += 1
                 self.logger.exception("Failure in run")
             finally:
+                if record_latency is not None:
+                    record_latency(time.time() - start_time)
                 shared_statistic['runs'] += 1
                 if self.stop_on_error and (shared_statistic['fails'] > 1):
                     self.logger.warning("Stop process due to"
@@ -0,0 +1,159 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from multiprocessing.pool import ThreadPool
+import os
+import threading
+
+from oslo_log import log as logging
+import yaml
+
+from tempest.common import cred_client
+from tempest.common import credentials_factory as credentials
+from tempest.common.utils import data_utils
+from tempest import config
+from tempest.lib import auth
+from tempest.lib import exceptions as lib_exc
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+class TenantProvisioner(object):
+    """Provisions the isolated tenants of the stress workers in bulk.
+
+    The projects and users are created concurrently, by up to
+    [stress] max_keystone_concurrency threads, each with its own admin
+    clients. When [stress] isolated_tenants_file is set, the credentials
+    are kept in it and reused by the following runs, otherwise the
+    tenants are deleted concurrently by cleanup().
+    """
+
+    def __init__(self, cache_file=None, concurrency=None):
+        self.cache_file = cache_file or CONF.stress.isolated_tenants_file
+        self.concurrency = max(
+            concurrency or CONF.stress.max_keystone_concurrency, 1)
+        self.identity_version = CONF.identity.auth_version
+        self._local = threading.local()
+        # {'project': ..., 'user': ...} of the tenants to delete in
+        # cleanup, the user is missing if its creation failed
+        self._created = []
+
+    def _get_creds_client(self):
+        creds_client = getattr(self._local, 'creds_client', None)
+        if creds_client is None:
+            # NOTE: REST clients are not thread safe, so every thread of
+            # the pool gets its own
+            admin_manager = credentials.AdminManager()
+            if self.identity_version == 'v2':
+                identity_client = admin_manager.identity_client
+                projects_client = admin_manager.tenants_client
+                roles_client = admin_manager.roles_client
+                users_client = admin_manager.users_client
+                domains_client = None
+            else:
+                identity_client = admin_manager.identity_v3_client
+                projects_client = admin_manager.projects_client
+                roles_client = admin_manager.roles_v3_client
+                users_client = admin_manager.users_v3_client
+                domains_client = admin_manager.domains_client
+            domain = (identity_client.auth_provider.credentials.
+                      get('project_domain_name', 'Default'))
+            creds_client = cred_client.get_creds_client(
+                identity_client, projects_client, users_client,
+                roles_client, domains_client, project_domain_name=domain)
+            self._local.creds_client = creds_client
+        return creds_client
+
+    def _create_tenant(self, index):
+        creds_client = self._get_creds_client()
+        username = data_utils.rand_name("stress_user")
+        tenant_name = data_utils.rand_name("stress_tenant")
+        password = data_utils.rand_password()
+        project = creds_client.create_project(
+            name=tenant_name, description=tenant_name)
+        # Recorded right away so a failed user creation does not leak it
+        tenant = {'project': project}
+        self._created.append(tenant)
+        user = creds_client.create_user(username, password, project, "email")
+        tenant['user'] = user
+        # Add roles specified in config file
+        for conf_role in CONF.auth.tempest_roles:
+            creds_client.assign_user_role(user, project, conf_role)
+        return creds_client.get_credentials(user, project, password)
+
+    def _delete_tenant(self, tenant):
+        project = tenant['project']
+        user = tenant.get('user')
+        creds_client = self._get_creds_client()
+        try:
+            if user is not None:
+                creds_client.delete_user(user['id'])
+        except lib_exc.NotFound:
+            LOG.warning("user with name: %s not found for delete",
+                        user['name'])
+        try:
+            creds_client.delete_project(project['id'])
+        except lib_exc.NotFound:
+            LOG.warning("tenant with name: %s not found for delete",
+                        project['name'])
+
+    def _map(self, func, items):
+        pool = ThreadPool(min(self.concurrency, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _read_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return []
+        with open(self.cache_file) as cache:
+            entries = yaml.safe_load(cache) or []
+        return [auth.get_credentials(auth_url=None, fill_in=False,
+                                     identity_version=self.identity_version,
+                                     **attributes)
+                for attributes in entries]
+
+    def _write_cache(self, creds_list):
+        entries = [dict((attr, creds.get(attr)) for attr in creds.ATTRIBUTES
+                        if creds.get(attr) is not None)
+                   for creds in creds_list]
+        # The file holds passwords, keep it private
+        fd = os.open(self.cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                     0o600)
+        with os.fdopen(fd, 'w') as cache:
+            yaml.safe_dump(entries, cache, default_flow_style=False)
+
+    def get_credentials(self, count):
+        """Returns the credentials of count isolated tenants."""
+        creds_list = self._read_cache()[:count]
+        missing = count - len(creds_list)
+        if missing > 0:
+            LOG.info("Creating %d isolated tenants", missing)
+            created = self._map(self._create_tenant, range(missing))
+            creds_list.extend(created)
+            if self.cache_file:
+                self._write_cache(self._read_cache() + created)
+                # Cached tenants outlive the run
+                self._created = []
+        return creds_list
+
+    def cleanup(self):
+        """Deletes the tenants which are not cached for the next runs."""
+        if self._created:
+            LOG.info("Deleting %d isolated tenants", len(self._created))
+            self._map(self._delete_tenant, self._created)
+            self._created = []
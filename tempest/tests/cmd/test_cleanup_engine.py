@@ -0,0 +1,153 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+import mock
+from oslotest import mockpatch
+
+from tempest.cmd import cleanup_engine
+from tempest.cmd import cleanup_service
+from tempest.tests import base
+
+
+class FakeCloud(object):
+    """Resources of a cloud, deleted after a number of list calls."""
+
+    def __init__(self, resources, delete_delay=0):
+        self.resources = dict((kind, set(ids))
+                              for kind, ids in resources.items())
+        self.delete_delay = delete_delay
+        self.deleting = {}
+        self.events = []
+        self.lock = threading.Lock()
+
+    def list(self, kind):
+        with self.lock:
+            for (deleting_kind, id), polls in list(self.deleting.items()):
+                if deleting_kind != kind:
+                    continue
+                if polls <= 0:
+                    self.resources[kind].discard(id)
+                    del self.deleting[(kind, id)]
+                else:
+                    self.deleting[(kind, id)] = polls - 1
+            return [{'id': id} for id in sorted(self.resources[kind])]
+
+    def delete(self, kind, id):
+        with self.lock:
+            self.events.append((kind, id))
+            if self.delete_delay:
+                self.deleting[(kind, id)] = self.delete_delay
+            else:
+                self.resources[kind].discard(id)
+
+
+def fake_service(kind, wait=False):
+    class FakeService(cleanup_service.BaseService):
+        wait_for_deletion = wait
+
+        def __init__(self, manager, **kwargs):
+            super(FakeService, self).__init__(kwargs)
+            self.client = mock.Mock(build_timeout=10, build_interval=0)
+            self.cloud = manager
+
+        def list(self):
+            return self.cloud.list(kind)
+
+        def delete_resource(self, resource):
+            self.cloud.delete(kind, resource['id'])
+
+    FakeService.__name__ = kind
+    return FakeService
+
+
+class TestCleanupEngine(base.TestCase):
+
+    def setUp(self):
+        super(TestCleanupEngine, self).setUp()
+        self.useFixture(mockpatch.PatchObject(time, 'sleep'))
+        self.servers = fake_service('servers', wait=True)
+        self.ports = fake_service('ports')
+        self.subnets = fake_service('subnets')
+        self.keypairs = fake_service('keypairs')
+        self.dependencies = {self.ports: [self.servers],
+                             self.subnets: [self.ports]}
+
+    def _run(self, cloud, services, concurrency=4):
+        engine = cleanup_engine.CleanupEngine(
+            services, lambda: cloud, {'is_dry_run': False},
+            concurrency=concurrency, dependencies=self.dependencies)
+        engine.run()
+
+    def test_resources_deleted_in_dependency_order(self):
+        cloud = FakeCloud({'servers': range(10), 'ports': range(10),
+                           'subnets': range(3), 'keypairs': range(5)},
+                          delete_delay=2)
+        self._run(cloud, [self.subnets, self.ports, self.servers,
+                          self.keypairs])
+        kinds = [kind for kind, _ in cloud.events]
+        self.assertEqual(28, len(kinds))
+        last_server = max(i for i, kind in enumerate(kinds)
+                          if kind == 'servers')
+        first_port = kinds.index('ports')
+        last_port = max(i for i, kind in enumerate(kinds) if kind == 'ports')
+        self.assertLess(last_server, first_port)
+        self.assertLess(last_port, kinds.index('subnets'))
+        # keypairs depend on nothing, they go along with the servers
+        self.assertLess(kinds.index('keypairs'), first_port)
+        self.assertEqual(set(), cloud.resources['servers'])
+
+    def test_asynchronous_deletions_are_waited_for(self):
+        cloud = FakeCloud({'servers': range(3), 'ports': range(3)},
+                          delete_delay=3)
+        self._run(cloud, [self.servers, self.ports])
+        # The server deletions were complete once the ports were listed
+        self.assertEqual(set(), cloud.resources['servers'])
+
+    def test_missing_dependencies_are_ignored(self):
+        cloud = FakeCloud({'subnets': range(2)})
+        self._run(cloud, [self.subnets])
+        self.assertEqual([('subnets', 0), ('subnets', 1)],
+                         sorted(cloud.events))
+
+    def test_service_without_list(self):
+        deleted = []
+
+        class QuotaService(cleanup_service.BaseService):
+            def __init__(self, manager, **kwargs):
+                super(QuotaService, self).__init__(kwargs)
+
+            def delete(self):
+                deleted.append(True)
+
+        self._run(FakeCloud({}), [QuotaService])
+        self.assertEqual([True], deleted)
+
+    def test_managers_are_per_thread(self):
+        threads = []
+        lock = threading.Lock()
+
+        def manager_factory():
+            with lock:
+                threads.append(threading.current_thread())
+            return FakeCloud({'keypairs': range(20)})
+
+        engine = cleanup_engine.CleanupEngine(
+            [self.keypairs], manager_factory, {}, concurrency=4)
+        engine.run()
+        # The main thread and at most every worker built one manager
+        self.assertEqual(len(threads), len(set(threads)))
+        self.assertLessEqual(len(threads), 5)
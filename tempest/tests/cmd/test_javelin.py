@@ -12,6 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from multiprocessing.pool import ThreadPool
+import threading
+
 import mock
 from oslotest import mockpatch
 
@@ -25,6 +28,8 @@ class JavelinUnitTest(base.TestCase):
     def setUp(self):
         super(JavelinUnitTest, self).setUp()
         javelin.LOG = mock.MagicMock()
+        javelin.reset_clients()
+        self.addCleanup(javelin.reset_clients)
         self.fake_client = mock.MagicMock()
         self.fake_object = mock.MagicMock()
 
@@ -53,6 +58,34 @@ class JavelinUnitTest(base.TestCase):
         javelin.OSClient.assert_called_once_with(
             fake_user['name'], fake_user['pass'], fake_user['tenant'])
 
+    def test_client_for_user_is_cached(self):
+        fake_user = mock.MagicMock()
+        javelin.USERS = {fake_user['name']: fake_user}
+        self.useFixture(mockpatch.PatchObject(javelin, "OSClient"))
+        client = javelin.client_for_user(fake_user['name'])
+        self.assertIs(client, javelin.client_for_user(fake_user['name']))
+        self.assertEqual(1, javelin.OSClient.call_count)
+
+    def test_clients_are_per_thread(self):
+        fake_user = mock.MagicMock()
+        javelin.USERS = {fake_user['name']: fake_user}
+        self.useFixture(mockpatch.PatchObject(javelin, "OSClient"))
+        javelin.client_for_user(fake_user['name'])
+        thread = threading.Thread(target=javelin.client_for_user,
+                                  args=(fake_user['name'],))
+        thread.start()
+        thread.join()
+        self.assertEqual(2, javelin.OSClient.call_count)
+
+    def test_run_concurrently(self):
+        pool = ThreadPool(4)
+        self.addCleanup(pool.join)
+        self.addCleanup(pool.close)
+        self.useFixture(mockpatch.PatchObject(javelin, "POOL", pool))
+        self.assertEqual([x * 2 for x in range(10)],
+                         javelin._run_concurrently(lambda x: x * 2,
+                                                   range(10)))
+
     def test_client_for_non_existing_user(self):
         fake_non_existing_user = self.fake_object
         fake_user = mock.MagicMock()
@@ -247,6 +280,34 @@ class TestCreateResources(JavelinUnitTest):
         self.assertFalse(mocked_function.called)
         self.assertFalse(mock_wait_for_volume_status.called)
 
+    @mock.patch("tempest.common.waiters.wait_for_server_status")
+    def test_create_servers_boots_all_before_waiting(self, mock_wait):
+        events = []
+        self.useFixture(mockpatch.PatchObject(javelin, "client_for_user",
+                                              return_value=self.fake_client))
+        self.useFixture(mockpatch.PatchObject(javelin, "_get_server_by_name",
+                                              return_value=None))
+        self.useFixture(mockpatch.PatchObject(javelin, "_get_image_by_name"))
+        self.useFixture(mockpatch.PatchObject(javelin, "_get_flavor_by_name"))
+        self.useFixture(mockpatch.PatchObject(javelin, "CONF"))
+        javelin.CONF.service_available.neutron = False
+
+        def create_server(name, **kwargs):
+            events.append(('boot', name))
+            return {'server': {'id': name + '-id'}}
+        self.fake_client.servers.create_server.side_effect = create_server
+        mock_wait.side_effect = lambda client, server_id, status: (
+            events.append(('wait', server_id)))
+        servers = [{'name': name, 'owner': 'javelin', 'image': 'cirros',
+                    'flavor': 'm1.tiny', 'secgroups': []}
+                   for name in ('peltast', 'hoplite')]
+
+        javelin.create_servers(servers)
+
+        self.assertEqual([('boot', 'peltast'), ('boot', 'hoplite'),
+                          ('wait', 'peltast-id'), ('wait', 'hoplite-id')],
+                         events)
+
     def test_create_router(self):
 
         self.fake_client.routers.list_routers.return_value = {'routers': []}
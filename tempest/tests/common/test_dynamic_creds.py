@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 import mock
 from oslo_config import cfg
 from oslotest import mockpatch
@@ -590,3 +592,45 @@ class TestDynamicCredentialProvider(base.TestCase):
         self._mock_tenant_create('1234', 'fake_prim_tenant')
         self.assertRaises(exceptions.InvalidConfiguration,
                           creds.get_primary_creds)
+
+    def _wait_for_prewarmed_creds(self, count):
+        pool = list(dynamic_creds._prewarmed_pools.values())[0]
+        for i in range(100):
+            if len(pool._ready) == count:
+                return
+            time.sleep(0.05)
+        self.fail('The pool was not filled')
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_prewarmed_primary_creds(self, MockRestClient):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        cfg.CONF.set_default('dynamic_credentials_pool_size', 2,
+                             group='auth')
+        self.addCleanup(dynamic_creds._clear_prewarmed_pools)
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        tenant_fix = self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_user_create('1234', 'fake_prim_user')
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        creds.get_primary_creds()
+        self._wait_for_prewarmed_creds(2)
+        self.assertEqual(3, tenant_fix.mock.call_count)
+
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        primary_creds = creds.get_primary_creds()
+        self.assertEqual(primary_creds.username, 'fake_prim_user')
+        self.assertEqual(primary_creds, creds.get_primary_creds())
+        # The set taken is replaced in the background
+        self._wait_for_prewarmed_creds(2)
+        self.assertEqual(4, tenant_fix.mock.call_count)
+
+        user_mock = self.patch(
+            'tempest.services.identity.v2.json.users_client.'
+            'UsersClient.delete_user')
+        tenant_mock = self.patch(
+            'tempest.services.identity.v2.json.tenants_client.'
+            'TenantsClient.delete_tenant')
+        dynamic_creds._clear_prewarmed_pools()
+        self.assertEqual(2, user_mock.call_count)
+        self.assertEqual(2, tenant_mock.call_count)
+        self.assertEqual({}, dynamic_creds._prewarmed_pools)
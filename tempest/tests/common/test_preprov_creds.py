@@ -15,6 +15,7 @@
 import hashlib
 import os
 
+import fixtures
 import mock
 from oslo_concurrency.fixture import lockutils as lockutils_fixtures
 from oslo_config import cfg
@@ -119,120 +120,92 @@ class TestPreProvisionedCredentials(base.TestCase):
             self.assertIn(hash, hash_dict['creds'].keys())
             self.assertIn(hash_dict['creds'][hash], self.test_accounts)
 
+    def _get_lock_dir_class(self):
+        lock_dir = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                'test_accounts')
+        params = dict(self.fixed_params, accounts_lock_dir=lock_dir,
+                      name='test_class')
+        return preprov_creds.PreProvisionedCredentialProvider(**params)
+
+    def _claim(self, lock_dir, hashes, name='other_class'):
+        if not os.path.isdir(lock_dir):
+            os.mkdir(lock_dir)
+        for _hash in hashes:
+            with open(os.path.join(lock_dir, _hash), 'w') as fd:
+                fd.write(name)
+
     def test_create_hash_file_previous_file(self):
-        # Emulate the lock existing on the filesystem
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
+        test_account_class = self._get_lock_dir_class()
+        self._claim(test_account_class.accounts_dir, ['12345'])
+        res = test_account_class._create_hash_file('12345')
         self.assertFalse(res, "_create_hash_file should return False if the "
                          "pseudo-lock file already exists")
 
     def test_create_hash_file_no_previous_file(self):
-        # Emulate the lock not existing on the filesystem
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=False))
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
+        test_account_class = self._get_lock_dir_class()
+        res = test_account_class._create_hash_file('12345')
         self.assertTrue(res, "_create_hash_file should return True if the "
                         "pseudo-lock doesn't already exist")
+        lock_path = os.path.join(test_account_class.accounts_dir, '12345')
+        with open(lock_path) as fd:
+            self.assertEqual('test_class', fd.read())
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_previous_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=False))
+    def test_get_free_hash_no_previous_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        mkdir_mock = self.useFixture(mockpatch.Patch('os.mkdir'))
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=False))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[0])
-            open_mock.assert_called_once_with(lock_path, 'w')
-        mkdir_path = os.path.join(self.fixed_params['accounts_lock_dir'])
-        mkdir_mock.mock.assert_called_once_with(mkdir_path)
+        test_account_class = self._get_lock_dir_class()
+        free_hash = test_account_class._get_free_hash(hash_list)
+        self.assertIn(free_hash, hash_list)
+        self.assertEqual([free_hash],
+                         os.listdir(test_account_class.accounts_dir))
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_free_accounts(self, lock_mock):
+    def test_get_free_hash_no_free_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Emulate pre-existing lock dir
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=True))
-        # Emulate all lcoks in list are in use
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            self.assertRaises(lib_exc.InvalidCredentials,
-                              test_account_class._get_free_hash, hash_list)
+        test_account_class = self._get_lock_dir_class()
+        # Emulate all locks in list are in use
+        self._claim(test_account_class.accounts_dir, hash_list)
+        exc = self.assertRaises(lib_exc.InvalidCredentials,
+                                test_account_class._get_free_hash, hash_list)
+        self.assertIn('other_class', str(exc))
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_some_in_use_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=True))
+    def test_get_free_hash_some_in_use_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
+        test_account_class = self._get_lock_dir_class()
+        self._claim(test_account_class.accounts_dir,
+                    hash_list[:3] + hash_list[4:])
+        free_hash = test_account_class._get_free_hash(hash_list)
+        self.assertEqual(hash_list[3], free_hash)
 
-        def _fake_is_file(path):
-            # Fake isfile() to return that the path exists unless a specific
-            # hash is in the path
-            if hash_list[3] in path:
-                return False
-            return True
-
-        self.stubs.Set(os.path, 'isfile', _fake_is_file)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
+    def test_get_free_hash_does_not_take_the_global_lock(self):
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_account_class = self._get_lock_dir_class()
+        with mock.patch('oslo_concurrency.lockutils.lock') as lock_mock:
             test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[3])
-            open_mock.assert_has_calls([mock.call(lock_path, 'w')])
+        lock_mock.assert_not_called()
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_remove_hash_last_account(self, lock_mock):
+    def test_remove_hash_last_account(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Pretend the pseudo-lock is there
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(mockpatch.Patch('os.listdir', return_value=[]))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        remove_mock = self.useFixture(mockpatch.Patch('os.remove'))
-        rmdir_mock = self.useFixture(mockpatch.Patch('os.rmdir'))
+        test_account_class = self._get_lock_dir_class()
+        free_hash = test_account_class._get_free_hash(hash_list)
+        test_account_class.remove_hash(free_hash)
+        self.assertFalse(os.path.exists(test_account_class.accounts_dir))
+
+    def test_remove_hash_not_last_account(self):
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_account_class = self._get_lock_dir_class()
+        self._claim(test_account_class.accounts_dir,
+                    [hash_list[1], hash_list[4]])
+        self.assertTrue(test_account_class._create_hash_file(hash_list[2]))
         test_account_class.remove_hash(hash_list[2])
-        hash_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                 hash_list[2])
-        lock_path = self.fixed_params['accounts_lock_dir']
-        remove_mock.mock.assert_called_once_with(hash_path)
-        rmdir_mock.mock.assert_called_once_with(lock_path)
+        self.assertEqual(sorted([hash_list[1], hash_list[4]]),
+                         sorted(os.listdir(test_account_class.accounts_dir)))
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_remove_hash_not_last_account(self, lock_mock):
+    def test_remove_hash_not_in_use(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Pretend the pseudo-lock is there
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(mockpatch.Patch('os.listdir', return_value=[
-            hash_list[1], hash_list[4]]))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        remove_mock = self.useFixture(mockpatch.Patch('os.remove'))
-        rmdir_mock = self.useFixture(mockpatch.Patch('os.rmdir'))
+        test_account_class = self._get_lock_dir_class()
+        self._claim(test_account_class.accounts_dir, [hash_list[1]])
         test_account_class.remove_hash(hash_list[2])
-        hash_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                 hash_list[2])
-        remove_mock.mock.assert_called_once_with(hash_path)
-        rmdir_mock.mock.assert_not_called()
+        self.assertEqual([hash_list[1]],
+                         os.listdir(test_account_class.accounts_dir))
 
     def test_is_multi_user(self):
         test_accounts_class = preprov_creds.PreProvisionedCredentialProvider(
@@ -74,3 +74,81 @@ class TestImageWaiters(base.TestCase):
         mock_show.assert_has_calls([mock.call(volume_id),
                                     mock.call(volume_id)])
         mock_sleep.assert_called_once_with(1)
+
+
+class TestSharedStatusPolling(base.TestCase):
+    def setUp(self):
+        super(TestSharedStatusPolling, self).setUp()
+        self.client = mock.Mock(build_interval=1, build_timeout=10)
+        self.client.show_server.side_effect = lambda server_id: {
+            'server': {'id': server_id, 'status': 'BUILD',
+                       'updated': '2016-01-01T00:00:0%sZ' % server_id}}
+        self.sleep = self.patch('time.sleep')
+        self.poller = waiters._get_poller(self.client, 'server')
+
+    def test_lone_wait_shows_resource(self):
+        self.poller.watch(self.client, '1')
+        body = self.poller.next(self.client, '1')
+        self.assertEqual('BUILD', body['status'])
+        self.assertEqual(2, self.client.show_server.call_count)
+        self.assertFalse(self.client.list_servers.called)
+        self.sleep.assert_called_once_with(1)
+
+    def test_concurrent_waits_share_list_call(self):
+        self.poller.watch(self.client, '1')
+        self.poller.watch(self.client, '2')
+        self.client.list_servers.return_value = {'servers': [
+            {'id': '2', 'status': 'ACTIVE',
+             'updated': '2016-01-01T00:00:05Z'}]}
+        body = self.poller.next(self.client, '2')
+        self.assertEqual('ACTIVE', body['status'])
+        self.client.list_servers.assert_called_once_with(
+            detail=True, **{'changes-since': '2016-01-01T00:00:01Z'})
+        self.assertEqual(2, self.client.show_server.call_count)
+
+    def test_resource_missing_from_changes_is_shown(self):
+        self.poller.watch(self.client, '1')
+        self.poller.watch(self.client, '2')
+        self.client.list_servers.return_value = {'servers': [
+            {'id': '2', 'status': 'ACTIVE',
+             'updated': '2016-01-01T00:00:05Z'}]}
+        self.client.show_server.side_effect = lambda server_id: {
+            'server': {'id': server_id, 'status': 'ERROR',
+                       'updated': '2016-01-01T00:00:06Z'}}
+        # The listing left server 1 out, its stale body is not served
+        body = self.poller.next(self.client, '1')
+        self.assertEqual('ERROR', body['status'])
+        self.assertEqual(3, self.client.show_server.call_count)
+        self.client.show_server.assert_called_with('1')
+
+    def test_shared_interval_backs_off_without_changes(self):
+        self.poller.watch(self.client, '1')
+        self.poller.watch(self.client, '2')
+        self.client.list_servers.return_value = {'servers': [
+            {'id': '1', 'status': 'ACTIVE',
+             'updated': '2016-01-01T00:00:05Z'}]}
+        for _ in range(4):
+            self.poller.next(self.client, '2')
+        self.assertEqual([mock.call(1), mock.call(1), mock.call(2),
+                          mock.call(4)], self.sleep.call_args_list)
+
+    def test_resource_missing_from_full_list_is_shown(self):
+        self.client.show_volume.return_value = {
+            'volume': {'id': '1', 'status': 'creating'}}
+        self.client.list_volumes.return_value = {'volumes': []}
+        poller = waiters._get_poller(self.client, 'volume')
+        poller.watch(self.client, '1')
+        poller.watch(self.client, '2')
+        poller.next(self.client, '1')
+        self.client.list_volumes.assert_called_once_with(detail=True)
+        self.assertEqual(3, self.client.show_volume.call_count)
+        self.client.show_volume.assert_called_with('1')
+
+    def test_wait_for_server_status_unwatches(self):
+        self.client.show_server.side_effect = None
+        self.client.show_server.return_value = {
+            'server': {'id': '1', 'status': 'ACTIVE'}}
+        waiters.wait_for_server_status(self.client, '1', 'ACTIVE',
+                                       ready_wait=False)
+        self.assertEqual(0, self.poller._waits)
+        self.assertEqual({}, self.poller._watchers)
@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import tarfile
 import time
 
 from oslo_config import cfg
@@ -19,6 +21,7 @@ from oslotest import mockpatch
 
 from tempest.common.utils.linux import remote_client
 from tempest import config
+from tempest.lib import exceptions as lib_exc
 from tempest.tests import base
 from tempest.tests import fake_config
 
@@ -154,3 +157,123 @@ a0:b0:c0:d0:e0:f0"""
         self.conn.set_nic_state(nic, "down")
         self._assert_exec_called_with(
             'sudo ip link set %s down' % nic)
+
+    def test_probe_files(self):
+        self.ssh_mock.mock.exec_command.return_value = (
+            "@@probe@@ 0\n0-3\n@@probe@@ 2\nline 1\nline 2\n")
+        contents = self.conn.probe_files(
+            ['/sys/a', '/sys/missing', '/proc/b'], writes={'/sys/c': 1})
+        self.assertEqual({'/sys/a': '0-3', '/sys/missing': None,
+                          '/proc/b': 'line 1\nline 2'}, contents)
+        self.assertEqual(1, self.ssh_mock.mock.exec_command.call_count)
+        cmd = self.ssh_mock.mock.exec_command.call_args[0][0]
+        self.assertIn('echo 1 > /sys/c; ', cmd)
+        self.assertIn('if [ -e /proc/b ]; then echo "@@probe@@ 2"; '
+                      'cat /proc/b; fi', cmd)
+
+    def test_get_meminfo(self):
+        self.ssh_mock.mock.exec_command.return_value = (
+            "@@probe@@ 0\nMemTotal:        8167848 kB\n"
+            "MemFree:         1234567 kB\nHugePages_Total:       0\n")
+        self.assertEqual({'MemTotal': 8167848, 'MemFree': 1234567,
+                          'HugePages_Total': 0}, self.conn.get_meminfo())
+
+    def test_set_cpu_count_online(self):
+        self.ssh_mock.mock.exec_command.side_effect = [
+            "@@probe@@ 0\n0-3\n@@probe@@ 1\n0-3\n", '']
+        self.conn.set_cpu_count_online(2)
+        self.assertEqual(2, self.ssh_mock.mock.exec_command.call_count)
+        cmd = self.ssh_mock.mock.exec_command.call_args[0][0]
+        self.assertIn('echo 0 > /sys/devices/system/cpu/cpu2/online', cmd)
+        self.assertIn('echo 0 > /sys/devices/system/cpu/cpu3/online', cmd)
+        self.assertNotIn('cpu1/online', cmd)
+
+    def test_set_cpu_count_online_too_many(self):
+        self.ssh_mock.mock.exec_command.return_value = (
+            "@@probe@@ 0\n0-1\n@@probe@@ 1\n0-1\n")
+        self.assertRaises(Exception, self.conn.set_cpu_count_online, 3)
+
+    def test_kvp_verify_values(self):
+        self.ssh_mock.mock.exec_command.return_value = (
+            "Pool is 0\nNum records is 2\n"
+            "Key: AAA; Value: 111\nKey: BBB; Value: 2; 2\n")
+        values = self.conn.kvp_verify_values({'AAA': 111, 'BBB': '2; 2'},
+                                             '0', absent=['CCC'])
+        self.assertEqual({'AAA': '111', 'BBB': '2; 2'}, values)
+        self.ssh_mock.mock.exec_command.assert_called_once_with(
+            "set -eu -o pipefail; PATH=$PATH:/sbin; "
+            "chmod 755 /tmp/kvp_client; /tmp/kvp_client 0", True)
+
+    def test_kvp_verify_values_reports_all_errors(self):
+        self.ssh_mock.mock.exec_command.return_value = (
+            "Pool is 0\nNum records is 2\n"
+            "Key: AAA; Value: 111\nKey: CCC; Value: 3\n")
+        exc = self.assertRaises(Exception, self.conn.kvp_verify_values,
+                                {'AAA': '999', 'BBB': '2'}, '0',
+                                absent=['CCC'])
+        self.assertIn('AAA: expected 999, got 111', str(exc))
+        self.assertIn('BBB: expected 2, got None', str(exc))
+        self.assertIn('CCC: expected no value, got 3', str(exc))
+
+    def test_parse_cpu_list(self):
+        self.assertEqual([0, 1, 2, 3, 8, 10, 11],
+                         remote_client._parse_cpu_list('0-3,8,10-11\n'))
+        self.assertEqual([], remote_client._parse_cpu_list(None))
+
+
+class TestScriptBundle(base.TestCase):
+    def setUp(self):
+        super(TestScriptBundle, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.patch('tempest.common.utils.linux.remote_client._staged_guests',
+                   new=set())
+        self.bundle = remote_client.get_script_bundle()
+        self.conn = remote_client.RemoteClient('127.0.0.1', 'user', 'pass')
+        self.ssh_mock = self.useFixture(mockpatch.PatchObject(self.conn,
+                                                              'ssh_client'))
+        self.ssh_mock.mock.host = '127.0.0.1'
+        self.script = os.path.join(remote_client.LIS_DIR, 'core', 'scripts',
+                                   'LIS_CD.sh')
+
+    def test_bundle_is_built_once(self):
+        self.assertIs(self.bundle, remote_client.get_script_bundle())
+
+    def test_bundle_holds_normalized_scripts(self):
+        with tarfile.open(self.bundle.path) as tar:
+            member = tar.getmember('lis/core/scripts/LIS_CD.sh')
+            self.assertEqual(0o755, member.mode)
+            self.assertNotIn(b'\r', tar.extractfile(member).read())
+            tar.getmember('common/utils/linux/get_os.sh')
+        self.assertEqual(
+            self.bundle.remote_dir + '/lis/core/scripts/LIS_CD.sh',
+            self.bundle.get_remote_path(self.script))
+        self.assertIsNone(self.bundle.get_remote_path(__file__))
+
+    def test_execute_script_stages_bundle_once(self):
+        self.conn.execute_script('LIS_CD.sh', ['a'], self.script, '/tmp/')
+        self.conn.execute_script('LIS_CD.sh', ['b'], self.script, '/tmp/')
+        self.ssh_mock.mock.sftp.assert_called_once_with(self.bundle.path,
+                                                        '/tmp/')
+        commands = [c[0][0] for c in
+                    self.ssh_mock.mock.exec_command.call_args_list]
+        self.assertEqual(3, len(commands))
+        self.assertIn('tar -xzpf %s.tar.gz' % self.bundle.remote_dir,
+                      commands[0])
+        self.assertTrue(commands[2].endswith(
+            'cd /tmp/; sudo %s b' % self.bundle.get_remote_path(self.script)))
+
+    def test_execute_script_restages_lost_bundle(self):
+        self.conn.stage_script_bundle()
+        self.ssh_mock.mock.exec_command.side_effect = [
+            lib_exc.SSHExecCommandFailed(command='', exit_status=127,
+                                         stderr='', stdout=''),
+            '', '', 'output']
+        self.assertEqual('output', self.conn.execute_script(
+            'LIS_CD.sh', [], self.script, '/tmp/'))
+        self.assertEqual(2, self.ssh_mock.mock.sftp.call_count)
+
+    def test_execute_script_copies_unbundled_script(self):
+        self.conn.execute_script('test.sh', [], '/other/test.sh', '/tmp/')
+        self.ssh_mock.mock.sftp.assert_called_once_with('/other/test.sh',
+                                                        '/tmp/')
@@ -0,0 +1,319 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import base64
+
+import mock
+from oslo_config import cfg
+from oslo_serialization import jsonutils as json
+from oslotest import mockpatch
+
+from tempest.common.utils.windows import remote_client
+from tempest import config
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+def _decode(cmd):
+    """Returns the script of an encoded PowerShell command."""
+    prefix = 'powershell -EncodedCommand '
+    if not cmd.startswith(prefix):
+        return cmd
+    return base64.b64decode(cmd[len(prefix):]).decode('utf-16-le')
+
+
+class WinRMTestCase(base.TestCase):
+    """Runs a WinRemoteClient against a mocked WinRM protocol."""
+
+    def setUp(self):
+        super(WinRMTestCase, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        cfg.CONF.set_default('host_reuse_shells', False,
+                             group='host_credentials')
+        self.protocol = self.useFixture(mockpatch.PatchObject(
+            remote_client.protocol, 'Protocol')).mock.return_value
+        self.protocol.open_shell.return_value = 'shell'
+        self.commands = []
+        self.protocol.run_command.side_effect = self._run_command
+        self.protocol.get_command_output.side_effect = self._command_output
+        self.client = remote_client.WinRemoteClient('host', 'user', 'pass')
+
+    def _run_command(self, shell_id, cmd):
+        self.commands.append(cmd)
+        return 'command-%d' % len(self.commands)
+
+    def _command_output(self, shell_id, command_id):
+        return self.output(_decode(self.commands[-1]))
+
+    def output(self, script):
+        raise NotImplementedError
+
+
+class TestPowerShellBatch(WinRMTestCase):
+
+    def setUp(self):
+        super(TestPowerShellBatch, self).setUp()
+        self.failing = set()
+        self.batch = self.client.batch()
+
+    def output(self, script):
+        operations = [line for line in script.splitlines()
+                      if line.startswith('$__results += __run')]
+        results = []
+        for operation in operations:
+            if any(name in operation for name in self.failing):
+                results.append({'output': None, 'error': 'failed',
+                                'exit_code': 1})
+            else:
+                results.append({'output': 'done\r\n', 'error': None,
+                                'exit_code': 0})
+        return ('host output\r\n%s\r\n%s\r\n' % (remote_client.RESULT_MARKER,
+                                                 json.dumps(results)),
+                '', 0)
+
+    def test_script_is_encoded_in_one_command(self):
+        self.assertEqual(0, self.batch.add_cmd('Get-VM', Name='vm1'))
+        self.assertEqual(1, self.batch.add_cmd('C:\\setup.ps1', 'arg'))
+        self.assertEqual(2, self.batch.add_cmd_attribute('Get-VM', 'State',
+                                                         Name='vm1'))
+        self.batch.execute()
+        self.assertEqual(1, len(self.commands))
+        script = _decode(self.commands[0])
+        self.assertTrue(script.startswith(remote_client.BATCH_SCRIPT_HEADER))
+        self.assertTrue(script.endswith(remote_client.BATCH_SCRIPT_FOOTER))
+        # Cmdlet errors stop the operation, scripts handle their own
+        self.assertIn('$__results += __run { Get-VM -Name vm1 } $true\n',
+                      script)
+        self.assertIn('$__results += __run { & C:\\setup.ps1 arg } $false\n',
+                      script)
+        self.assertIn('$__results += __run { (Get-VM -Name vm1).State } '
+                      '$true\n', script)
+        self.protocol.close_shell.assert_called_once_with('shell')
+
+    def test_split_at_max_command_length(self):
+        for i in range(200):
+            self.batch.add_cmd('Set-VMMemory', VMName='vm%03d' % i,
+                               StartupBytes='1GB')
+        chunks = list(self.batch._split())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(self.batch._operations, sum(chunks, []))
+        for chunk in chunks:
+            cmd = remote_client._encode_command(
+                self.batch._build_script(chunk))
+            self.assertLessEqual(len(cmd), remote_client.MAX_COMMAND_LENGTH)
+        # Every chunk is as large as the command line allows
+        for chunk, following in zip(chunks, chunks[1:]):
+            cmd = remote_client._encode_command(
+                self.batch._build_script(chunk + following[:1]))
+            self.assertGreater(len(cmd), remote_client.MAX_COMMAND_LENGTH)
+
+    def test_split_keeps_oversized_operation(self):
+        self.batch.add_cmd('Write-Output', "'%s'" % ('x' * 5000))
+        self.batch.add_cmd('Get-VM')
+        self.assertEqual([[self.batch._operations[0]],
+                          [self.batch._operations[1]]],
+                         list(self.batch._split()))
+
+    def test_execute_returns_results_of_every_chunk_in_order(self):
+        for i in range(200):
+            self.batch.add_cmd('Get-VM', Name='vm%03d' % i)
+        operations = list(self.batch._operations)
+        results = self.batch.execute()
+        self.assertGreater(len(self.commands), 1)
+        self.assertEqual(operations, [r.command for r in results])
+        self.assertEqual(0, len(self.batch))
+
+    def test_run_parses_results_and_errors(self):
+        self.failing.add('Stop-VM')
+        self.batch.add_cmd('Get-VM')
+        self.batch.add_cmd('Stop-VM', Name='vm1')
+        results = self.batch.execute(raise_on_error=False)
+        self.assertEqual(
+            [remote_client.BatchResult('Get-VM', 'done\r\n', None, 0),
+             remote_client.BatchResult('Stop-VM -Name vm1', None, 'failed',
+                                       1)],
+            results)
+
+    def test_run_raises_without_results(self):
+        self.output = lambda script: ('', 'access denied', 1)
+        self.batch.add_cmd('Get-VM')
+        self.assertRaises(Exception, self.batch.execute)
+        self.output = lambda script: ('no marker', '', 0)
+        self.assertRaises(Exception, self.batch.execute)
+
+    def test_raise_for_errors(self):
+        results = [remote_client.BatchResult('Get-VM', 'done', None, 0),
+                   remote_client.BatchResult('Stop-VM', None, 'denied', 1)]
+        self.assertIsNone(
+            remote_client.PowerShellBatch.raise_for_errors(results[:1]))
+        exc = self.assertRaises(
+            Exception, remote_client.PowerShellBatch.raise_for_errors,
+            results)
+        self.assertIn('1 of 2 batched host commands failed', str(exc))
+        self.assertIn('Command: Stop-VM', str(exc))
+        self.assertIn('Error: denied', str(exc))
+        self.assertNotIn('Command: Get-VM', str(exc))
+
+    def test_execute_raises_for_failed_operations(self):
+        self.failing.add('Stop-VM')
+        self.batch.add_cmd('Stop-VM', Name='vm1')
+        self.assertRaises(Exception, self.batch.execute)
+        self.assertEqual(0, len(self.batch))
+
+
+class TestPowerShellQuery(WinRMTestCase):
+
+    def setUp(self):
+        super(TestPowerShellQuery, self).setUp()
+        self.objects = [{'Name': 'vm1', 'State': 'Running'}]
+
+    def output(self, script):
+        if remote_client.RESULT_MARKER not in script:
+            return 'done', '', 0
+        return ('%s\r\n%s\r\n' % (remote_client.RESULT_MARKER,
+                                  json.dumps(self.objects)), '', 0)
+
+    def test_query_script(self):
+        self.client.get_powershell_cmd_objects('Get-VM', ['Name', 'State'],
+                                               VMName='vm1')
+        script = _decode(self.commands[0])
+        self.assertIn("$__objects = @(Get-VM -VMName vm1 |", script)
+        self.assertIn("$names = @('Name','State')", script)
+
+    def test_array_of_objects(self):
+        self.objects = [{'Name': 'vm1'}, {'Name': 'vm2'}]
+        self.assertEqual(self.objects,
+                         self.client.get_powershell_cmd_objects('Get-VM'))
+        self.assertEqual({'Name': 'vm1'},
+                         self.client.get_powershell_cmd_object('Get-VM'))
+
+    def test_single_object(self):
+        self.objects = {'Name': 'vm1'}
+        self.assertEqual([{'Name': 'vm1'}],
+                         self.client.get_powershell_cmd_objects('Get-VM'))
+        self.assertEqual({'Name': 'vm1'},
+                         self.client.get_powershell_cmd_object('Get-VM'))
+
+    def test_no_object(self):
+        for objects in (None, []):
+            self.objects = objects
+            self.assertEqual(
+                [], self.client.get_powershell_cmd_objects('Get-VM'))
+            self.assertRaises(Exception,
+                              self.client.get_powershell_cmd_object,
+                              'Get-VM')
+
+    def test_query_failure(self):
+        self.output = lambda script: ('', 'denied', 1)
+        self.assertRaises(Exception, self.client.get_powershell_cmd_objects,
+                          'Get-VM')
+
+    def test_query_is_not_cached_by_default(self):
+        self.client.get_powershell_cmd_objects('Get-VM')
+        self.client.get_powershell_cmd_objects('Get-VM')
+        self.assertEqual(2, len(self.commands))
+
+    def test_cached_query(self):
+        first = self.client.get_powershell_cmd_objects('Get-VM', cache=True)
+        self.objects = [{'Name': 'vm1', 'State': 'Off'}]
+        self.assertEqual(first, self.client.get_powershell_cmd_objects(
+            'Get-VM', cache=True))
+        self.assertEqual(1, len(self.commands))
+        # Other queries are not served from the cache
+        self.client.get_powershell_cmd_objects('Get-VM', cache=True,
+                                               VMName='vm1')
+        self.assertEqual(2, len(self.commands))
+
+    def test_cache_is_invalidated_by_commands(self):
+        self.client.get_powershell_cmd_objects('Get-VM', cache=True)
+        self.objects = [{'Name': 'vm1', 'State': 'Off'}]
+        self.client.run_wsman_cmd('powershell Stop-VM -Name vm1')
+        self.assertEqual(self.objects, self.client.get_powershell_cmd_objects(
+            'Get-VM', cache=True))
+        self.assertEqual(3, len(self.commands))
+        self.client.get_powershell_cmd_objects('Get-VM', cache=True)
+        self.assertEqual(3, len(self.commands))
+
+
+class FakeProtocol(object):
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = []
+
+    def open_shell(self):
+        self.opened += 1
+        return 'shell-%d' % self.opened
+
+    def close_shell(self, shell_id):
+        self.closed.append(shell_id)
+
+
+class TestShellPool(base.TestCase):
+
+    def setUp(self):
+        super(TestShellPool, self).setUp()
+        self.pool = remote_client.ShellPool(max_idle_shells=2,
+                                            idle_timeout=10)
+        self.protocol = FakeProtocol()
+        self.time = self.patch('time.time', return_value=100)
+
+    def _acquire(self, key='host'):
+        return self.pool.acquire(key, lambda: self.protocol)
+
+    def test_acquire_opens_shell(self):
+        self.assertEqual((self.protocol, 'shell-1', False), self._acquire())
+        self.assertEqual((self.protocol, 'shell-2', False), self._acquire())
+
+    def test_released_shell_is_reused(self):
+        p, shell_id, _ = self._acquire()
+        self.pool.release('host', p, shell_id)
+        self.assertEqual((self.protocol, 'shell-1', True), self._acquire())
+        self.assertEqual(1, self.protocol.opened)
+
+    def test_protocol_is_created_once_per_key(self):
+        factory = mock.Mock(side_effect=FakeProtocol)
+        p1 = self.pool.acquire('host', factory)[0]
+        self.assertIs(p1, self.pool.acquire('host', factory)[0])
+        self.assertIsNot(p1, self.pool.acquire('other', factory)[0])
+        self.assertEqual(2, factory.call_count)
+
+    def test_release_closes_shells_beyond_max_idle(self):
+        shells = [self._acquire()[1] for _ in range(3)]
+        for shell_id in shells:
+            self.pool.release('host', self.protocol, shell_id)
+        self.assertEqual(['shell-3'], self.protocol.closed)
+
+    def test_idle_shells_expire(self):
+        p, shell_id, _ = self._acquire()
+        self.pool.release('host', p, shell_id)
+        self.time.return_value = 111
+        self.assertEqual((self.protocol, 'shell-2', False), self._acquire())
+        self.assertEqual(['shell-1'], self.protocol.closed)
+
+    def test_discard_closes_shell(self):
+        p, shell_id, _ = self._acquire()
+        self.pool.discard(p, shell_id)
+        self.assertEqual(['shell-1'], self.protocol.closed)
+        self.assertEqual((self.protocol, 'shell-2', False), self._acquire())
+
+    def test_clear_closes_idle_shells(self):
+        p, shell_id, _ = self._acquire()
+        busy = self._acquire()[1]
+        self.pool.release('host', p, shell_id)
+        self.pool.clear()
+        self.assertEqual(['shell-1'], self.protocol.closed)
+        self.assertEqual((self.protocol, 'shell-3', False), self._acquire())
+        self.assertNotIn(busy, self.protocol.closed)
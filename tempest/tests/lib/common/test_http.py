@@ -0,0 +1,140 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import socket
+
+import httplib2
+import mock
+
+from tempest.lib.common import http
+from tempest.lib.common import rest_client
+from tempest.tests.lib import base
+
+
+class TestPooledHttp(base.TestCase):
+
+    def setUp(self):
+        super(TestPooledHttp, self).setUp()
+        self.request_mock = self.patch('httplib2.Http.request',
+                                       autospec=True)
+        self.request_mock.side_effect = self._fake_request
+        self.pool = http.PooledHttp(maxsize=2)
+
+    @staticmethod
+    def _fake_request(http_obj, uri, method='GET', body=None, headers=None,
+                      **kwargs):
+        # Simulate httplib2 keeping the connection open
+        http_obj.connections[uri.split('/')[2]] = mock.MagicMock()
+        return httplib2.Response({'status': 200}), 'body'
+
+    def test_request_returns_response(self):
+        resp, body = self.pool.request('http://fake/v2/servers', 'GET')
+        self.assertEqual(200, resp.status)
+        self.assertEqual('body', body)
+        self.request_mock.assert_called_once_with(
+            mock.ANY, 'http://fake/v2/servers', 'GET', body=None,
+            headers=None)
+
+    def test_connection_is_reused(self):
+        self.pool.request('http://fake/v2/servers', 'GET')
+        self.pool.request('http://fake/v2/flavors', 'GET')
+        first, second = [c[0][0] for c in self.request_mock.call_args_list]
+        self.assertIs(first, second)
+
+    def test_endpoints_do_not_share_connections(self):
+        self.pool.request('http://fake1/v2/servers', 'GET')
+        self.pool.request('http://fake2/v2/servers', 'GET')
+        first, second = [c[0][0] for c in self.request_mock.call_args_list]
+        self.assertIsNot(first, second)
+
+    def test_stale_connection_is_retried_for_idempotent_method(self):
+        self.pool.request('http://fake/v2/servers', 'GET')
+        stale = self.request_mock.call_args[0][0]
+        self.request_mock.side_effect = [socket.error,
+                                         self._fake_request(stale, 'x//y')]
+        resp, _ = self.pool.request('http://fake/v2/servers', 'GET')
+        self.assertEqual(200, resp.status)
+        self.assertEqual(3, self.request_mock.call_count)
+        self.assertIsNot(stale, self.request_mock.call_args[0][0])
+
+    def test_stale_connection_is_not_retried_for_post(self):
+        self.pool.request('http://fake/v2/servers', 'GET')
+        self.request_mock.side_effect = socket.error
+        self.assertRaises(socket.error, self.pool.request,
+                          'http://fake/v2/servers', 'POST', body='{}')
+        self.assertEqual(2, self.request_mock.call_count)
+
+    def test_new_connection_failure_is_not_retried(self):
+        self.request_mock.side_effect = socket.error
+        self.assertRaises(socket.error, self.pool.request,
+                          'http://fake/v2/servers', 'GET')
+        self.assertEqual(1, self.request_mock.call_count)
+
+    def test_failed_connection_is_not_reused(self):
+        self.request_mock.side_effect = ValueError
+        self.assertRaises(ValueError, self.pool.request,
+                          'http://fake/v2/servers', 'GET')
+        self.request_mock.side_effect = self._fake_request
+        failed = self.request_mock.call_args[0][0]
+        self.pool.request('http://fake/v2/servers', 'GET')
+        self.assertIsNot(failed, self.request_mock.call_args[0][0])
+
+    def test_clear_closes_idle_connections(self):
+        self.pool.request('http://fake/v2/servers', 'GET')
+        http_obj = self.request_mock.call_args[0][0]
+        conn = list(http_obj.connections.values())[0]
+        self.pool.clear()
+        conn.close.assert_called_once_with()
+        self.assertEqual({}, http_obj.connections)
+
+    def test_get_shared_pooled_http(self):
+        first = http.get_shared_pooled_http(ca_certs='fake')
+        self.assertIs(first, http.get_shared_pooled_http(ca_certs='fake'))
+        self.assertIsNot(first, http.get_shared_pooled_http(ca_certs='other'))
+
+    def test_connections_are_not_reused_after_fork(self):
+        self.pool.request('http://fake/v2/servers', 'GET')
+        inherited = self.request_mock.call_args[0][0]
+        conn = list(inherited.connections.values())[0]
+        self.patch('os.getpid', return_value=os.getpid() + 1)
+        self.pool.request('http://fake/v2/flavors', 'GET')
+        child = self.request_mock.call_args[0][0]
+        self.assertIsNot(inherited, child)
+        # The parent still owns the inherited connection
+        self.assertFalse(conn.close.called)
+        self.pool.request('http://fake/v2/images', 'GET')
+        self.assertIs(child, self.request_mock.call_args[0][0])
+
+    def test_shared_pooled_http_is_not_shared_after_fork(self):
+        first = http.get_shared_pooled_http(ca_certs='fake')
+        self.patch('os.getpid', return_value=os.getpid() + 1)
+        child = http.get_shared_pooled_http(ca_certs='fake')
+        self.assertIsNot(first, child)
+        self.assertIs(child, http.get_shared_pooled_http(ca_certs='fake'))
+
+
+class TestRestClientKeepAlive(base.TestCase):
+
+    def test_keep_alive_uses_shared_pooled_http(self):
+        client = rest_client.RestClient(None, 'compute', 'region',
+                                        keep_alive=True)
+        other = rest_client.RestClient(None, 'network', 'region',
+                                       keep_alive=True)
+        self.assertIsInstance(client.http_obj, http.PooledHttp)
+        self.assertIs(client.http_obj, other.http_obj)
+
+    def test_default_closes_connections(self):
+        client = rest_client.RestClient(None, 'compute', 'region')
+        self.assertIsInstance(client.http_obj, http.ClosingHttp)
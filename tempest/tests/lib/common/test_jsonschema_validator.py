@@ -0,0 +1,115 @@
+# Copyright 2016 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import jsonschema
+import mock
+
+from tempest.lib.common import jsonschema_validator
+from tempest.tests.lib import base
+
+VALIDATOR = jsonschema.Draft4Validator
+FORMAT_CHECKER = jsonschema.draft4_format_checker
+
+
+class TestCompileSchema(base.TestCase):
+
+    schema = {
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'integer'},
+            'name': {'type': ['string', 'null'], 'pattern': '^[a-z]+$'},
+            'status': {'enum': ['ACTIVE', 'ERROR']},
+            'ip': {'type': 'string', 'format': 'ipv4'},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+            'pair': {'type': 'array',
+                     'items': [{'type': 'integer'}, {'type': 'boolean'}]},
+            'size': {'oneOf': [{'type': 'integer'},
+                               {'type': 'number'}]},
+            'metadata': {
+                'type': 'object',
+                'patternProperties': {'^x-': {'type': 'string'}},
+                'additionalProperties': {'type': 'integer'}}
+        },
+        'additionalProperties': False,
+        'required': ['id', 'status']
+    }
+
+    documents = [
+        {'id': 1, 'status': 'ACTIVE'},
+        {'id': 1, 'status': 'ACTIVE', 'name': None, 'ip': '10.0.0.1',
+         'tags': ['a', 'b'], 'pair': [1, True, 'extra'], 'size': 1.5,
+         'metadata': {'x-a': 'b', 'c': 1}},
+        {'id': 1, 'status': 'ACTIVE', 'name': 'abc'},
+        [],
+        {'status': 'ACTIVE'},
+        {'id': True, 'status': 'ACTIVE'},
+        {'id': 1.0, 'status': 'ACTIVE'},
+        {'id': 1, 'status': 'BUILD'},
+        {'id': 1, 'status': 'ACTIVE', 'name': 'ABC'},
+        {'id': 1, 'status': 'ACTIVE', 'ip': 'not-an-ip'},
+        {'id': 1, 'status': 'ACTIVE', 'tags': ['a', 1]},
+        {'id': 1, 'status': 'ACTIVE', 'pair': [1, 1]},
+        {'id': 1, 'status': 'ACTIVE', 'size': 1},
+        {'id': 1, 'status': 'ACTIVE', 'metadata': {'x-a': 1}},
+        {'id': 1, 'status': 'ACTIVE', 'metadata': {'c': 'd'}},
+        {'id': 1, 'status': 'ACTIVE', 'other': 1},
+    ]
+
+    def test_compiled_checks_match_jsonschema(self):
+        is_valid = jsonschema_validator.compile_schema(
+            self.schema, VALIDATOR, FORMAT_CHECKER)
+        validator = VALIDATOR(self.schema, format_checker=FORMAT_CHECKER)
+        for document in self.documents:
+            self.assertEqual(validator.is_valid(document),
+                             is_valid(document), document)
+
+    def test_unsupported_keyword(self):
+        self.assertRaises(jsonschema_validator.UnsupportedSchema,
+                          jsonschema_validator.compile_schema,
+                          {'type': 'array', 'minItems': 1}, VALIDATOR)
+
+
+class TestGetValidator(base.TestCase):
+
+    schema = {'type': 'object', 'required': ['foo']}
+
+    def test_validator_is_cached(self):
+        with mock.patch.object(VALIDATOR, 'check_schema') as check_schema:
+            validator = jsonschema_validator.get_validator(
+                self.schema, VALIDATOR, FORMAT_CHECKER)
+            self.assertIs(validator, jsonschema_validator.get_validator(
+                self.schema, VALIDATOR, FORMAT_CHECKER))
+        check_schema.assert_called_once_with(self.schema)
+
+    def test_equal_schemas_get_their_own_validator(self):
+        schema = dict(self.schema)
+        self.assertIsNot(
+            jsonschema_validator.get_validator(schema, VALIDATOR),
+            jsonschema_validator.get_validator(self.schema, VALIDATOR))
+
+    def test_validate_raises_jsonschema_error(self):
+        for compiled in (True, False):
+            validator = jsonschema_validator.get_validator(
+                self.schema, VALIDATOR, compiled=compiled)
+            validator.validate({'foo': 1})
+            ex = self.assertRaises(jsonschema.ValidationError,
+                                   validator.validate, {'bar': 1})
+            self.assertEqual("'foo' is a required property", ex.message)
+
+    def test_unsupported_schema_is_validated_by_jsonschema(self):
+        validator = jsonschema_validator.get_validator(
+            {'type': 'array', 'minItems': 1}, VALIDATOR)
+        validator.validate([1])
+        self.assertRaises(jsonschema.ValidationError, validator.validate, [])
@@ -13,8 +13,10 @@
 #    under the License.
 
 from io import StringIO
+import os
 import socket
 
+import fixtures
 import mock
 import six
 import testtools
@@ -258,3 +260,219 @@ class TestSshClient(base.TestCase):
         std_out_mock.read.assert_called_once_with()
         std_err_mock.read.assert_called_once_with()
         self.assertFalse(select_mock.called)
+
+
+class TestSshConnectionPool(base.TestCase):
+
+    def setUp(self):
+        super(TestSshConnectionPool, self).setUp()
+        self.pool = ssh.ConnectionPool(max_size=2, idle_timeout=10)
+        self.patch('tempest.lib.common.ssh._connection_pool', new=self.pool)
+        self.gsc_mock = self.patch('tempest.lib.common.ssh.Client.'
+                                   '_get_ssh_connection')
+        self.gsc_mock.side_effect = lambda: mock.MagicMock()
+
+    def test_get_returns_none_for_unknown_key(self):
+        self.assertIsNone(self.pool.get('unknown'))
+
+    def test_put_and_get(self):
+        conn = mock.MagicMock()
+        self.pool.put('key', conn)
+        self.assertIs(conn, self.pool.get('key'))
+
+    def test_get_drops_inactive_connection(self):
+        conn = mock.MagicMock()
+        conn.get_transport.return_value.is_active.return_value = False
+        self.pool.put('key', conn)
+        self.assertIsNone(self.pool.get('key'))
+        conn.close.assert_called_once_with()
+        self.assertEqual(0, len(self.pool))
+
+    def test_idle_connections_are_evicted(self):
+        time_mock = self.patch('time.time')
+        time_mock.return_value = 100
+        conn = mock.MagicMock()
+        self.pool.put('key', conn)
+        self.pool.release('key', conn)
+        time_mock.return_value = 111
+        self.assertIsNone(self.pool.get('key'))
+        conn.close.assert_called_once_with()
+
+    def test_release_refreshes_last_use(self):
+        time_mock = self.patch('time.time')
+        time_mock.return_value = 100
+        conn = mock.MagicMock()
+        self.pool.put('key', conn)
+        time_mock.return_value = 105
+        self.pool.release('key', conn)
+        time_mock.return_value = 111
+        self.assertIs(conn, self.pool.get('key'))
+        self.assertFalse(conn.close.called)
+
+    def test_connections_with_open_channels_are_not_evicted(self):
+        time_mock = self.patch('time.time')
+        time_mock.return_value = 100
+        conn = mock.MagicMock()
+        self.pool.put('key', conn)
+        time_mock.return_value = 200
+        self.pool.get('other')
+        self.pool.put('a', mock.MagicMock())
+        self.pool.put('b', mock.MagicMock())
+        self.assertFalse(conn.close.called)
+        self.assertEqual(3, len(self.pool))
+
+    def test_least_recently_used_is_evicted_when_full(self):
+        conns = [mock.MagicMock() for _ in range(3)]
+        for key, conn in zip('ab', conns):
+            self.pool.put(key, conn)
+            self.pool.release(key, conn)
+        self.pool.release('a', self.pool.get('a'))
+        self.pool.put('c', conns[2])
+        conns[1].close.assert_called_once_with()
+        self.assertIs(conns[0], self.pool.get('a'))
+        self.assertIs(conns[2], self.pool.get('c'))
+
+    def test_put_keeps_live_pooled_connection(self):
+        pooled = mock.MagicMock()
+        self.pool.put('key', pooled)
+        conn = mock.MagicMock()
+        self.assertIs(pooled, self.pool.put('key', conn))
+        conn.close.assert_called_once_with()
+        self.assertFalse(pooled.close.called)
+
+    def test_put_replaces_dead_pooled_connection(self):
+        dead = mock.MagicMock()
+        dead.get_transport.return_value.is_active.return_value = False
+        self.pool.put('key', dead)
+        conn = mock.MagicMock()
+        self.assertIs(conn, self.pool.put('key', conn))
+        dead.close.assert_called_once_with()
+
+    def test_exec_command_reuses_connection(self):
+        client = ssh.Client('localhost', 'root', reuse_connection=True)
+        self.patch('tempest.lib.common.ssh.Client._exec_on_channel')
+        client.exec_command('one')
+        client.exec_command('two')
+        self.assertEqual(1, self.gsc_mock.call_count)
+        conn = self.pool.get(client._get_pool_key())
+        self.assertEqual(2, conn.get_transport().open_session.call_count)
+        # Both channels were released
+        self.assertEqual(
+            1, self.pool._connections[client._get_pool_key()].channels)
+        conn.get_transport().set_keepalive.assert_called_once_with(30)
+        self.assertFalse(conn.close.called)
+
+    def test_exec_command_without_reuse_closes_connection(self):
+        client = ssh.Client('localhost', 'root')
+        self.patch('tempest.lib.common.ssh.Client._exec_on_channel')
+        conn = mock.MagicMock()
+        self.gsc_mock.side_effect = None
+        self.gsc_mock.return_value = conn
+        client.exec_command('one')
+        conn.close.assert_called_once_with()
+        self.assertEqual(0, len(self.pool))
+
+    def test_exec_command_reconnects_stale_connection(self):
+        client = ssh.Client('localhost', 'root', reuse_connection=True)
+        self.patch('tempest.lib.common.ssh.Client._exec_on_channel')
+        stale = mock.MagicMock()
+        stale.get_transport.return_value.open_session.side_effect = (
+            EOFError)
+        self.pool.put(client._get_pool_key(), stale)
+        client.exec_command('one')
+        stale.close.assert_called_once_with()
+        self.assertEqual(1, self.gsc_mock.call_count)
+        self.assertIsNot(stale, self.pool.get(client._get_pool_key()))
+
+    def test_connection_auth_replaces_pooled_connection(self):
+        client = ssh.Client('localhost', 'root', reuse_connection=True)
+        old = mock.MagicMock()
+        self.pool.put(client._get_pool_key(), old)
+        client.test_connection_auth()
+        old.close.assert_called_once_with()
+        self.assertEqual(1, self.gsc_mock.call_count)
+        self.assertEqual(1, len(self.pool))
+
+
+class TestSshSftp(base.TestCase):
+
+    def setUp(self):
+        super(TestSshSftp, self).setUp()
+        self.pool = ssh.ConnectionPool()
+        self.patch('tempest.lib.common.ssh._connection_pool', new=self.pool)
+        self.conn = mock.MagicMock()
+        self.patch('tempest.lib.common.ssh.Client._get_ssh_connection',
+                   return_value=self.conn)
+        self.sftp = mock.MagicMock()
+        self.sftp.get_channel.return_value.closed = False
+        self.sftp.stat.side_effect = IOError
+        self.patch('paramiko.SFTPClient', return_value=self.sftp)
+        self.remote_md5 = self.patch(
+            'tempest.lib.common.ssh.Client._remote_md5')
+        self.tmp = self.useFixture(fixtures.TempDir()).path
+        self.source = os.path.join(self.tmp, 'script.sh')
+        with open(self.source, 'w') as f:
+            f.write('echo test')
+        os.utime(self.source, (1000, 2000))
+
+    def _remote_stat(self, size, mtime):
+        return mock.Mock(st_size=size, st_mtime=mtime)
+
+    def test_sftp_copies_missing_file(self):
+        client = ssh.Client('localhost', 'root')
+        copied = client.sftp(self.source, '/tmp')
+        self.assertEqual(['/tmp/script.sh'], copied)
+        self.sftp.put.assert_called_once_with(self.source, '/tmp/script.sh')
+        self.sftp.utime.assert_called_once_with('/tmp/script.sh',
+                                                (1000, 2000))
+        self.conn.get_transport().open_session().invoke_subsystem.\
+            assert_called_once_with('sftp')
+        self.sftp.close.assert_called_once_with()
+        self.conn.close.assert_called_once_with()
+
+    def test_sftp_skips_file_with_same_size_and_mtime(self):
+        self.sftp.stat.side_effect = None
+        self.sftp.stat.return_value = self._remote_stat(9, 2000)
+        client = ssh.Client('localhost', 'root')
+        self.assertEqual([], client.sftp(self.source, '/tmp'))
+        self.assertFalse(self.sftp.put.called)
+        self.assertFalse(self.sftp.open.called)
+        self.assertFalse(self.remote_md5.called)
+
+    def test_sftp_compares_remote_md5(self):
+        self.sftp.stat.side_effect = None
+        self.sftp.stat.return_value = self._remote_stat(9, 3000)
+        self.remote_md5.return_value = ssh._md5sum(self.source)
+        client = ssh.Client('localhost', 'root')
+        self.assertEqual([], client.sftp(self.source, '/tmp'))
+        self.remote_md5.assert_called_once_with('/tmp/script.sh')
+        self.remote_md5.return_value = 'different'
+        self.assertEqual(['/tmp/script.sh'],
+                         client.sftp(self.source, '/tmp'))
+
+    def test_sftp_copies_file_with_different_size(self):
+        self.sftp.stat.side_effect = None
+        self.sftp.stat.return_value = self._remote_stat(1, 2000)
+        client = ssh.Client('localhost', 'root')
+        self.assertEqual(['/tmp/script.sh'],
+                         client.sftp(self.source, '/tmp'))
+
+    def test_sftp_copies_directory_in_one_session(self):
+        os.mkdir(os.path.join(self.tmp, 'sub'))
+        with open(os.path.join(self.tmp, 'sub', 'other.sh'), 'w') as f:
+            f.write('echo other')
+        client = ssh.Client('localhost', 'root')
+        copied = client.sftp(self.tmp, '/tmp/')
+        root = '/tmp/' + os.path.basename(self.tmp)
+        self.assertEqual([root + '/script.sh', root + '/sub/other.sh'],
+                         sorted(copied))
+        self.assertEqual(1, self.conn.get_transport().open_session.call_count)
+
+    def test_sftp_session_is_reused(self):
+        client = ssh.Client('localhost', 'root', reuse_connection=True)
+        client.sftp(self.source, '/tmp')
+        client.sftp(self.source, '/tmp')
+        self.assertEqual(1, self.conn.get_transport().open_session.call_count)
+        self.assertFalse(self.sftp.close.called)
+        client.close()
+        self.sftp.close.assert_called_once_with()
@@ -0,0 +1,190 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import errno
+import os
+
+import fixtures
+import mock
+from oslo_concurrency import lockutils
+
+from tempest import config
+from tempest.lis import host_affinity
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class FakeLock(object):
+    """An InterProcessLock taken by other workers for a few attempts."""
+
+    busy_attempts = {}
+    held = []
+
+    def __init__(self, path):
+        self.path = path
+
+    def acquire(self, blocking=True):
+        name = os.path.basename(self.path)
+        busy = self.busy_attempts.get(name, 0)
+        if busy:
+            self.busy_attempts[name] = busy - 1
+            return False
+        self.held.append(name)
+        return True
+
+    def release(self):
+        self.held.remove(os.path.basename(self.path))
+
+
+class HostAffinityTestCase(base.TestCase):
+
+    def setUp(self):
+        super(HostAffinityTestCase, self).setUp()
+        self.conf = self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.lock_path = self.useFixture(fixtures.TempDir()).path
+        self.conf.config(lock_path=self.lock_path, group='oslo_concurrency')
+        self.lock_dir = os.path.join(self.lock_path, 'lis_hosts')
+        self.patch('tempest.lis.host_affinity._worker_host', new=None)
+        self.atexit = self.patch('atexit.register')
+
+    def set_hosts(self, *hosts):
+        self.conf.config(hosts=list(hosts), group='lis')
+
+    def claim(self, host_name, pid):
+        if not os.path.isdir(self.lock_dir):
+            os.makedirs(self.lock_dir)
+        path = os.path.join(self.lock_dir, '%s.claim.%d' % (host_name, pid))
+        open(path, 'w').close()
+        return path
+
+
+class TestWorkerHost(HostAffinityTestCase):
+
+    def test_no_hosts(self):
+        self.assertIsNone(host_affinity.get_worker_host())
+        self.assertIsNone(host_affinity.get_availability_zone())
+        self.assertFalse(os.path.exists(self.lock_dir))
+
+    def test_first_host_is_claimed(self):
+        self.set_hosts('host1', 'az:Host2')
+        self.assertEqual('host1', host_affinity.get_worker_host())
+        claim = os.path.join(self.lock_dir, 'host1.claim.%d' % os.getpid())
+        self.assertTrue(os.path.exists(claim))
+        self.atexit.assert_called_once_with(host_affinity._remove_claim,
+                                            claim)
+
+    def test_least_used_host_is_claimed(self):
+        self.set_hosts('host1', 'az:Host2')
+        self.claim('host1', os.getppid())
+        self.assertEqual('az:Host2', host_affinity.get_worker_host())
+        self.assertTrue(os.path.exists(os.path.join(
+            self.lock_dir, 'host2.claim.%d' % os.getpid())))
+
+    def test_claims_of_dead_workers_are_dropped(self):
+        self.set_hosts('host1', 'host2')
+        dead = self.claim('host1', 1234567)
+        alive = self.patch('tempest.lis.host_affinity._is_alive')
+        alive.side_effect = lambda pid: pid != 1234567
+        self.assertEqual('host1', host_affinity.get_worker_host())
+        self.assertFalse(os.path.exists(dead))
+
+    def test_host_is_claimed_once(self):
+        self.set_hosts('host1', 'host2')
+        self.assertEqual('host1', host_affinity.get_worker_host())
+        self.assertEqual('host1', host_affinity.get_worker_host())
+        self.assertEqual(1, len([f for f in os.listdir(self.lock_dir)
+                                 if '.claim.' in f]))
+        self.assertEqual(1, self.atexit.call_count)
+
+    def test_availability_zone(self):
+        self.set_hosts('host1')
+        self.assertEqual('nova:host1', host_affinity.get_availability_zone())
+
+    def test_availability_zone_of_zoned_host(self):
+        self.set_hosts('az:host1')
+        self.assertEqual('az:host1', host_affinity.get_availability_zone())
+
+    def test_is_alive(self):
+        kill = self.patch('os.kill')
+        self.assertTrue(host_affinity._is_alive(42))
+        kill.assert_called_once_with(42, 0)
+        kill.side_effect = OSError(errno.ESRCH, 'No such process')
+        self.assertFalse(host_affinity._is_alive(42))
+        kill.side_effect = OSError(errno.EPERM, 'Not permitted')
+        self.assertTrue(host_affinity._is_alive(42))
+
+
+class TestHostSlot(HostAffinityTestCase):
+
+    def setUp(self):
+        super(TestHostSlot, self).setUp()
+        FakeLock.busy_attempts = {}
+        FakeLock.held = []
+        self.real_lock = lockutils.InterProcessLock
+        self.patch('oslo_concurrency.lockutils.InterProcessLock',
+                   new=FakeLock)
+        self.sleep = self.patch('time.sleep')
+        self.conf.config(max_vm_operations_per_host=2,
+                         max_disk_operations_per_host=1, group='lis')
+
+    def test_first_free_slot_is_taken(self):
+        FakeLock.busy_attempts = {'host1.vm.0': 1}
+        with host_affinity.host_slot('az:Host1', 'vm'):
+            self.assertEqual(['host1.vm.1'], FakeLock.held)
+        self.assertEqual([], FakeLock.held)
+        self.assertFalse(self.sleep.called)
+
+    def test_slots_are_polled_until_one_is_free(self):
+        FakeLock.busy_attempts = {'host1.vm.0': 3, 'host1.vm.1': 3}
+        with host_affinity.host_slot('host1', 'vm'):
+            self.assertEqual(['host1.vm.0'], FakeLock.held)
+        self.assertEqual([mock.call(host_affinity.SLOT_POLL_INTERVAL)] * 3,
+                         self.sleep.call_args_list)
+
+    def test_slot_is_released_on_error(self):
+        def run():
+            with host_affinity.host_slot('host1', 'disk'):
+                raise ValueError()
+        self.assertRaises(ValueError, run)
+        self.assertEqual([], FakeLock.held)
+
+    def test_no_throttling(self):
+        self.conf.config(max_disk_operations_per_host=0, group='lis')
+        for host, operation in ((None, 'vm'), ('host1', 'disk')):
+            with host_affinity.host_slot(host, operation):
+                self.assertEqual([], FakeLock.held)
+        self.assertFalse(os.path.exists(self.lock_dir))
+
+    def test_host_operation(self):
+        class Test(object):
+            host_name = 'host1'
+
+            @host_affinity.host_operation('disk')
+            def attach_disk(self, name):
+                """Attaches a disk."""
+                return name, list(FakeLock.held)
+
+        self.assertEqual(('disk1', ['host1.disk.0']),
+                         Test().attach_disk('disk1'))
+        self.assertEqual([], FakeLock.held)
+        self.assertEqual('Attaches a disk.', Test.attach_disk.__doc__)
+
+    def test_slot_lock_files(self):
+        self.patch('oslo_concurrency.lockutils.InterProcessLock',
+                   new=self.real_lock)
+        with host_affinity.host_slot('host1', 'disk'):
+            self.assertTrue(os.path.exists(os.path.join(self.lock_dir,
+                                                        'host1.disk.0')))
@@ -0,0 +1,112 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+import threading
+import types
+
+import fixtures
+import mock
+
+from tempest import config
+from tempest.lis import manager
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestSpawnVms(base.TestCase):
+
+    def setUp(self):
+        super(TestSpawnVms, self).setUp()
+        self.conf = self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.conf.config(public_network_id='public', group='network')
+        self.conf.config(lock_path=self.useFixture(fixtures.TempDir()).path,
+                         group='oslo_concurrency')
+        self.patch('tempest.lis.host_affinity.get_availability_zone',
+                   return_value=None)
+        self.patch('tempest.common.waiters.wait_for_server_status')
+        self.patch('time.sleep')
+
+        # The LisBase methods run against mocked clients
+        self.test = mock.Mock()
+        self.test.keypair = {'name': 'keypair'}
+        self.test._create_security_group.return_value = {'name': 'secgroup'}
+        for name in ('spawn_vms', '_wait_for_server_host',
+                     '_wait_for_active_server', '_create_floating_ip_address',
+                     '_associate_floating_ip_address'):
+            setattr(self.test, name, types.MethodType(
+                getattr(manager.LisBase, name), self.test))
+
+        self.servers = {}
+        ids = itertools.count(1)
+        lock = threading.Lock()
+
+        def create_server(**kwargs):
+            with lock:
+                server_id = 'server-%d' % next(ids)
+            self.servers[server_id] = dict(
+                id=server_id, status='ACTIVE', kwargs=kwargs,
+                **{'OS-EXT-AZ:availability_zone': 'nova',
+                   'OS-EXT-SRV-ATTR:hypervisor_hostname': 'host%s' %
+                   server_id[-1]})
+            return {'id': server_id}
+        self.test.create_server.side_effect = create_server
+        self.test.servers_client.show_server.side_effect = (
+            lambda server_id: {'server': self.servers[server_id]})
+
+        ips = itertools.count(1)
+
+        def create_floatingip(**kwargs):
+            with lock:
+                return {'floatingip': {'id': 'fip', 'floating_ip_address':
+                                       '10.0.0.%d' % next(ips)}}
+        self.test.floating_ips_client.create_floatingip.side_effect = (
+            create_floatingip)
+
+    def test_count_must_be_positive(self):
+        self.assertRaises(ValueError, self.test.spawn_vms, 0)
+        self.assertFalse(self.test.create_server.called)
+
+    def test_instances_get_their_floating_ips(self):
+        instances = self.test.spawn_vms(3)
+        self.assertEqual(['server-1', 'server-2', 'server-3'],
+                         [instance['id'] for instance in instances])
+        associate = (self.test.compute_floating_ips_client.
+                     associate_floating_ip_to_server)
+        self.assertEqual(
+            sorted(mock.call(instance['floating_ip'], instance['id'])
+                   for instance in instances),
+            sorted(associate.call_args_list))
+        self.assertEqual(['10.0.0.1', '10.0.0.2', '10.0.0.3'],
+                         sorted(instance['floating_ip']
+                                for instance in instances))
+        self.assertIs(instances, self.test.instances)
+        self.test._initiate_host_client.assert_called_once_with('host1')
+
+    def test_same_host_pins_instances_to_first_host(self):
+        self.test.spawn_vms(3, same_host=True)
+        self.assertNotIn('availability_zone',
+                         self.servers['server-1']['kwargs'])
+        for server_id in ('server-2', 'server-3'):
+            self.assertEqual(
+                'nova:host1',
+                self.servers[server_id]['kwargs']['availability_zone'])
+
+    def test_availability_zone(self):
+        self.test.spawn_vms(2, same_host=True, av_zone='az:host2')
+        self.assertEqual(2, len(self.servers))
+        for server in self.servers.values():
+            self.assertEqual('az:host2', server['kwargs']['availability_zone'])
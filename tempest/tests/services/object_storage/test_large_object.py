@@ -0,0 +1,174 @@
+# Copyright 2016 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import threading
+
+import httplib2
+from oslo_serialization import jsonutils as json
+from oslotest import mockpatch
+import six
+from six.moves.urllib import parse as urlparse
+
+from tempest import exceptions
+from tempest.lib.common import http
+from tempest.services.object_storage import large_object
+from tempest.services.object_storage import object_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+
+
+def _md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class FakeSwift(object):
+    """In-memory Swift, serving the requests of an object client."""
+
+    def __init__(self):
+        self.objects = {}
+        self.manifests = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def _get_data(self, path):
+        if path in self.manifests:
+            kind, value = self.manifests[path]
+            if kind == 'slo':
+                return b''.join(self.objects[s['path'].lstrip('/')]
+                                for s in value)
+            return b''.join(data for name, data in sorted(self.objects.items())
+                            if name.startswith(value))
+        return self.objects[path]
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        parts = urlparse.urlsplit(uri)
+        path = parts.path
+        query = urlparse.parse_qs(parts.query)
+        headers = headers or {}
+        with self.lock:
+            self.requests.append((method, path))
+        if isinstance(body, six.text_type):
+            body = body.encode('utf-8')
+        if method == 'PUT':
+            if 'multipart-manifest' in query:
+                segments = json.loads(body)
+                self.manifests[path] = ('slo', segments)
+                etag = _md5(b''.join(s['etag'].encode('ascii')
+                                     for s in segments))
+            elif 'X-Object-Manifest' in headers:
+                self.manifests[path] = ('dlo', headers['X-Object-Manifest'])
+                etag = _md5(b'')
+            else:
+                with self.lock:
+                    self.objects[path] = body or b''
+                etag = _md5(body or b'')
+            return httplib2.Response({'status': 201, 'etag': etag}), ''
+        data = self._get_data(path)
+        resp = {'status': 200, 'content-length': str(len(data))}
+        if path in self.manifests:
+            resp['x-static-large-object'] = 'True'
+        else:
+            resp['etag'] = _md5(data)
+        if method == 'HEAD':
+            return httplib2.Response(resp), ''
+        if 'Range' in headers:
+            start, end = headers['Range'].split('=')[1].split('-')
+            data = data[int(start):int(end) + 1]
+            resp['status'] = 206
+        return httplib2.Response(resp), data
+
+
+class TestLargeObjectTransfer(base.TestCase):
+
+    data = b''.join(six.int2byte(i % 251) for i in range(1000))
+
+    def setUp(self):
+        super(TestLargeObjectTransfer, self).setUp()
+        self.swift = FakeSwift()
+        self.useFixture(mockpatch.PatchObject(
+            http, 'get_shared_pooled_http', return_value=self.swift))
+        self.client = object_client.ObjectClient(
+            fake_auth_provider.FakeAuthProvider(), 'object-store', 'region')
+        self.transfer = large_object.LargeObjectTransfer(
+            self.client, segment_size=64, concurrency=4)
+
+    def test_client_is_pooled_copy(self):
+        self.assertIsNot(self.client, self.transfer.client)
+        self.assertIs(self.swift, self.transfer.client.http_obj)
+        http.get_shared_pooled_http.assert_called_once_with(
+            4, disable_ssl_certificate_validation=False, ca_certs=None)
+
+    def test_static_large_object_upload(self):
+        resp, segments = self.transfer.upload('c', 'obj',
+                                              six.BytesIO(self.data))
+        self.assertEqual(16, len(segments))
+        self.assertEqual([_md5(self.data[i:i + 64])
+                          for i in range(0, 1000, 64)],
+                         [segment['etag'] for segment in segments])
+        self.assertEqual(self.data, self.swift._get_data('c/obj'))
+
+    def test_dynamic_large_object_upload(self):
+        self.transfer.upload('c', 'obj', six.BytesIO(self.data),
+                             static=False, segment_container='segments')
+        kind, prefix = self.swift.manifests['c/obj']
+        self.assertEqual('dlo', kind)
+        self.assertTrue(prefix.startswith('segments/obj/dlo/'))
+        self.assertEqual(self.data, self.swift._get_data('c/obj'))
+
+    def test_empty_upload(self):
+        resp, segments = self.transfer.upload('c', 'obj', six.BytesIO(b''))
+        self.assertEqual([], segments)
+        self.assertEqual(b'', self.swift.objects['c/obj'])
+
+    def test_segment_checksum_mismatch(self):
+        request = self.swift.request
+
+        def corrupting_request(uri, method='GET', body=None, **kwargs):
+            if method == 'PUT' and body:
+                body = b'X' + body[1:]
+            return request(uri, method, body=body, **kwargs)
+        self.swift.request = corrupting_request
+        self.assertRaises(exceptions.ObjectTransferError,
+                          self.transfer.upload, 'c', 'obj',
+                          six.BytesIO(self.data))
+
+    def test_ranged_download(self):
+        self.swift.objects['c/obj'] = self.data
+        dest = six.BytesIO()
+        resp, checksum = self.transfer.download('c', 'obj', dest)
+        self.assertEqual(self.data, dest.getvalue())
+        self.assertEqual(_md5(self.data), checksum)
+        self.assertEqual(16, len([r for r in self.swift.requests
+                                  if r[0] == 'GET']))
+
+    def test_download_of_large_object(self):
+        self.transfer.upload('c', 'obj', six.BytesIO(self.data))
+        dest = six.BytesIO()
+        self.transfer.download('c', 'obj', dest)
+        self.assertEqual(self.data, dest.getvalue())
+
+    def test_download_checksum_mismatch(self):
+        self.swift.objects['c/obj'] = b'X' + self.data[1:]
+        request = self.swift.request
+
+        def request_with_stale_etag(uri, method='GET', **kwargs):
+            resp, data = request(uri, method, **kwargs)
+            if method == 'HEAD':
+                resp['etag'] = _md5(self.data)
+            return resp, data
+        self.swift.request = request_with_stale_etag
+        self.assertRaises(exceptions.ObjectTransferError,
+                          self.transfer.download, 'c', 'obj', six.BytesIO())
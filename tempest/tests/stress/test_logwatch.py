@@ -0,0 +1,64 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest.stress import logwatch
+from tempest.tests import base
+
+
+class TestLogWatcher(base.TestCase):
+
+    def setUp(self):
+        super(TestLogWatcher, self).setUp()
+        self.clients = {'node1': mock.Mock(), 'node2': mock.Mock()}
+        self.patch('tempest.lib.common.ssh.Client',
+                   new=lambda host, *args, **kwargs: self.clients[host])
+        self.watcher = logwatch.LogWatcher('/var/log/nova/*.log',
+                                           ['node1', 'node2'], 'stack')
+        self.addCleanup(self.watcher.close)
+
+    def test_check_returns_new_errors_per_node(self):
+        self.clients['node1'].exec_command.return_value = (
+            '@@logwatch-size@@ 120 /var/log/nova/compute.log\n'
+            'ERROR boom\n')
+        self.clients['node2'].exec_command.return_value = (
+            '@@logwatch-size@@ 64 /var/log/nova/compute.log\n')
+        self.assertEqual(
+            {'node1': ['/var/log/nova/compute.log: ERROR boom']},
+            self.watcher.check())
+        self.assertEqual({'/var/log/nova/compute.log': 120},
+                         self.watcher._offsets['node1'])
+        self.assertEqual({'/var/log/nova/compute.log': 64},
+                         self.watcher._offsets['node2'])
+        for client in self.clients.values():
+            self.assertEqual({'ignore_exit_status': True},
+                             client.exec_command.call_args[1])
+
+    def test_command_starts_at_scanned_size(self):
+        self.watcher._offsets['node1'] = {'/var/log/nova/api.log': 10}
+        command = self.watcher._get_command('node1')
+        self.assertIn('for f in /var/log/nova/*.log;', command)
+        self.assertIn('/var/log/nova/api.log) offset=10 ;;', command)
+        self.assertIn("egrep 'ERROR|TRACE'", command)
+        self.assertNotIn('offset=10', self.watcher._get_command('node2'))
+
+    def test_check_ignores_failed_node(self):
+        self.clients['node1'].exec_command.side_effect = Exception(
+            'connection lost')
+        self.clients['node2'].exec_command.return_value = (
+            '@@logwatch-size@@ 8 /var/log/nova/compute.log\nTRACE\n')
+        self.assertEqual(
+            {'node2': ['/var/log/nova/compute.log: TRACE']},
+            self.watcher.check())
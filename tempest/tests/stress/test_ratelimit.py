@@ -0,0 +1,127 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest.stress import ratelimit
+from tempest.tests import base
+from tempest.tests.stress import test_stressaction
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateProfile(base.TestCase):
+
+    def test_constant(self):
+        profile = ratelimit.RateProfile(2)
+        self.assertEqual(2.0, profile.get_rate(0))
+        self.assertEqual(2.0, profile.get_rate(3600))
+
+    def test_ramp_up(self):
+        profile = ratelimit.RateProfile(4, ramp_up=10)
+        self.assertEqual(0.0, profile.get_rate(0))
+        self.assertEqual(2.0, profile.get_rate(5))
+        self.assertEqual(4.0, profile.get_rate(10))
+
+    def test_steps(self):
+        profile = ratelimit.RateProfile(
+            1, steps=[{'after': 20, 'ops_per_second': 3},
+                      {'after': 10, 'ops_per_second': 2}])
+        self.assertEqual(1.0, profile.get_rate(9))
+        self.assertEqual(2.0, profile.get_rate(10))
+        self.assertEqual(3.0, profile.get_rate(25))
+
+    def test_from_dict_shares_rate(self):
+        profile = ratelimit.RateProfile.from_dict(
+            {'ops_per_second': 4, 'ramp_up': 8,
+             'steps': [{'after': 60, 'ops_per_second': 8}]}, workers=4)
+        self.assertEqual(1.0, profile.ops_per_second)
+        self.assertEqual(8.0, profile.ramp_up)
+        self.assertEqual([(60.0, 2.0)], profile.steps)
+
+
+class TestTokenBucket(base.TestCase):
+
+    def setUp(self):
+        super(TestTokenBucket, self).setUp()
+        self.clock = FakeClock()
+        self.patch('time.time', new=self.clock.time)
+        self.patch('time.sleep', new=self.clock.sleep)
+
+    def test_fixed_rate(self):
+        bucket = ratelimit.TokenBucket(ratelimit.RateProfile(2))
+        dispatched = []
+        for i in range(5):
+            scheduled_time = bucket.wait()
+            self.assertEqual(self.clock.now, scheduled_time)
+            dispatched.append(self.clock.now - 1000.0)
+        self.assertEqual([0.0, 0.5, 1.0, 1.5, 2.0], dispatched)
+
+    def test_delayed_operation_is_scheduled_when_due(self):
+        bucket = ratelimit.TokenBucket(ratelimit.RateProfile(1))
+        self.assertEqual(1000.0, bucket.wait())
+        # A slow run taking five intervals delays the next one
+        self.clock.now += 5
+        self.assertEqual(1001.0, bucket.wait())
+        self.assertEqual(1006.0, bucket.wait())
+        self.assertEqual(1006.0, self.clock.now)
+
+    def test_catches_up_within_burst(self):
+        bucket = ratelimit.TokenBucket(ratelimit.RateProfile(1), burst=2)
+        bucket.wait()
+        # A slow run taking five intervals
+        self.clock.now += 5
+        bucket.wait()
+        bucket.wait()
+        self.assertEqual([], self.clock.sleeps)
+        bucket.wait()
+        self.assertEqual([1.0], self.clock.sleeps)
+
+    def test_waits_for_ramp_up(self):
+        bucket = ratelimit.TokenBucket(ratelimit.RateProfile(1, ramp_up=4))
+        bucket.wait()
+        bucket.wait()
+        self.assertTrue(self.clock.now > 1000.0)
+        self.assertEqual(ratelimit.MAX_WAIT_INTERVAL, self.clock.sleeps[0])
+
+    def test_execute_waits_for_rate_limiter(self):
+        rate_limiter = mock.Mock()
+        action = test_stressaction.FakeStressAction(manager=None, max_runs=3)
+        stats = {'runs': 0, 'fails': 0}
+        action.execute(stats, rate_limiter)
+        self.assertEqual(3, stats['runs'])
+        self.assertEqual(3, rate_limiter.wait.call_count)
+
+    def test_execute_measures_latency_from_schedule(self):
+        rate_limiter = mock.Mock()
+        rate_limiter.wait.return_value = 990.0
+        action = test_stressaction.FakeStressAction(manager=None, max_runs=1)
+        stats = mock.MagicMock()
+        counts = {'runs': 0, 'fails': 0}
+        stats.__getitem__.side_effect = counts.__getitem__
+        stats.__setitem__.side_effect = counts.__setitem__
+        action.execute(stats, rate_limiter)
+        stats.record_latency.assert_called_once_with(10.0)
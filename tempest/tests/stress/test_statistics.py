@@ -0,0 +1,88 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+
+from tempest.stress import statistics
+from tempest.tests import base
+from tempest.tests.stress import test_stressaction
+
+
+def _record(slot, runs, latency):
+    for i in range(runs):
+        slot.record_latency(latency)
+        slot['runs'] += 1
+
+
+class TestStatistics(base.TestCase):
+
+    def test_slots_are_independent(self):
+        block = statistics.StatisticsBlock(2)
+        first = block.get_slot(0)
+        second = block.get_slot(1)
+        first['runs'] += 3
+        first['fails'] += 1
+        second['runs'] += 5
+        self.assertEqual(3, first['runs'])
+        self.assertEqual(1, first['fails'])
+        self.assertEqual(5, second['runs'])
+        self.assertEqual(0, second['fails'])
+        self.assertRaises(IndexError, block.get_slot, 2)
+
+    def test_slot_shared_with_child_process(self):
+        block = statistics.StatisticsBlock(1)
+        process = multiprocessing.Process(target=_record,
+                                          args=(block.get_slot(0), 4, 0.5))
+        process.start()
+        process.join()
+        slot = block.get_slot(0)
+        self.assertEqual(4, slot['runs'])
+        self.assertEqual(2.0, slot.latency_sum)
+        self.assertEqual(0.5, slot.latency_max)
+        self.assertEqual(4, sum(slot.histogram))
+
+    def test_execute_records_latency(self):
+        slot = statistics.StatisticsBlock(1).get_slot(0)
+        action = test_stressaction.FakeStressActionFailing(manager=None,
+                                                           max_runs=3)
+        action.execute(slot)
+        self.assertEqual(3, slot['runs'])
+        self.assertEqual(3, slot['fails'])
+        self.assertEqual(3, sum(slot.histogram))
+
+    def test_summary(self):
+        block = statistics.StatisticsBlock(2)
+        first = block.get_slot(0)
+        second = block.get_slot(1)
+        _record(first, 90, 0.1)
+        _record(second, 10, 2.0)
+        second['fails'] += 5
+        summary = statistics.Summary()
+        summary.add(first)
+        summary.add(second)
+        self.assertEqual(100, summary.runs)
+        self.assertEqual(5, summary.fails)
+        self.assertEqual(0.05, summary.error_rate)
+        self.assertAlmostEqual(0.29, summary.latency_mean)
+        self.assertEqual(2.0, summary.latency_max)
+        p50 = summary.get_percentile(50)
+        self.assertTrue(0.1 <= p50 < 0.1 * statistics.LATENCY_GROWTH)
+        self.assertEqual(2.0, summary.get_percentile(95))
+        self.assertEqual(2.0, summary.get_percentile(99))
+
+    def test_empty_summary(self):
+        summary = statistics.Summary()
+        self.assertEqual(0.0, summary.error_rate)
+        self.assertEqual(0.0, summary.latency_mean)
+        self.assertEqual(0.0, summary.get_percentile(99))
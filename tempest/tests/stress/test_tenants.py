@@ -0,0 +1,108 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import stat
+
+import fixtures
+import mock
+
+from tempest import config
+from tempest.lib import auth
+from tempest.stress import tenants
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class FakeCredsClient(object):
+
+    def __init__(self):
+        self.deleted = []
+
+    def create_project(self, name, description):
+        return {'id': name + '-id', 'name': name}
+
+    def create_user(self, username, password, project, email):
+        return {'id': username + '-id', 'name': username}
+
+    def assign_user_role(self, user, project, role_name):
+        pass
+
+    def get_credentials(self, user, project, password):
+        return auth.get_credentials(
+            auth_url=None, fill_in=False, identity_version='v2',
+            username=user['name'], user_id=user['id'],
+            tenant_name=project['name'], tenant_id=project['id'],
+            password=password)
+
+    def delete_user(self, user_id):
+        self.deleted.append(user_id)
+
+    def delete_project(self, project_id):
+        self.deleted.append(project_id)
+
+
+class TestTenantProvisioner(base.TestCase):
+
+    def setUp(self):
+        super(TestTenantProvisioner, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate',
+                       fake_config.FakePrivate)
+        self.creds_client = FakeCredsClient()
+        self.patch('tempest.common.credentials_factory.AdminManager',
+                   new=mock.Mock())
+        self.patch('tempest.common.cred_client.get_creds_client',
+                   new=mock.Mock(return_value=self.creds_client))
+        self.cache_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'tenants.yaml')
+
+    def test_get_credentials_and_cleanup(self):
+        provisioner = tenants.TenantProvisioner(concurrency=3)
+        creds_list = provisioner.get_credentials(5)
+        self.assertEqual(5, len(creds_list))
+        self.assertEqual(5, len(set(creds.username for creds in creds_list)))
+        provisioner.cleanup()
+        self.assertEqual(10, len(self.creds_client.deleted))
+        provisioner.cleanup()
+        self.assertEqual(10, len(self.creds_client.deleted))
+
+    def test_cached_credentials_are_reused(self):
+        provisioner = tenants.TenantProvisioner(cache_file=self.cache_file)
+        created = provisioner.get_credentials(2)
+        provisioner.cleanup()
+        self.assertEqual([], self.creds_client.deleted)
+        self.assertEqual(0o600,
+                         stat.S_IMODE(os.stat(self.cache_file).st_mode))
+
+        provisioner = tenants.TenantProvisioner(cache_file=self.cache_file)
+        create_project = self.patch(
+            'tempest.tests.stress.test_tenants.FakeCredsClient'
+            '.create_project', new=mock.Mock(
+                wraps=self.creds_client.create_project))
+        creds_list = provisioner.get_credentials(3)
+        self.assertEqual(created, creds_list[:2])
+        self.assertEqual(created[0].password, creds_list[0].password)
+        self.assertEqual(1, create_project.call_count)
+        self.assertEqual(3, len(provisioner._read_cache()))
+
+    def test_project_is_deleted_when_user_creation_fails(self):
+        provisioner = tenants.TenantProvisioner(concurrency=2)
+        self.patch('tempest.tests.stress.test_tenants.FakeCredsClient'
+                   '.create_user', side_effect=ValueError)
+        self.assertRaises(ValueError, provisioner.get_credentials, 2)
+        provisioner.cleanup()
+        self.assertEqual(2, len(self.creds_client.deleted))
+        self.assertTrue(all('stress_tenant' in deleted
+                            for deleted in self.creds_client.deleted))
@@ -0,0 +1,83 @@
+# Copyright 2016 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_config import cfg
+
+from tempest import clients
+from tempest import config
+from tempest.lib import auth
+from tempest.lib.services.compute import servers_client
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestManager(base.TestCase):
+
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.patch('tempest.manager.get_auth_provider', new=mock.Mock())
+        self.creds = auth.get_credentials(
+            auth_url=None, fill_in=False, identity_version='v2',
+            username='fake_user', password='fake_password',
+            tenant_name='fake_tenant')
+
+    def test_clients_are_created_on_first_access(self):
+        with mock.patch.object(servers_client.ServersClient,
+                               '__init__', return_value=None) as init:
+            manager = clients.Manager(self.creds)
+            self.assertNotIn('servers_client', manager.__dict__)
+            init.assert_not_called()
+            client = manager.servers_client
+        self.assertIsInstance(client, servers_client.ServersClient)
+        self.assertIs(client, manager.servers_client)
+        init.assert_called_once_with(
+            manager.auth_provider,
+            enable_instance_password=mock.ANY,
+            service=mock.ANY, region=mock.ANY, endpoint_type=mock.ANY,
+            build_interval=mock.ANY, build_timeout=mock.ANY,
+            **clients.Manager.default_params)
+
+    def test_clients_share_auth_provider(self):
+        manager = clients.Manager(self.creds)
+        self.assertIs(manager.auth_provider,
+                      manager.servers_client.auth_provider)
+        self.assertIs(manager.auth_provider,
+                      manager.volumes_client.auth_provider)
+
+    def test_client_can_be_replaced(self):
+        manager = clients.Manager(self.creds)
+        fake_client = mock.Mock()
+        manager.servers_client = fake_client
+        self.assertIs(fake_client, manager.servers_client)
+
+    def test_unknown_client(self):
+        cfg.CONF.set_default('ceilometer', False, 'service_available')
+        manager = clients.Manager(self.creds)
+        self.assertRaises(AttributeError, getattr, manager,
+                          'telemetry_client')
+        self.assertRaises(AttributeError, getattr, manager, 'fake_client')
+
+    def test_failed_client_creation_is_retried(self):
+        manager = clients.Manager(self.creds)
+        with mock.patch.object(servers_client.ServersClient, '__init__',
+                               side_effect=[ValueError, None]) as init:
+            self.assertRaises(ValueError, getattr, manager, 'servers_client')
+            self.assertNotIn('servers_client', manager.__dict__)
+            client = manager.servers_client
+        self.assertEqual(2, init.call_count)
+        self.assertIsInstance(client, servers_client.ServersClient)
+        self.assertIs(client, manager.servers_client)
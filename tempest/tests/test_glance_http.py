@@ -13,6 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
+import mmap
+import os
+import socket
+
+import fixtures
 import mock
 from oslotest import mockpatch
 import six
@@ -68,7 +74,7 @@ class TestGlanceHTTPClient(base.TestCase):
 
     def test_raw_request_chunked(self):
         self.useFixture(mockpatch.PatchObject(glance_http,
-                                              'CHUNKSIZE', 1))
+                                              'STREAM_CHUNKSIZE', 1))
         self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
                         'endheaders'))
         self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
@@ -82,6 +88,39 @@ class TestGlanceHTTPClient(base.TestCase):
         call_count = httplib.HTTPConnection.send.call_count
         self.assertEqual(call_count - 1, req_body.tell())
 
+    def _send_chunked_body(self, req_body):
+        sent = []
+        self.useFixture(mockpatch.PatchObject(glance_http,
+                                              'STREAM_CHUNKSIZE', 4))
+        self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
+                        'endheaders'))
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'send',
+            side_effect=lambda data: sent.append(bytes(data))))
+        self._set_response_fixture({}, 200, 'fake_response_body')
+        resp, body = self.client.raw_request('PUT', '/images', body=req_body)
+        return resp, sent
+
+    def test_raw_request_chunked_frames_and_checksum(self):
+        resp, sent = self._send_chunked_body(six.BytesIO(b'0123456789'))
+        self.assertEqual([b'4\r\n0123\r\n', b'4\r\n4567\r\n',
+                          b'2\r\n89\r\n', b'0\r\n\r\n'], sent)
+        self.assertEqual(hashlib.md5(b'0123456789').hexdigest(),
+                         resp.upload_checksum)
+
+    def test_raw_request_chunked_mmap(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'img')
+        with open(path, 'wb') as f:
+            f.write(b'0123456789')
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.addCleanup(data.close)
+            resp, sent = self._send_chunked_body(data)
+        self.assertEqual(b'4\r\n0123\r\n4\r\n4567\r\n2\r\n89\r\n0\r\n\r\n',
+                         b''.join(sent))
+        self.assertEqual(hashlib.md5(b'0123456789').hexdigest(),
+                         resp.upload_checksum)
+
     def test_get_connection_class_for_https(self):
         conn_class = self.client._get_connection_class('https')
         self.assertEqual(glance_http.VerifiedHTTPSConnection, conn_class)
@@ -154,3 +193,139 @@ class TestResponseBodyIterator(base.TestCase):
         iterator = glance_http.ResponseBodyIterator(resp)
         chunks = list(iterator)
         self.assertEqual(chunks, ['X' * glance_http.CHUNKSIZE, 'X'])
+
+
+class TestGlanceHTTPDownload(base.TestCase):
+
+    data = b'0123456789' * 10
+
+    def setUp(self):
+        super(TestGlanceHTTPDownload, self).setUp()
+        fake_auth = fake_auth_provider.FakeAuthProvider()
+        fake_auth.base_url = mock.MagicMock(return_value='http://fake_url')
+        self.client = glance_http.HTTPClient(fake_auth, {})
+        self.useFixture(mockpatch.PatchObject(glance_http,
+                                              'STREAM_CHUNKSIZE', 16))
+        self.request = self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'request')).mock
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'image')
+
+    def _response(self, status, body, **headers):
+        headers.setdefault('content-type', 'application/octet-stream')
+        return fake_http.fake_httplib(headers, status=status,
+                                      body=six.BytesIO(body))
+
+    def _set_responses(self, *responses):
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'getresponse', side_effect=responses))
+
+    def _read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def _range_headers(self):
+        return [call[1]['headers'].get('Range')
+                for call in self.request.call_args_list]
+
+    def test_download(self):
+        md5 = hashlib.md5(self.data).hexdigest()
+        self._set_responses(self._response(200, self.data,
+                                           **{'content-md5': md5}))
+        resp, checksum = self.client.download('/images/x/file', self.path)
+        self.assertEqual(200, resp.status)
+        self.assertEqual(md5, checksum)
+        self.assertEqual(self.data, self._read())
+
+    def test_download_resumes_existing_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(self.data[:30])
+        self._set_responses(self._response(206, self.data[30:]))
+        resp, checksum = self.client.download('/images/x/file', self.path)
+        self.assertEqual(['bytes=30-'], self._range_headers())
+        self.assertEqual(hashlib.md5(self.data).hexdigest(), checksum)
+        self.assertEqual(self.data, self._read())
+
+    def test_download_restarts_when_range_is_ignored(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'garbage')
+        self._set_responses(self._response(200, self.data))
+        self.client.download('/images/x/file', self.path)
+        self.assertEqual(self.data, self._read())
+
+    def test_download_restarts_when_range_is_not_satisfiable(self):
+        with open(self.path, 'wb') as f:
+            f.write(self.data + b'garbage')
+        self._set_responses(self._response(416, b'',
+                                           **{'content-range': 'bytes */100'}),
+                            self._response(200, self.data))
+        self.client.download('/images/x/file', self.path)
+        self.assertEqual(['bytes=107-', None], self._range_headers())
+        self.assertEqual(self.data, self._read())
+
+    def test_complete_file_is_not_downloaded_again(self):
+        md5 = hashlib.md5(self.data).hexdigest()
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        self._set_responses(self._response(416, b'not satisfiable', **{
+            'content-range': 'bytes */100', 'x-image-meta-checksum': md5}))
+        resp, checksum = self.client.download('/images/x/file', self.path)
+        self.assertEqual(416, resp.status)
+        self.assertEqual(md5, checksum)
+        self.assertEqual(['bytes=100-'], self._range_headers())
+        self.assertEqual(self.data, self._read())
+
+    def test_complete_file_size_is_checked_with_head(self):
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        self._set_responses(self._response(416, b''),
+                            self._response(200, b'', **{
+                                'x-image-meta-size': '100',
+                                'x-image-meta-checksum': 'bad'}))
+        self.assertRaises(exceptions.ImageChecksumMismatch,
+                          self.client.download, '/images/x/file', self.path)
+        self.assertEqual(['GET', 'HEAD'],
+                         [call[0][0] for call in self.request.call_args_list])
+        self.assertEqual(self.data, self._read())
+
+    def test_interrupted_download_is_resumed(self):
+        interrupted = self._response(200, self.data)
+        interrupted.body = mock.Mock(read=mock.Mock(
+            side_effect=[self.data[:16], socket.error('reset')]))
+        self._set_responses(interrupted, self._response(206, self.data[16:]))
+        resp, checksum = self.client.download('/images/x/file', self.path)
+        self.assertEqual([None, 'bytes=16-'], self._range_headers())
+        self.assertEqual(self.data, self._read())
+
+    def test_download_checksum_mismatch(self):
+        self._set_responses(self._response(200, self.data,
+                                           **{'content-md5': 'bad'}))
+        self.assertRaises(exceptions.ImageChecksumMismatch,
+                          self.client.download, '/images/x/file', self.path)
+
+    def test_resumed_download_checksum(self):
+        with open(self.path, 'wb') as f:
+            f.write(self.data[:30])
+        md5 = hashlib.md5(self.data).hexdigest()
+        self._set_responses(self._response(206, self.data[30:], **{
+            'content-md5': hashlib.md5(self.data[30:]).hexdigest(),
+            'x-image-meta-checksum': md5}))
+        resp, checksum = self.client.download('/images/x/file', self.path)
+        self.assertEqual(206, resp.status)
+        self.assertEqual(md5, checksum)
+
+    def test_resumed_download_checksum_mismatch(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'xxxxx' + self.data[5:30])
+        self._set_responses(self._response(206, self.data[30:], **{
+            'x-image-meta-checksum': hashlib.md5(self.data).hexdigest()}))
+        self.assertRaises(exceptions.ImageChecksumMismatch,
+                          self.client.download, '/images/x/file', self.path)
+
+    def test_download_error_is_not_written(self):
+        self._set_responses(fake_http.fake_httplib(
+            {'content-type': 'text/plain'}, status=404,
+            body=six.StringIO('not found')))
+        resp, body = self.client.download('/images/x/file', self.path)
+        self.assertEqual(404, resp.status)
+        self.assertFalse(os.path.exists(self.path))
@@ -17,11 +17,13 @@
 
 import argparse
 import gzip
+import json
+import multiprocessing
 import os
 import re
-import six
 import sys
 import urllib2
+import zlib
 
 import yaml
 
@@ -58,41 +60,111 @@ allowed_dirty = set([
     's-proxy'])
 
 
-def process_files(file_specs, url_specs, whitelists):
-    regexp = re.compile(r"^.* (ERROR|CRITICAL|TRACE) .*\[.*\-.*\]")
-    logs_with_errors = []
-    for (name, filename) in file_specs:
-        whitelist = whitelists.get(name, [])
-        with open(filename) as content:
-            if scan_content(name, content, regexp, whitelist):
-                logs_with_errors.append(name)
-    for (name, url) in url_specs:
-        whitelist = whitelists.get(name, [])
-        req = urllib2.Request(url)
-        req.add_header('Accept-Encoding', 'gzip')
-        page = urllib2.urlopen(req)
-        buf = six.StringIO(page.read())
-        f = gzip.GzipFile(fileobj=buf)
-        if scan_content(name, f.read().splitlines(), regexp, whitelist):
-            logs_with_errors.append(name)
-    return logs_with_errors
-
-
-def scan_content(name, content, regexp, whitelist):
-    had_errors = False
+ERROR_REGEXP = re.compile(r"^.* (ERROR|CRITICAL|TRACE) .*\[.*\-.*\]")
+ERROR_LEVELS = (' ERROR ', ' CRITICAL ', ' TRACE ')
+# Non whitelisted error lines kept per log in the summary
+MAX_REPORTED_ERRORS = 20
+READ_SIZE = 1024 * 1024
+
+_whitelist_regexps = {}
+
+
+def compile_whitelists(whitelists):
+    """Compiles the whitelist of every log into a single regexp."""
+    regexps = {}
+    for (name, whitelist) in whitelists.items():
+        if whitelist:
+            regexps[name] = re.compile('|'.join(
+                '(?:%s.*%s)' % (w['module'].replace('.', '\\.'),
+                                w['message'])
+                for w in whitelist))
+    return regexps
+
+
+def _init_worker(whitelists):
+    global _whitelist_regexps
+    _whitelist_regexps = compile_whitelists(whitelists)
+
+
+def read_url_lines(url):
+    """Yields the lines of a gzipped log, decompressing it as it arrives."""
+    req = urllib2.Request(url)
+    req.add_header('Accept-Encoding', 'gzip')
+    page = urllib2.urlopen(req)
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pending = ''
+    try:
+        while True:
+            chunk = page.read(READ_SIZE)
+            if not chunk:
+                break
+            lines = (pending + decompressor.decompress(chunk)).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line
+        pending += decompressor.flush()
+        if pending:
+            yield pending
+    finally:
+        page.close()
+
+
+def read_file_lines(filename):
+    opener = gzip.open if filename.endswith('.gz') else open
+    with opener(filename) as content:
+        for line in content:
+            yield line.rstrip('\n')
+
+
+def scan_content(name, content, regexp=ERROR_REGEXP, whitelist_regexp=None):
+    """Scans the lines of a log, returns its summary as a dict."""
+    summary = {'name': name, 'lines': 0, 'errors': 0, 'whitelisted': 0,
+               'error_lines': []}
     for line in content:
-        if not line.startswith("Stderr:") and regexp.match(line):
-            whitelisted = False
-            for w in whitelist:
-                pat = ".*%s.*%s.*" % (w['module'].replace('.', '\\.'),
-                                      w['message'])
-                if re.match(pat, line):
-                    whitelisted = True
-                    break
-            if not whitelisted or dump_all_errors:
-                if not whitelisted:
-                    had_errors = True
-    return had_errors
+        summary['lines'] += 1
+        # Most lines are not errors, skip them before running the regexps
+        if not any(level in line for level in ERROR_LEVELS):
+            continue
+        if line.startswith("Stderr:") or not regexp.match(line):
+            continue
+        if whitelist_regexp is not None and whitelist_regexp.search(line):
+            summary['whitelisted'] += 1
+            continue
+        summary['errors'] += 1
+        if len(summary['error_lines']) < MAX_REPORTED_ERRORS:
+            summary['error_lines'].append(line)
+    return summary
+
+
+def scan_log(spec):
+    """Scans a (name, source, is_url) log, in a worker process."""
+    name, source, is_url = spec
+    lines = read_url_lines(source) if is_url else read_file_lines(source)
+    try:
+        summary = scan_content(name, lines,
+                               whitelist_regexp=_whitelist_regexps.get(name))
+    except Exception as e:
+        summary = {'name': name, 'failure': str(e)}
+    summary['source'] = source
+    return summary
+
+
+def process_files(file_specs, url_specs, whitelists, jobs=None):
+    """Scans the logs concurrently, returns the summary of every log."""
+    specs = ([(name, filename, False) for (name, filename) in file_specs] +
+             [(name, url, True) for (name, url) in url_specs])
+    if not specs:
+        return []
+    pool = multiprocessing.Pool(min(jobs or multiprocessing.cpu_count(),
+                                    len(specs)),
+                                _init_worker, (whitelists,))
+    try:
+        # Logs are handed out one at a time, so a few very large ones do
+        # not hold back the workers done with the small ones
+        return pool.map(scan_log, specs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
 
 
 def collect_url_logs(url):
@@ -143,19 +215,31 @@ def main(opts):
                     assert 'module' in w, 'no module in %s' % name
                     assert 'message' in w, 'no message in %s' % name
             whitelists = loaded
-    logs_with_errors = process_files(files_to_process, urls_to_process,
-                                     whitelists)
+    summaries = process_files(files_to_process, urls_to_process,
+                              whitelists, opts.jobs)
 
     failed = False
-    if logs_with_errors:
-        log_files = set(logs_with_errors)
-        for log in log_files:
-            msg = '%s log file has errors' % log
-            if log not in allowed_dirty:
+    for summary in sorted(summaries, key=lambda s: s['name']):
+        summary['allowed_dirty'] = summary['name'] in allowed_dirty
+        if 'failure' in summary:
+            # Don't fail if a log can not be read
+            print('%s log could not be checked: %s' % (summary['name'],
+                                                       summary['failure']))
+        elif summary['errors']:
+            msg = '%s log file has errors' % summary['name']
+            if not summary['allowed_dirty']:
                 msg += ' and is not allowed to have them'
                 failed = True
             print(msg)
+            if dump_all_errors:
+                for line in summary['error_lines']:
+                    print('    %s' % line)
+    if any(summary.get('errors') for summary in summaries):
         print("\nPlease check the respective log files to see the errors")
+    if opts.json:
+        with open(opts.json, 'w') as output:
+            json.dump({'failed': failed, 'logs': summaries}, output,
+                      indent=2, sort_keys=True)
     if failed:
         if is_grenade:
             print("Currently not failing grenade runs with errors")
@@ -188,6 +272,11 @@ parser.add_argument('-d', '--directory',
                     help="Directory containing log files")
 parser.add_argument('-u', '--url',
                     help="url containing logs from an OpenStack gate job")
+parser.add_argument('-j', '--jobs', type=int,
+                    help="Number of logs checked concurrently, the number "
+                         "of CPUs by default")
+parser.add_argument('--json',
+                    help="File to write a JSON summary of every log to")
 
 if __name__ == "__main__":
     try: